@@ -3,12 +3,15 @@
 set -e  # exit on error
 
 USE_DUMMY=false
+USE_SIM=false
 
 if [[ "$1" == "--dummy" ]]; then
   USE_DUMMY=true
+elif [[ "$1" == "--sim" ]]; then
+  USE_SIM=true
 elif [[ -n "$1" ]]; then
   echo "[!] unknown option: $1"
-  echo "usage: ./run.sh [--dummy]"
+  echo "usage: ./run.sh [--dummy|--sim]"
   exit 1
 fi
 
@@ -21,17 +24,29 @@ fi
 echo "activating virtual environment..."
 source venv/bin/activate
 
-echo "installing requirements..."
-pip install --upgrade pip --quiet || echo "pip upgrade failed"
-pip install -r requirements.txt --quiet || echo "requirements install failed"
-
-clear
+# only install when requirements.txt (or the python) changed since the last
+# successful install - a no-op pip run costs several seconds on the pi
+STAMP="venv/.requirements.sha256"
+WANTED="$( (cat requirements.txt; python3 --version) | sha256sum | cut -d' ' -f1)"
+if [[ ! -f "$STAMP" || "$(cat "$STAMP")" != "$WANTED" ]]; then
+  echo "installing requirements..."
+  pip install --upgrade pip --quiet || echo "pip upgrade failed"
+  if pip install -r requirements.txt --quiet; then
+    echo "$WANTED" > "$STAMP"
+  else
+    echo "requirements install failed"
+  fi
+  clear
+fi
 
 # run the main system script
 echo "running main system..."
 if $USE_DUMMY; then
   echo "running in DUMMY mode (no Raspberry Pi hardware required)"
-  USE_DUMMY_SENSORS=true python3 src/mswua.py
+  USE_DUMMY_SENSORS=true exec python3 src/mswua.py
+elif $USE_SIM; then
+  echo "running in SIM mode (real drivers on simulated hardware)"
+  MSW_SIMULATE=true exec python3 src/mswua.py
 else
-  python3 src/mswua.py
+  exec python3 src/mswua.py
 fi
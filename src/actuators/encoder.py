@@ -0,0 +1,131 @@
+import threading
+
+import numpy as np
+import pigpio
+
+from sensors.ring_buffer import RingBuffer
+
+# count change indexed by (previous state << 2) | new state, state = (a << 1) | b.
+# forward is 00 -> 10 -> 11 -> 01 (a leads b); unchanged and impossible
+# (both pins flipped) transitions are 0 - the latter are counted as errors
+# fmt: off
+_TRANSITIONS = (
+    0, -1, +1, 0,
+    +1, 0, 0, -1,
+    -1, 0, 0, +1,
+    0, +1, -1, 0,
+)
+# fmt: on
+_INVALID = frozenset((0b0011, 0b0110, 0b1001, 0b1100))
+
+
+class QuadratureEncoder:
+    """
+    4x quadrature decoder driven by pigpio edge callbacks on both channels
+
+    every edge on a or b moves a 2-bit state machine using the level pigpio
+    hands to the callback, so decoding needs no extra gpio reads and no
+    debounce spin (pigpio's glitch filter does that in the daemon). each
+    count change is stored with its edge tick in `edges`, which velocity()
+    uses.
+    """
+
+    def __init__(
+        self, pi, pin_a, pin_b, pull=pigpio.PUD_UP, glitch_us=5, buffer_capacity=4096
+    ):
+        """
+        args:
+            pi: connected pigpio.pi
+            pin_a, pin_b: bcm pins of the a and b channels
+            pull: pull resistor for both pins
+            glitch_us: pigpio glitch filter (0 disables it)
+            buffer_capacity: number of edges kept for velocity estimation
+        """
+        self.pi = pi
+        self.pin_a = pin_a
+        self.pin_b = pin_b
+        self.count = 0
+        self.errors = 0
+
+        # edge times are unwrapped pigpio ticks in seconds
+        self.edges = RingBuffer(("count",), capacity=buffer_capacity)
+        self._last_tick = None
+        self._tick_us = 0
+        self._lock = threading.Lock()
+
+        for pin in (pin_a, pin_b):
+            pi.set_mode(pin, pigpio.INPUT)
+            pi.set_pull_up_down(pin, pull)
+            if glitch_us:
+                pi.set_glitch_filter(pin, glitch_us)
+        self._state = (pi.read(pin_a) << 1) | pi.read(pin_b)
+
+        self._callbacks = [
+            pi.callback(pin_a, pigpio.EITHER_EDGE, self._edge_a),
+            pi.callback(pin_b, pigpio.EITHER_EDGE, self._edge_b),
+        ]
+
+    def _edge_a(self, gpio, level, tick):
+        if level < 2:  # 2 = watchdog timeout, no edge
+            self._update((level << 1) | (self._state & 1), tick)
+
+    def _edge_b(self, gpio, level, tick):
+        if level < 2:
+            self._update((self._state & 2) | level, tick)
+
+    def _update(self, state, tick):
+        with self._lock:
+            key = (self._state << 2) | state
+            self._state = state
+            delta = _TRANSITIONS[key]
+            if not delta:
+                if key in _INVALID:
+                    self.errors += 1
+                return
+            self.count += delta
+
+            # unwrap the 32-bit microsecond tick
+            if self._last_tick is not None:
+                self._tick_us += (tick - self._last_tick) & 0xFFFFFFFF
+            self._last_tick = tick
+            self.edges.append(self._tick_us / 1e6, (self.count,))
+
+    def velocity(self, window_s=0.05):
+        """
+        counts per second over the edges in the last `window_s`
+
+        measured back from the latest edge, and 0 when no edge has
+        arrived for a whole window.
+        """
+        with self._lock:
+            last_tick = self._last_tick
+            now_s = self._tick_us / 1e6
+        if last_tick is None:
+            return 0.0
+        idle_us = (self.pi.get_current_tick() - last_tick) & 0xFFFFFFFF
+        if window_s * 1e6 < idle_us < 0x80000000:  # larger = tick raced ahead
+            return 0.0
+
+        timestamps, values = self.edges.window(now_s - window_s)
+        if len(timestamps) < 2:
+            return 0.0
+        dt = timestamps[-1] - timestamps[0]
+        if dt <= 0:
+            return 0.0
+        return float(values[-1, 0] - values[0, 0]) / dt
+
+    def edge_intervals(self, n=None):
+        """seconds between consecutive edges, over the last n edges"""
+        timestamps, _ = self.edges.last(n)
+        return np.diff(timestamps)
+
+    def reset(self, count=0):
+        with self._lock:
+            self.count = count
+            self.errors = 0
+
+    def cancel(self):
+        """stop decoding"""
+        for callback in self._callbacks:
+            callback.cancel()
+        self._callbacks = []
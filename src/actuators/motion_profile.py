@@ -0,0 +1,101 @@
+from functools import lru_cache
+from typing import NamedTuple
+
+import numpy as np
+
+TRAPEZOID = "trapezoid"
+S_CURVE = "s-curve"
+
+# peak acceleration of the smoothstep ramp relative to its average, which
+# makes an s-curve ramp 1.5x longer than a trapezoid one for the same limit
+_RAMP_STRETCH = {TRAPEZOID: 1.0, S_CURVE: 1.5}
+
+# a wave holds two pulses per step and the daemon caps a wave at 12000
+MAX_RAMP_STEPS = 5000
+
+
+class MotionProfile(NamedTuple):
+    """
+    step timing for one move
+
+    the move plays `ramp_us` (the acceleration periods, one per step), then
+    `cruise_steps` steps at `cruise_us`, then `ramp_us` in reverse. all
+    periods are whole microseconds from one rising STEP edge to the next.
+    """
+
+    ramp_us: tuple
+    cruise_us: int
+    cruise_steps: int
+
+    @property
+    def steps(self):
+        return 2 * len(self.ramp_us) + self.cruise_steps
+
+    @property
+    def duration_s(self):
+        return (2 * sum(self.ramp_us) + self.cruise_us * self.cruise_steps) / 1e6
+
+
+def _ramp_times(n, v0, v1, accel, shape):
+    """times (s) of the first n+1 step edges while speeding up from v0 to v1"""
+    k = np.arange(n + 1, dtype=np.float64)
+    if shape == TRAPEZOID:
+        # x(t) = v0 t + a t^2 / 2 solved for x = k
+        return (np.sqrt(v0 * v0 + 2.0 * accel * k) - v0) / accel
+
+    # smoothstep velocity v(u) = v0 + dv (3u^2 - 2u^3) over the ramp time T,
+    # so x(t) = v0 t + dv T (u^3 - u^4 / 2) - solved for x = k by newton
+    dv = v1 - v0
+    T = _RAMP_STRETCH[S_CURVE] * dv / accel
+    t = k / ((v0 + v1) / 2.0)
+    for _ in range(30):
+        u = np.clip(t / T, 0.0, 1.0)
+        x = v0 * t + dv * T * (u**3 - u**4 / 2.0)
+        v = v0 + dv * (3.0 * u**2 - 2.0 * u**3)
+        t = t - (x - k) / v
+    return t
+
+
+@lru_cache(maxsize=64)
+def plan_move(steps, start_hz, max_hz, accel, shape=TRAPEZOID):
+    """
+    plan the step periods for a move of `steps` steps
+
+    the motor starts and ends at start_hz (the stall-safe speed), speeds up
+    at up to `accel` steps/s^2 and cruises at max_hz. moves too short to
+    reach max_hz become a triangle that turns round halfway. results are
+    cached, so repeating a move costs nothing.
+
+    args:
+        steps: number of steps (the sign is ignored)
+        start_hz: start/stop step rate
+        max_hz: cruise step rate
+        accel: acceleration limit in steps/s^2
+        shape: TRAPEZOID (constant acceleration) or S_CURVE (jerk-limited)
+    """
+    if shape not in _RAMP_STRETCH:
+        raise ValueError(f"unknown profile shape: {shape}")
+    if not 0 < start_hz <= max_hz or accel <= 0:
+        raise ValueError("need 0 < start_hz <= max_hz and accel > 0")
+
+    steps = abs(int(steps))
+    stretch = _RAMP_STRETCH[shape]
+
+    # distance to reach max_hz is the ramp time times the average speed
+    ramp_distance = stretch * (max_hz**2 - start_hz**2) / (2.0 * accel)
+    peak_hz = max_hz
+    if 2 * ramp_distance > steps:
+        ramp_distance = steps / 2.0
+        peak_hz = np.sqrt(start_hz**2 + 2.0 * accel * ramp_distance / stretch)
+
+    n = min(int(ramp_distance), steps // 2, MAX_RAMP_STEPS)
+    cruise_us = int(round(1e6 / peak_hz))
+    if n == 0:
+        return MotionProfile((), cruise_us, steps)
+
+    # period k is the time to travel from step k to step k + 1
+    times = _ramp_times(n, start_hz, peak_hz, accel, shape)
+    ramp_us = np.maximum(np.rint(np.diff(times) * 1e6), cruise_us).astype(int)
+    if n == MAX_RAMP_STEPS:
+        cruise_us = int(ramp_us[-1])  # ramp was cut short of the peak
+    return MotionProfile(tuple(ramp_us.tolist()), cruise_us, steps - 2 * n)
@@ -1,28 +1,36 @@
+import os
+import sys
 from time import sleep
 
-from RPi import GPIO  # type: ignore
+# run as a script from anywhere: make src/ importable
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sim.backend import install as install_simulator, is_enabled as simulate
+
+if simulate():
+    install_simulator()
+
+import pigpio  # type: ignore
+
+from actuators.encoder import QuadratureEncoder
 
 clk = 17
 dt = 23
 
-GPIO.setmode(GPIO.BCM)
-GPIO.setup(clk, GPIO.IN, pull_up_down=GPIO.PUD_DOWN)
-GPIO.setup(dt, GPIO.IN, pull_up_down=GPIO.PUD_DOWN)
+pi = pigpio.pi()
+if not pi.connected:
+    sys.exit("pigpiod not running (sudo pigpiod)")
 
-counter = 0
-clkLastState = GPIO.input(clk)
+# edges are decoded in pigpio callbacks, so the loop below only prints
+encoder = QuadratureEncoder(pi, clk, dt, pull=pigpio.PUD_DOWN)
+counter = encoder.count
 
 try:
     while True:
-        clkState = GPIO.input(clk)
-        dtState = GPIO.input(dt)
-        if clkState != clkLastState:
-            if dtState != clkState:
-                counter += 1
-            else:
-                counter -= 1
-            print(counter)
-        clkLastState = clkState
+        if encoder.count != counter:
+            counter = encoder.count
+            print(counter, f"{encoder.velocity():.0f} counts/s")
         sleep(0.01)
 finally:
-    GPIO.cleanup()
+    encoder.cancel()
+    pi.stop()
@@ -1,14 +1,20 @@
 import time
-import threading            
+import threading
 import pigpio
 
+from actuators.encoder import QuadratureEncoder
+from actuators.motion_profile import TRAPEZOID, plan_move
+from sensors.ring_buffer import RingBuffer
+from telemetry.instrumentation import timed
+
+
 class StepperMotor:
     def __init__(self, pi, step_pin=18, dir_pin=25, enc_a=17, enc_b=23):
         self.pi = pi
         self.STEP_PIN = step_pin
-        self.DIR_PIN  = dir_pin
-        self.ENC_A    = enc_a
-        self.ENC_B    = enc_b
+        self.DIR_PIN = dir_pin
+        self.ENC_A = enc_a
+        self.ENC_B = enc_b
 
         self.PULSE_US = 1300
         self.COUNTS_PER_FULL_STEP = 41
@@ -16,14 +22,41 @@ class StepperMotor:
         self.TEST_CLICKS = 164
         self.TOL = 3
 
-        self.actual = 0
-        self.last_a = 0
+        # closed-loop goto: encoder settle time after each chunk, a chunk
+        # that moves less than STALL_RATIO of its commanded counts is a
+        # stall, and MAX_STALLS of them in a row abort the move
+        self.ENC_SETTLE_S = 0.01
+        self.STALL_RATIO = 0.25
+        self.MAX_STALLS = 2
+        self.MAX_CHUNKS = 20
+        self.last_move = None
+
+        # ramped moves: start/stop at the stall-safe rate of the fixed
+        # PULSE_US timing, accelerate to MAX_HZ (PROFILE None = no ramps)
+        self.START_HZ = 1e6 / (2 * self.PULSE_US)
+        self.MAX_HZ = 1500
+        self.ACCEL = 6000  # steps/s^2
+        self.PROFILE = TRAPEZOID
 
-        self._stop_event = threading.Event()   # shared stop flag (thread-safe)
+        # how often a running wave chain is checked for a stop request
+        self.CHAIN_POLL_S = 0.002
+        self._waves = {}  # cached wave ids by shape
+
+        self._stop_event = threading.Event()  # shared stop flag (thread-safe)
+
+        # commanded moves (signed steps or target clicks) and encoder position.
+        # moves come from the ui, sequencer, interlock and emergency-stop
+        # threads, and the ring buffer takes one writer at a time
+        self.events = RingBuffer(("command", "position"), capacity=1024)
+        self._events_lock = threading.Lock()
 
         self._setup_pins()
         self._setup_encoder()
 
+    def _log_command(self, command):
+        with self._events_lock:
+            self.events.append(time.monotonic(), (command, self.actual))
+
     def _setup_pins(self):
         self.pi.set_mode(self.STEP_PIN, pigpio.OUTPUT)
         self.pi.write(self.STEP_PIN, 0)
@@ -31,41 +64,34 @@ class StepperMotor:
         self.pi.write(self.DIR_PIN, 0)
 
     def _setup_encoder(self):
-        for pin in (self.ENC_A, self.ENC_B):
-            self.pi.set_mode(pin, pigpio.INPUT)
-            self.pi.set_pull_up_down(pin, pigpio.PUD_UP)
-            self.pi.set_glitch_filter(pin, 5)
-        self.last_a = self.pi.read(self.ENC_A)
-
-        self.pi.callback(self.ENC_A, pigpio.EITHER_EDGE, self._enc_cb)
-
-    def _enc_cb(self, gpio, level, tick):
-        if level != self.last_a:
-            # small debounce window
-            t0 = time.perf_counter_ns()
-            while (time.perf_counter_ns() - t0) < 5_000:
-                pass
-            direction = 1 if self.pi.read(self.ENC_B) != level else -1
-            self.actual += direction
-            self.last_a = level
+        # 4x decoding from a and b edge callbacks, glitch filtered by pigpio
+        self.encoder = QuadratureEncoder(self.pi, self.ENC_A, self.ENC_B, glitch_us=5)
+
+    @property
+    def actual(self):
+        """Encoder position in counts."""
+        return self.encoder.count
+
+    @actual.setter
+    def actual(self, count):
+        self.encoder.reset(count)
+
+    def velocity(self):
+        """Encoder speed in counts/s."""
+        return self.encoder.velocity()
 
     # ---------- MOTION PRIMITIVES WITH COOPERATIVE STOP ----------
 
+    @timed("motor.pulse")
     def _send_one_pulse(self):
         """Send one STEP pulse via pigpio wave.
         Returns False if a stop was requested before or during the pulse.
         """
-        if self._stop_event.is_set():      
+        if self._stop_event.is_set():
             return False
 
-        self.pi.wave_clear()
-        wf = [
-            pigpio.pulse(1 << self.STEP_PIN, 0, self.PULSE_US),
-            pigpio.pulse(0, 1 << self.STEP_PIN, self.PULSE_US),
-        ]
-        self.pi.wave_add_generic(wf)
-        wid = self.pi.wave_create()
-        if wid < 0:                            # guard for allocation failure
+        wid = self._step_wave(2 * self.PULSE_US)
+        if wid < 0:  # guard for allocation failure
             return False
 
         self.pi.wave_send_once(wid)
@@ -73,26 +99,136 @@ class StepperMotor:
         # busy-wait but allow interruption mid-pulse
         while self.pi.wave_tx_busy():
             if self._stop_event.is_set():
-                self.pi.wave_tx_stop()       
+                self.pi.wave_tx_stop()
                 break
             time.sleep(0.0002)
 
-        self.pi.wave_delete(wid)               # keep wave pool clean
         return not self._stop_event.is_set()
 
+    def _wave(self, key, periods_us):
+        """Cached wave of one STEP pulse per period (high for half of it).
+        The cache is flushed once if the daemon runs out of wave slots.
+        """
+        wid = self._waves.get(key)
+        if wid is not None:
+            return wid
+        on = 1 << self.STEP_PIN
+        pulses = []
+        for period in periods_us:
+            high = period // 2
+            pulses.append(pigpio.pulse(on, 0, high))
+            pulses.append(pigpio.pulse(0, on, period - high))
+        for _ in range(2):
+            self.pi.wave_add_new()
+            self.pi.wave_add_generic(pulses)
+            wid = self.pi.wave_create()
+            if wid >= 0:
+                self._waves[key] = wid
+                return wid
+            self.clear_waves()
+        return wid
+
+    def _step_wave(self, period_us):
+        """One STEP period, built once and cached."""
+        return self._wave(("step", period_us), (period_us,))
+
+    def _ramp_wave(self, periods_us):
+        """A whole acceleration or deceleration ramp as one wave."""
+        return self._wave(("ramp", periods_us), periods_us)
+
+    def clear_waves(self):
+        """Free every cached wave (they are rebuilt on demand)."""
+        self.pi.wave_tx_stop()
+        self.pi.wave_clear()
+        self._waves.clear()
+
+    @timed("motor.chain")
+    def _run_chain(self, chain):
+        """Transmit a wave chain and wait for it, cancelling on stop().
+        Returns False if a stop was requested before or during the chain.
+        """
+        if self._stop_event.is_set():
+            return False
+
+        self.pi.wave_chain(chain)
+        while self.pi.wave_tx_busy():
+            if self._stop_event.is_set():
+                self.pi.wave_tx_stop()
+                self.pi.write(self.STEP_PIN, 0)
+                break
+            time.sleep(self.CHAIN_POLL_S)
+        return not self._stop_event.is_set()
+
+    @staticmethod
+    def _loop(wid, count):
+        """Chain commands that play wave `wid` `count` times (split past 65535)."""
+        chain = []
+        while count > 0:
+            n = min(count, 0xFFFF)
+            chain += [255, 0, wid, 255, 1, n & 0xFF, n >> 8]
+            count -= n
+        return chain
+
     def one_step(self, direction):
-        if self._stop_event.is_set():        
+        if self._stop_event.is_set():
             return False
         self.pi.write(self.DIR_PIN, 1 if direction > 0 else 0)
-        return self._send_one_pulse()    
+        return self._send_one_pulse()
 
-    def fixed_steps(self, n):
-        self._stop_event.clear()              
-        dir_ = 1 if n > 0 else -1
-        for _ in range(abs(n)):
-            if not self.one_step(dir_):        # break if STOP was requested
-                break
-            time.sleep(0.002)
+    def fixed_steps(self, n, ramped=True):
+        """Move n steps (sign = direction) as one wave chain.
+        With ramped=True and a PROFILE set, the move accelerates from
+        START_HZ to MAX_HZ and back; otherwise it runs at PULSE_US timing.
+        """
+        self._stop_event.clear()
+        self._log_command(n)
+        return self._move(n, ramped)
+
+    def _move(self, n, ramped=True):
+        if n == 0:
+            return True
+
+        # the whole move is a few cached waves looped by the daemon, so it
+        # runs hardware-timed with no per-step round trips
+        self.pi.write(self.DIR_PIN, 1 if n > 0 else 0)
+        if ramped and self.PROFILE is not None:
+            chain = self._profile_chain(abs(n))
+        else:
+            wid = self._step_wave(2 * self.PULSE_US)
+            chain = self._loop(wid, abs(n)) if wid >= 0 else None
+        if chain is None:  # wave allocation failed
+            return False
+        return self._run_chain(chain)
+
+    def plan(self, n):
+        """Motion profile fixed_steps(n) would use."""
+        return plan_move(abs(n), self.START_HZ, self.MAX_HZ, self.ACCEL, self.PROFILE)
+
+    def _profile_chain(self, n):
+        profile = self.plan(n)
+        if not profile.ramp_us:
+            cruise = self._step_wave(profile.cruise_us)
+            return self._loop(cruise, n) if cruise >= 0 else None
+        # a cache flush while building the later waves frees the earlier
+        # ones, so build again until all three are live together. compare
+        # by cache key: the daemon reuses ids after a flush, so a stale id
+        # can equal a newly built wave of another shape
+        keys = (
+            ("ramp", profile.ramp_us),
+            ("step", profile.cruise_us),
+            ("ramp", profile.ramp_us[::-1]),
+        )
+        for _ in range(2):
+            up = self._ramp_wave(profile.ramp_us)
+            cruise = self._step_wave(profile.cruise_us)
+            down = self._ramp_wave(profile.ramp_us[::-1])
+            built = (up, cruise, down)
+            if all(
+                wid >= 0 and self._waves.get(key) == wid
+                for key, wid in zip(keys, built)
+            ):
+                return [up] + self._loop(cruise, profile.cruise_steps) + [down]
+        return None
 
     def open_valve(self):
         self.fixed_steps(-self.VALVE_STEPS)
@@ -100,19 +236,78 @@ class StepperMotor:
     def close_valve(self):
         self.fixed_steps(+self.VALVE_STEPS)
 
+    @timed("motor.goto")
     def goto(self, target):
-        self._stop_event.clear()               # allow new motion
-        while not self._stop_event.is_set() and abs(target - self.actual) > self.TOL:
-            direction = 1 if target > self.actual else -1
-            if not self.one_step(direction):   # break if STOP requested mid-move
+        """Closed-loop move to an absolute encoder count.
+
+        Each chunk commands the whole remaining error in full steps as one
+        ramped move, then re-reads the encoder. The move ends when the
+        error is within TOL or half a step (the best a full step can do),
+        on stop(), on a stall, or after MAX_CHUNKS corrections.
+
+        Returns (and stores in self.last_move) a dict with the final
+        position and error, steps commanded, chunks used, settle time,
+        overshoot past the target, missed steps and stalled/stopped flags.
+        """
+        self._stop_event.clear()  # allow new motion
+        self._log_command(target)
+
+        t0 = time.monotonic()
+        start = self.actual
+        approach = 1 if target >= start else -1
+        deadband = max(self.TOL, self.COUNTS_PER_FULL_STEP / 2)
+        commanded = chunks = stalls = 0
+        missed = overshoot = 0.0
+        stalled = False
+
+        while not self._stop_event.is_set() and chunks < self.MAX_CHUNKS:
+            error = target - self.actual
+            if abs(error) <= deadband:
+                break
+            steps = round(error / self.COUNTS_PER_FULL_STEP)
+            before = self.actual
+            chunks += 1
+            commanded += abs(steps)
+            if not self._move(steps):  # STOP requested mid-move
                 break
-            time.sleep(0.0005)
+            time.sleep(self.ENC_SETTLE_S)  # let the last encoder edges land
+
+            expected = steps * self.COUNTS_PER_FULL_STEP
+            moved = self.actual - before
+            shortfall = abs(expected) - moved * (1 if steps > 0 else -1)
+            if shortfall > 0:
+                missed += shortfall / self.COUNTS_PER_FULL_STEP
+            overshoot = max(overshoot, (self.actual - target) * approach)
+            if moved * expected <= 0 or abs(moved) < self.STALL_RATIO * abs(expected):
+                stalls += 1
+                if stalls >= self.MAX_STALLS:
+                    stalled = True
+                    break
+            else:
+                stalls = 0
+
+        final = self.actual
+        self.last_move = {
+            "target": target,
+            "start": start,
+            "position": final,
+            "error": target - final,
+            "steps": commanded,
+            "chunks": chunks,
+            "settle_s": time.monotonic() - t0,
+            "overshoot": overshoot,
+            "missed_steps": round(missed, 1),
+            "settled": abs(target - final) <= deadband,
+            "stalled": stalled,
+            "stopped": self._stop_event.is_set(),
+        }
+        return self.last_move
 
     def move_steps(self, n_steps):
-        self.goto(self.actual + n_steps * self.COUNTS_PER_FULL_STEP)
+        return self.goto(self.actual + n_steps * self.COUNTS_PER_FULL_STEP)
 
     def stop(self):
         """Stop immediately: set flag, cancel in-flight wave, force STEP low."""
-        self._stop_event.set()              
-        self.pi.wave_tx_stop()                 
-        self.pi.write(self.STEP_PIN, 0)       
+        self._stop_event.set()
+        self.pi.wave_tx_stop()
+        self.pi.write(self.STEP_PIN, 0)
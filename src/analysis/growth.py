@@ -0,0 +1,190 @@
+import logging
+import math
+import threading
+
+import numpy as np
+
+from camera.frame_queue import LatestFrameQueue
+from sensors.ring_buffer import RingBuffer
+
+logger = logging.getLogger(__name__)
+
+
+def _crop(frame, roi, step):
+    """strided view of a fractional (x0, y0, x1, y1) roi - no copy"""
+    height, width = frame.shape[:2]
+    x0, y0, x1, y1 = roi
+    return frame[
+        int(y0 * height) : max(int(y1 * height), int(y0 * height) + 1) : step,
+        int(x0 * width) : max(int(x1 * width), int(x0 * width) + 1) : step,
+        :3,
+    ]
+
+
+class GrowthAnalyzer:
+    """
+    per-frame culture metrics computed on downsampled regions of interest
+
+    - green_index: chromatic green g / (r + g + b) of the culture roi
+    - chlorophyll_index: excess green (2g - r - b) / (r + g + b)
+    - optical_density: -log10(I / I0) of the roi luminance against the
+      blank reference I0 (see calibrate())
+    - bubble_fraction: share of the capillary channel's length that is
+      markedly brighter than the liquid level (its 25th percentile) -
+      gas bubbles and slugs scatter light
+    - meniscus_x: position 0..1 along the channel of the strongest
+      brightness edge, or nan when there is no clear interface
+
+    all of it is a handful of numpy reductions over a strided view, so a
+    frame costs well under a millisecond at the default downsampling.
+    analyze() is pure and can be called directly; submit()/start() run it
+    on a worker thread fed from a camera preview sink, writing one sample
+    per `1 / rate_hz` into `buffer` - a RingBuffer like every sensor's, so
+    the flight recorder stores it alongside the sensor channels.
+    """
+
+    FIELDS = (
+        "green_index",
+        "chlorophyll_index",
+        "optical_density",
+        "bubble_fraction",
+        "meniscus_x",
+    )
+
+    def __init__(
+        self,
+        roi=(0.1, 0.1, 0.9, 0.9),
+        channel_roi=(0.0, 0.45, 1.0, 0.55),
+        downsample=4,
+        rate_hz=2.0,
+        bubble_threshold=40.0,
+        edge_threshold=30.0,
+        buffer_capacity=4096,
+    ):
+        """
+        args:
+            roi: culture region as fractions (x0, y0, x1, y1) of the frame
+            channel_roi: capillary channel region, running left to right
+            downsample: take every n-th pixel in both directions
+            rate_hz: metrics written to the buffer per second (0 = every frame)
+            bubble_threshold: brightness above the liquid level that counts
+                as gas (0..255 luminance)
+            edge_threshold: minimum luminance step for a meniscus
+            buffer_capacity: samples kept in `buffer`
+        """
+        self.roi = tuple(roi)
+        self.channel_roi = tuple(channel_roi)
+        self.downsample = max(1, int(downsample))
+        self.period = 1.0 / rate_hz if rate_hz else 0.0
+        self.bubble_threshold = bubble_threshold
+        self.edge_threshold = edge_threshold
+        self.reference = 255.0
+        self.buffer = RingBuffer(self.FIELDS, capacity=buffer_capacity)
+
+        self.frames = 0
+        self._next_due = None
+        self._queue = LatestFrameQueue()
+        self._running = False
+        self._thread = None
+
+    # ---------- metrics ----------
+
+    def calibrate(self, frame):
+        """take the current roi brightness as the blank (od = 0) reference"""
+        roi = _crop(frame, self.roi, self.downsample).astype(np.float32)
+        self.reference = max(float(roi.mean()), 1e-3)
+
+    def analyze(self, frame):
+        """metrics for one rgb frame as a tuple in FIELDS order"""
+        step = self.downsample
+
+        culture = _crop(frame, self.roi, step)
+        r, g, b = culture.reshape(-1, 3).mean(axis=0, dtype=np.float32)
+        total = r + g + b
+        if total > 0:
+            green = g / total
+            chlorophyll = (2 * g - r - b) / total
+        else:
+            green = chlorophyll = 0.0
+        luminance = total / 3.0
+        density = -math.log10(max(luminance, 1e-3) / self.reference)
+
+        # brightness profile along the channel: one value per column
+        channel = _crop(frame, self.channel_roi, step)
+        profile = channel.mean(axis=(0, 2), dtype=np.float32)
+        if profile.size > 1:
+            bubbles = (
+                float(
+                    np.count_nonzero(
+                        profile > np.percentile(profile, 25) + self.bubble_threshold
+                    )
+                )
+                / profile.size
+            )
+            edges = np.abs(np.diff(profile))
+            edge = int(edges.argmax())
+            meniscus = (
+                (edge + 0.5) / (profile.size - 1)
+                if edges[edge] >= self.edge_threshold
+                else math.nan
+            )
+        else:
+            bubbles, meniscus = 0.0, math.nan
+
+        return float(green), float(chlorophyll), density, bubbles, meniscus
+
+    def process(self, frame, timestamp):
+        """analyze a frame and store the result"""
+        metrics = self.analyze(frame)
+        self.buffer.append(timestamp, metrics)
+        self.frames += 1
+        return metrics
+
+    # ---------- streaming ----------
+
+    def submit(self, frame, timestamp):
+        """
+        preview-sink entry point: hand a frame to the worker if one is due
+
+        the rate check runs first, so frames between samples cost only a
+        comparison on the camera thread.
+        """
+        if self._next_due is not None and timestamp < self._next_due:
+            return
+        self._next_due = timestamp + self.period
+        self._queue.put((frame, timestamp))
+
+    def _worker(self):
+        while self._running:
+            item = self._queue.get(timeout=0.5)
+            if item is None:
+                continue
+            try:
+                self.process(*item)
+            except Exception:
+                logger.exception("frame analysis failed")
+
+    def start(self):
+        if self._running:
+            return
+        self._queue.reopen()  # closed by a previous stop()
+        self._running = True
+        self._thread = threading.Thread(
+            target=self._worker, name="growth-analysis", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        self._running = False
+        self._queue.close()
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+
+    def latest(self):
+        """newest metrics as a dict, or None"""
+        sample = self.buffer.latest()
+        if sample is None:
+            return None
+        timestamp, values = sample
+        return dict(self.buffer.as_dict(values), timestamp=float(timestamp))
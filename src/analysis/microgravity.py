@@ -0,0 +1,258 @@
+import logging
+import threading
+import time
+
+import numpy as np
+
+from sensors.ring_buffer import RingBuffer
+from telemetry.sink import event
+
+logger = logging.getLogger(__name__)
+
+PULL_UP = "pull_up"
+MICRO_G_ENTRY = "micro_g_entry"
+MICRO_G_EXIT = "micro_g_exit"
+PULL_OUT = "pull_out"
+EVENTS = (PULL_UP, MICRO_G_ENTRY, MICRO_G_EXIT, PULL_OUT)
+
+LEVEL = "level"
+HYPER = "hyper"
+MICRO = "micro"
+
+
+class MicrogravityDetector:
+    """
+    parabolic flight phases from the accelerometer stream
+
+    every sample's magnitude |a| is averaged over the last window_s of
+    samples (a time window, so irregular sampling is fine), and the
+    average drives a hysteresis state machine:
+
+    - level -> hyper when it rises above hyper_enter_g: pull_up, or
+      pull_out after a micro-g phase
+    - hyper -> level when it falls below hyper_exit_g
+    - any -> micro when it falls below micro_enter_g: micro_g_entry
+    - micro -> level when it rises above micro_exit_g: micro_g_exit
+
+    the filter and threshold checks are numpy over the whole batch - the
+    python state machine only runs at the few samples where a threshold
+    comparison changes. process() is the pure streaming core (the
+    benchmark feeds it recorded or simulated profiles); start() runs it on
+    a thread that reads new samples from the accelerometer's ring buffer.
+
+    events go to the listeners (callback(name, timestamp, magnitude_g)),
+    to the telemetry log and into `events` for the flight recording.
+    """
+
+    def __init__(
+        self,
+        buffer=None,
+        window_s=0.2,
+        micro_enter_g=0.1,
+        micro_exit_g=0.3,
+        hyper_enter_g=1.6,
+        hyper_exit_g=1.3,
+        poll_s=0.02,
+        fields=("x_g", "y_g", "z_g"),
+    ):
+        """
+        args:
+            buffer: accelerometer RingBuffer to follow (only for start())
+            window_s: moving-average window on |a| (s)
+            micro_enter_g, micro_exit_g: micro-g hysteresis band
+            hyper_enter_g, hyper_exit_g: hyper-g hysteresis band
+            poll_s: how often the thread reads new samples
+            fields: the buffer's x, y, z columns
+        """
+        if not micro_enter_g < micro_exit_g < hyper_exit_g < hyper_enter_g:
+            raise ValueError(
+                "thresholds must satisfy micro_enter < micro_exit < hyper_exit < hyper_enter"
+            )
+        self.buffer = buffer
+        self.window_s = window_s
+        self.micro_enter_g = micro_enter_g
+        self.micro_exit_g = micro_exit_g
+        self.hyper_enter_g = hyper_enter_g
+        self.hyper_exit_g = hyper_exit_g
+        self.poll_s = poll_s
+        self._columns = (
+            [buffer.column(f) for f in fields] if buffer is not None else [0, 1, 2]
+        )
+
+        self.phase = LEVEL
+        self.magnitude_g = None  # latest filtered |a|
+        self.events = RingBuffer(("event", "magnitude_g", "delay_ms"), capacity=256)
+        self._listeners = []
+        self._after_micro = False
+        self._tail_t = np.empty(0)
+        self._tail_m = np.empty(0)
+        self._last_code = None
+
+        self._cursor = buffer.count if buffer is not None else 0
+        self._wake = threading.Event()
+        self._stop_event = threading.Event()
+        self._thread = None
+        self.samples = 0
+        self.dropped = 0
+
+    def add_listener(self, callback):
+        """callback(name, timestamp, magnitude_g) on every phase event (detector thread)"""
+        self._listeners.append(callback)
+
+    def reset(self):
+        self.phase = LEVEL
+        self.magnitude_g = None
+        self._after_micro = False
+        self._tail_t = np.empty(0)
+        self._tail_m = np.empty(0)
+        self._last_code = None
+
+    # ---------- streaming core ----------
+
+    def filter(self, timestamps, magnitudes):
+        """moving average of |a| over window_s for each new sample, continuing the last batch"""
+        all_t = np.concatenate([self._tail_t, timestamps])
+        all_m = np.concatenate([self._tail_m, magnitudes])
+        sums = np.concatenate([[0.0], np.cumsum(all_m)])
+        new = np.arange(len(self._tail_t), len(all_t))
+        first = np.searchsorted(all_t, all_t[new] - self.window_s, side="right")
+        filtered = (sums[new + 1] - sums[first]) / (new + 1 - first)
+
+        keep = np.searchsorted(all_t, all_t[-1] - self.window_s, side="right")
+        self._tail_t = all_t[keep:]
+        self._tail_m = all_m[keep:]
+        return filtered
+
+    def process(self, timestamps, xyz, now=None):
+        """
+        feed a batch of samples - returns the [(name, timestamp, magnitude_g)] events
+
+        args:
+            timestamps: sample times (s, increasing)
+            xyz: (n, 3) accelerations in g
+            now: processing time used for the reported delay (default: monotonic now)
+        """
+        timestamps = np.asarray(timestamps, dtype=np.float64)
+        if len(timestamps) == 0:
+            return []
+        xyz = np.asarray(xyz, dtype=np.float64)
+        filtered = self.filter(timestamps, np.sqrt(np.einsum("ij,ij->i", xyz, xyz)))
+        self.samples += len(timestamps)
+        self.magnitude_g = float(filtered[-1])
+
+        # which side of every threshold each sample is on
+        code = (
+            (filtered < self.micro_enter_g).astype(np.int8)
+            | (filtered > self.micro_exit_g) << 1
+            | (filtered > self.hyper_enter_g) << 2
+            | (filtered < self.hyper_exit_g) << 3
+        )
+        previous = -1 if self._last_code is None else self._last_code
+        changes = np.flatnonzero(np.diff(code, prepend=previous))
+        self._last_code = int(code[-1])
+
+        found = []
+        for i in changes:
+            for name in self._step(filtered[i]):
+                found.append((name, float(timestamps[i]), float(filtered[i])))
+
+        if found:
+            now = time.monotonic() if now is None else now
+            for name, timestamp, magnitude in found:
+                self._emit(name, timestamp, magnitude, now)
+        return found
+
+    def _step(self, g):
+        """advance the state machine on one filtered value, yielding event names"""
+        while True:
+            if self.phase != MICRO and g < self.micro_enter_g:
+                self.phase = MICRO
+                yield MICRO_G_ENTRY
+            elif self.phase == MICRO and g > self.micro_exit_g:
+                self.phase = LEVEL
+                self._after_micro = True
+                yield MICRO_G_EXIT
+            elif self.phase == LEVEL and g > self.hyper_enter_g:
+                self.phase = HYPER
+                yield PULL_OUT if self._after_micro else PULL_UP
+                self._after_micro = False
+            elif self.phase == HYPER and g < self.hyper_exit_g:
+                self.phase = LEVEL
+            else:
+                return
+
+    def _emit(self, name, timestamp, magnitude, now):
+        delay_ms = (now - timestamp) * 1000
+        self.events.append(timestamp, (EVENTS.index(name), magnitude, delay_ms))
+        event(
+            logger,
+            f"microgravity.{name}",
+            msg=f"{name} at {magnitude:.2f} g",
+            magnitude_g=round(magnitude, 3),
+            delay_ms=round(delay_ms, 1),
+        )
+        for callback in self._listeners:
+            try:
+                callback(name, timestamp, magnitude)
+            except Exception:
+                logger.exception("microgravity listener failed on %s", name)
+
+    # ---------- detector thread ----------
+
+    def update(self):
+        """process the samples that arrived since the last call"""
+        timestamps, values, self._cursor, dropped = self.buffer.read_since(self._cursor)
+        self.dropped += dropped
+        return self.process(timestamps, values[:, self._columns])
+
+    def wake(self, *args):
+        """process now - usable directly as an acquisition listener"""
+        self._wake.set()
+
+    def _loop(self):
+        while not self._stop_event.is_set():
+            self._wake.wait(self.poll_s)
+            self._wake.clear()
+            try:
+                self.update()
+            except Exception:
+                logger.exception("microgravity detector update failed")
+
+    def start(self):
+        if self.buffer is None:
+            raise RuntimeError("no accelerometer buffer to follow")
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._cursor = self.buffer.count
+        self.reset()
+        self._stop_event.clear()
+        self._thread = threading.Thread(
+            target=self._loop, name="microgravity", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+        self._wake.set()
+        if self._thread:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+
+    def stats(self):
+        return {
+            "phase": self.phase,
+            "magnitude_g": (
+                None if self.magnitude_g is None else round(self.magnitude_g, 3)
+            ),
+            "samples": self.samples,
+            "dropped": self.dropped,
+            "events": self.events.count,
+        }
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+        return False
@@ -0,0 +1,290 @@
+"""
+run the benchmark suites and check them against the stored baseline
+
+run from src/:  python3 -m benchmarks [--only sensors motor ...] [--json out.json]
+                python3 -m benchmarks --update-baseline
+                python3 -m benchmarks --real          # on the pi, real hardware
+
+every suite runs against the simulated hardware unless --real is given.
+the results go out as one json document (--json, "-" for stdout), are
+flattened to dotted keys ("sensors.PressureSensor_0.p99_us") and the
+gated ones are compared with the baseline for the same hardware
+(benchmarks/baselines/sim.json or real.json): a latency more than its
+slack above the baseline, a rate below it, or any new error, miss or
+false trigger is a regression and the exit status is 1. suites that
+cannot run here (the camera without a display) are reported skipped.
+--update-baseline stores this run's figures for the suites it ran.
+"""
+
+import argparse
+import fnmatch
+import json
+import logging
+import os
+import platform
+import sys
+import time
+import traceback
+
+from benchmarks.common import select_hardware
+
+BASELINE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines")
+
+# key pattern -> (better, relative slack, absolute slack). a figure
+# regresses when it is worse than baseline * (1 +- rel) +- abs; the
+# absolute part keeps near-zero baselines from failing on noise
+GATES = {
+    "sensors.*.p50_us": ("lower", 0.5, 100),
+    "sensors.*.p99_us": ("lower", 2.0, 5000),
+    "sensors.*.errors": ("lower", 0.0, 0),
+    "motor.moves.*.achieved_hz": ("higher", 0.1, 0),
+    "motor.moves.*.overhead_ms": ("lower", 1.0, 5),
+    "motor.moves.*.tick_jitter.p99_us": ("lower", 1.0, 20),
+    "motor.goto.*.settle_ms": ("lower", 0.25, 20),
+    "interlock.*.p99_ms": ("lower", 1.0, 2),
+    "interlock.*.max_ms": ("lower", 1.0, 10),
+    "interlock.*.missed": ("lower", 0.0, 0),
+    "camera.*.p99_ms": ("lower", 0.5, 20),
+    "camera.*.fps": ("higher", 0.2, 0),
+    "growth.*.mean_ms": ("lower", 0.5, 1),
+    "microgravity.events.*.missed": ("lower", 0.0, 0),
+    "microgravity.events.*.p95_ms": ("lower", 0.25, 50),
+    "microgravity.false_triggers": ("lower", 0.0, 0),
+    "startup.sampling_s": ("lower", 0.5, 0.5),
+}
+
+
+def _sensors():
+    from benchmarks import sensor_reads
+
+    return sensor_reads.run()
+
+
+def _motor():
+    from benchmarks import motor
+
+    return motor.run()
+
+
+def _interlock():
+    from benchmarks import interlock
+
+    return interlock.run()
+
+
+def _camera():
+    from benchmarks import camera
+
+    return camera.run()
+
+
+def _growth():
+    from benchmarks import growth
+
+    return growth.run(frames=100)
+
+
+def _microgravity():
+    from benchmarks import microgravity
+
+    return microgravity.run(flights=3)
+
+
+def _startup():
+    from benchmarks import startup
+
+    import_s, _ = startup.import_profile("mswua")
+    sampling_s = startup.time_to_sampling()
+    return {
+        "import_s": round(import_s, 3),
+        "sampling_s": round(sampling_s, 3) if sampling_s is not None else None,
+        "budget_s": startup.STARTUP_BUDGET_S,
+    }
+
+
+SUITES = {
+    "sensors": _sensors,
+    "motor": _motor,
+    "interlock": _interlock,
+    "camera": _camera,
+    "growth": _growth,
+    "microgravity": _microgravity,
+    "startup": _startup,
+}
+
+
+def flatten(results, prefix=""):
+    """{dotted key: number} of every numeric figure in a nested result"""
+    flat = {}
+    for key, value in results.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flat.update(flatten(value, name + "."))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[name] = value
+    return flat
+
+
+def gate(key):
+    """the GATES entry for a dotted key, or None if it is not checked"""
+    return next(
+        (g for pattern, g in GATES.items() if fnmatch.fnmatchcase(key, pattern)), None
+    )
+
+
+def compare(results, baseline, tolerance=1.0):
+    """
+    gated figures that got worse than the baseline
+
+    returns ([(key, value, baseline value, limit)], figures checked); a
+    gated figure the baseline has but this run lacks is reported with
+    value None. suites this run skipped are not compared.
+    """
+    ran = {name for name, result in results.items() if "skipped" not in result}
+    current = flatten({name: results[name] for name in ran})
+    regressions = []
+    checked = 0
+    for key, base in sorted(flatten(baseline).items()):
+        rule = gate(key)
+        if rule is None or key.split(".", 1)[0] not in ran:
+            continue
+        checked += 1
+        better, rel, absolute = rule
+        value = current.get(key)
+        if better == "lower":
+            limit = base * (1 + rel * tolerance) + absolute
+            worse = value is None or value > limit
+        else:
+            limit = base * (1 - rel * tolerance) - absolute
+            worse = value is None or value < limit
+        if worse:
+            regressions.append((key, value, base, round(limit, 3)))
+    return regressions, checked
+
+
+def run(suites):
+    """{suite: results}; a suite that raises gets {"error": ...}"""
+    results = {}
+    for name in suites:
+        began = time.monotonic()
+        print(f"running {name}...", file=sys.stderr, flush=True)
+        try:
+            results[name] = SUITES[name]()
+        except Exception as e:
+            traceback.print_exc()
+            results[name] = {"error": f"{e.__class__.__name__}: {e}"}
+        print(f"  {name} done in {time.monotonic() - began:.1f} s", file=sys.stderr)
+    return results
+
+
+def _meta(hardware):
+    return {
+        "hardware": hardware,
+        "host": platform.node(),
+        "machine": platform.machine(),
+        "python": platform.python_version(),
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--only", nargs="+", choices=list(SUITES), help="suites to run")
+    parser.add_argument("--skip", nargs="+", choices=list(SUITES), default=[])
+    parser.add_argument("--json", help="write the results here ('-' for stdout)")
+    parser.add_argument(
+        "--baseline", help="baseline file (default baselines/<hardware>.json)"
+    )
+    parser.add_argument(
+        "--update-baseline",
+        action="store_true",
+        help="store this run as the baseline for the suites it ran",
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=1.0,
+        help="scale every relative slack, e.g. 2 on a loaded machine",
+    )
+    parser.add_argument(
+        "--real", action="store_true", help="benchmark the real hardware"
+    )
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(
+        level=logging.WARNING, format="%(levelname)s %(name)s: %(message)s"
+    )
+    hardware = select_hardware(args.real)
+    suites = [name for name in (args.only or SUITES) if name not in args.skip]
+    document = {"meta": _meta(hardware), "results": run(suites)}
+    results = document["results"]
+
+    baseline_path = args.baseline or os.path.join(BASELINE_DIR, f"{hardware}.json")
+    baseline = {"meta": None, "results": {}}
+    if os.path.exists(baseline_path):
+        with open(baseline_path) as f:
+            baseline = json.load(f)
+
+    errors = [name for name, result in results.items() if "error" in result]
+    regressions, checked = compare(results, baseline["results"], args.tolerance)
+    document["regressions"] = [
+        {"key": key, "value": value, "baseline": base, "limit": limit}
+        for key, value, base, limit in regressions
+    ]
+
+    if args.json == "-":
+        json.dump(document, sys.stdout, indent=2)
+        print()
+    elif args.json:
+        with open(args.json, "w") as f:
+            json.dump(document, f, indent=2)
+
+    for name, result in results.items():
+        if "skipped" in result:
+            print(f"{name}: skipped ({result['skipped']})", file=sys.stderr)
+        elif "error" in result:
+            print(f"{name}: failed ({result['error']})", file=sys.stderr)
+
+    if args.update_baseline:
+        ran = {
+            k: v for k, v in results.items() if "skipped" not in v and "error" not in v
+        }
+        baseline["results"].update(ran)
+        baseline["meta"] = document["meta"]
+        os.makedirs(os.path.dirname(os.path.abspath(baseline_path)), exist_ok=True)
+        with open(baseline_path, "w") as f:
+            json.dump(baseline, f, indent=2)
+            f.write("\n")
+        print(
+            f"baseline {baseline_path} updated: {', '.join(ran) or 'nothing'}",
+            file=sys.stderr,
+        )
+        return 1 if errors else 0
+
+    if not baseline["results"]:
+        print(
+            f"no baseline at {baseline_path} - run with --update-baseline",
+            file=sys.stderr,
+        )
+    elif baseline["meta"] and baseline["meta"].get("machine") != platform.machine():
+        print(
+            f"note: baseline was taken on {baseline['meta'].get('machine')}, "
+            f"this is {platform.machine()}",
+            file=sys.stderr,
+        )
+    for key, value, base, limit in regressions:
+        shown = "missing" if value is None else value
+        print(
+            f"REGRESSION {key}: {shown} (baseline {base}, limit {limit})",
+            file=sys.stderr,
+        )
+    print(
+        f"{len(regressions)} regressions in {checked} gated figures, "
+        f"{len(errors)} failed suites",
+        file=sys.stderr,
+    )
+    return 1 if regressions or errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
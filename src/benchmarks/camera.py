@@ -0,0 +1,110 @@
+"""
+camera frame-to-screen latency of the dashboard preview
+
+run from src/:  python3 -m benchmarks.camera [--seconds S] [--real]
+
+opens the configured cameras (simulated unless --real) into
+CameraPreview canvases of the dashboard's size and runs the tk loop.
+latency is from the frame's sensor timestamp to its PhotoImage paste on
+the ui thread - conversion, the hand-over queues and tk's poll included,
+the display's own scan-out not. frames the preview dropped because the
+ui was behind are counted. needs a display; without one the suite
+reports itself skipped.
+"""
+
+import argparse
+import sys
+import time
+
+from benchmarks.common import select_hardware, summary
+
+
+def run(seconds=5.0, topology=None):
+    """per-camera latency figures, or {"skipped": reason} without a display or cameras"""
+    import tkinter as tk
+
+    import drivers
+    from topology import load
+
+    topology = topology or load()
+    options = dict(topology.cameras)
+    indices = tuple(options.get("indices", (0, 1)))[:2]
+    if not options.get("enabled", True) or not indices:
+        return {"skipped": "no cameras configured"}
+    try:
+        root = tk.Tk()
+    except tk.TclError as e:
+        return {"skipped": f"no display: {e}"}
+
+    cameras = None
+    previews = {}
+    try:
+        preview_size = tuple(options.get("preview_size", (560, 420)))
+        try:
+            CameraPreview = drivers.load("CameraPreview")
+            cameras = drivers.create(
+                "CameraManager",
+                indices=indices,
+                preview_size=preview_size,
+                fps=options.get("fps", 30),
+            )
+        except Exception as e:
+            return {"skipped": f"cameras unavailable: {e}"}
+        for index in indices:
+            camera = cameras.get(index)
+            if camera is None:
+                continue
+            canvas = tk.Canvas(root, width=preview_size[0], height=preview_size[1])
+            canvas.pack(side="left")
+            previews[index] = preview = CameraPreview(canvas)
+            camera.add_preview_sink(preview.submit)
+            preview.start()
+        if not previews:
+            return {"skipped": "no camera connected"}
+
+        cameras.start()
+        began = time.monotonic()
+        root.after(int(seconds * 1000), root.quit)
+        root.mainloop()
+        elapsed = time.monotonic() - began
+
+        results = {}
+        for index, preview in previews.items():
+            stats = preview.stats()
+            results[str(index)] = dict(
+                summary(list(preview.latencies), digits=1),
+                shown=stats["shown"],
+                fps=round(stats["shown"] / elapsed, 1),
+                dropped=stats["dropped"],
+            )
+        return results
+    finally:
+        for preview in previews.values():
+            preview.stop()
+        if cameras is not None:
+            cameras.close()
+        root.destroy()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--real", action="store_true", help="use the real cameras")
+    args = parser.parse_args(argv)
+
+    select_hardware(args.real)
+    results = run(args.seconds)
+    if "skipped" in results:
+        print(f"skipped: {results['skipped']}")
+        return 0
+    for index, result in results.items():
+        print(
+            f"camera {index}: {result['fps']:5.1f} fps shown, latency p50 {result['p50_ms']:6.1f} ms  "
+            f"p99 {result['p99_ms']:6.1f} ms  max {result['max_ms']:6.1f} ms  "
+            f"dropped {result['dropped']}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
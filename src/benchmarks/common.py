@@ -0,0 +1,67 @@
+"""
+helpers shared by the benchmark suites: hardware selection and latency summaries
+"""
+
+import numpy as np
+
+# upper edges (us) of the latency histogram bins, 1-2-5 per decade
+HISTOGRAM_EDGES_US = (
+    10,
+    20,
+    50,
+    100,
+    200,
+    500,
+    1_000,
+    2_000,
+    5_000,
+    10_000,
+    20_000,
+    50_000,
+    100_000,
+    200_000,
+    500_000,
+    1_000_000,
+)
+
+
+def select_hardware(real=False):
+    """
+    run the drivers against the simulator unless real is set
+
+    must be called before any driver is imported; the simulator is also
+    used when MSW_SIMULATE=true, whatever real says.
+    """
+    from sim import backend
+
+    if not real or backend.is_enabled():
+        backend.install()
+        return "sim"
+    return "real"
+
+
+def histogram(seconds):
+    """{upper edge in us: count} of the non-empty bins, "more" past the last edge"""
+    us = np.asarray(seconds, dtype=np.float64) * 1e6
+    edges = np.asarray(HISTOGRAM_EDGES_US, dtype=np.float64)
+    counts = np.bincount(
+        np.searchsorted(edges, us, side="left"), minlength=len(edges) + 1
+    )
+    uppers = [str(edge) for edge in HISTOGRAM_EDGES_US] + ["more"]
+    return {upper: int(n) for upper, n in zip(uppers, counts) if n}
+
+
+def summary(seconds, unit="ms", digits=3):
+    """count, mean, p50, p90, p99 and max of a list of durations, in ms or us"""
+    values = np.asarray(seconds, dtype=np.float64) * (1e3 if unit == "ms" else 1e6)
+    if not len(values):
+        return {"count": 0}
+    p50, p90, p99 = np.percentile(values, (50, 90, 99))
+    return {
+        "count": len(values),
+        f"mean_{unit}": round(float(values.mean()), digits),
+        f"p50_{unit}": round(float(p50), digits),
+        f"p90_{unit}": round(float(p90), digits),
+        f"p99_{unit}": round(float(p99), digits),
+        f"max_{unit}": round(float(values.max()), digits),
+    }
@@ -0,0 +1,82 @@
+"""
+per-frame cost of the growth analysis
+
+run from src/:  python3 -m benchmarks.growth [--frames N]
+
+times GrowthAnalyzer.analyze on synthetic culture frames at the preview
+and full-res stream sizes and checks the cost against the 30 fps frame
+budget. the numbers are for one core; the stage runs on its own thread.
+"""
+
+import argparse
+import sys
+import time
+
+import numpy as np
+
+from analysis.growth import GrowthAnalyzer
+
+FRAME_BUDGET_MS = 1000 / 30
+SIZES = {"preview": (560, 420), "full": (1920, 1080)}
+
+
+def synthetic_frame(size, rng):
+    """green culture band with noise, a bright bubble and a meniscus edge"""
+    width, height = size
+    frame = rng.integers(20, 40, (height, width, 3), dtype=np.uint8)
+    frame[height // 3 : 2 * height // 3, :, 1] += 100
+    frame[int(height * 0.45) : int(height * 0.55), width // 2 :, :] = 220
+    frame[int(height * 0.45) : int(height * 0.55), width // 5 : width // 5 + 8, :] = 250
+    return frame
+
+
+def bench(size, frames=300, downsample=4):
+    """timing stats in ms for analyze() on frames of `size`"""
+    rng = np.random.default_rng(0)
+    pool = [synthetic_frame(size, rng) for _ in range(8)]
+    analyzer = GrowthAnalyzer(downsample=downsample)
+    for frame in pool:  # warm up
+        analyzer.analyze(frame)
+
+    times = np.empty(frames)
+    for i in range(frames):
+        frame = pool[i % len(pool)]
+        t0 = time.perf_counter()
+        analyzer.analyze(frame)
+        times[i] = time.perf_counter() - t0
+    times *= 1000
+    mean = float(times.mean())
+    return {
+        "size": f"{size[0]}x{size[1]}",
+        "downsample": downsample,
+        "mean_ms": round(mean, 3),
+        "p99_ms": round(float(np.percentile(times, 99)), 3),
+        "max_fps": round(1000 / mean, 1),
+        "budget_used": round(mean / FRAME_BUDGET_MS, 4),
+    }
+
+
+def run(frames=300):
+    return {name: bench(size, frames) for name, size in SIZES.items()}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--frames", type=int, default=300)
+    args = parser.parse_args(argv)
+
+    results = run(args.frames)
+    ok = True
+    for name, result in results.items():
+        print(
+            f"{name:8s} {result['size']:>9s}/{result['downsample']}: "
+            f"mean {result['mean_ms']:.3f} ms  p99 {result['p99_ms']:.3f} ms  "
+            f"-> {result['max_fps']:.0f} fps max, "
+            f"{result['budget_used'] * 100:.1f}% of the 30 fps budget"
+        )
+        ok = ok and result["p99_ms"] < FRAME_BUDGET_MS
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,137 @@
+"""
+interlock reaction time from an overpressure sample to the actions done
+
+run from src/:  python3 -m benchmarks.interlock [--trials N] [--real]
+
+arms an Interlock with an overpressure Threshold on a pressure ring
+buffer, the way the dashboard does, with the configured valve's close()
+as its action (the simulated valve unless --real), then writes one
+over-limit sample per trial at a random phase of the poll and times
+until the last action has run. "wake" trials call wake() after the
+sample, as the acquisition listener does; "poll" trials leave it to the
+poll_s timer, the bound when a wake is missed. the interlock's own
+detect/actuate split comes from its trips log.
+"""
+
+import argparse
+import logging
+import sys
+import threading
+import time
+
+import numpy as np
+
+from benchmarks.common import select_hardware, summary
+
+LIMIT_PSI = 22.5
+
+
+def bench(wake=True, trials=100, actions=(), poll_s=0.005, seed=0):
+    """reaction times (s) and the trips log figures for one wake mode"""
+    from control.interlock import Interlock, Threshold
+    from sensors.ring_buffer import RingBuffer
+
+    rng = np.random.default_rng(seed)
+    buffer = RingBuffer(("pressure_psi",), capacity=1024)
+    buffer.append(time.monotonic(), (14.7,))
+    interlock = Interlock(poll_s=poll_s)
+    interlock.add_rule(
+        Threshold(buffer, "pressure_psi", high=LIMIT_PSI, name="overpressure")
+    )
+    for name, action in actions:
+        interlock.add_action(name, action)
+
+    done = threading.Event()
+    marks = []
+
+    def mark():
+        marks.append(time.monotonic())
+        done.set()
+
+    interlock.add_action("benchmark.mark", mark)
+
+    reactions = []
+    missed = 0
+    with interlock:
+        for _ in range(trials):
+            interlock.reset()
+            done.clear()
+            time.sleep(rng.uniform(0, 2 * poll_s))
+            sample_time = time.monotonic()
+            buffer.append(sample_time, (LIMIT_PSI * 1.2,))
+            if wake:
+                interlock.wake()
+            if not done.wait(1.0):
+                missed += 1
+                continue
+            reactions.append(marks[-1] - sample_time)
+            # the trip is latched just after the actions - wait before re-arming
+            while interlock.tripped is None:
+                time.sleep(0.0002)
+            buffer.append(time.monotonic(), (14.7,))
+
+    _, trips = interlock.trips.last(len(reactions))
+    return dict(
+        summary(reactions),
+        missed=missed,
+        detect=summary(trips[:, 2] / 1000),
+        actuate=summary(trips[:, 3] / 1000),
+        realtime=interlock.realtime,
+    )
+
+
+def configured_actions(topology=None):
+    """(name, action) for the configured valve, or none if it is unavailable"""
+    from topology import load
+
+    topology = topology or load()
+    try:
+        valve = topology.create_actuator("valve")
+    except Exception as e:
+        logging.getLogger(__name__).warning("benchmarking without the valve: %s", e)
+        return []
+    return [("valve.close", valve.close)]
+
+
+def run(trials=100, poll_s=0.005, topology=None):
+    """reaction time with and without wake() on the sample"""
+    actions = configured_actions(topology)
+    # a critical log line per trip would swamp the console
+    interlock_logger = logging.getLogger("control.interlock")
+    quiet, interlock_logger.disabled = interlock_logger.disabled, True
+    try:
+        return {
+            "wake": bench(True, trials, actions, poll_s),
+            "poll": bench(False, trials, actions, poll_s),
+            "poll_s": poll_s,
+        }
+    finally:
+        interlock_logger.disabled = quiet
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--trials", type=int, default=100)
+    parser.add_argument("--poll", type=float, default=0.005, help="interlock poll_s")
+    parser.add_argument(
+        "--budget", type=float, default=50.0, help="reaction budget (ms)"
+    )
+    parser.add_argument("--real", action="store_true", help="close the real valve")
+    args = parser.parse_args(argv)
+
+    select_hardware(args.real)
+    results = run(args.trials, args.poll)
+    ok = True
+    for mode in ("wake", "poll"):
+        result = results[mode]
+        print(
+            f"{mode:5s}: reaction p50 {result['p50_ms']:6.2f} ms  p99 {result['p99_ms']:6.2f} ms  "
+            f"max {result['max_ms']:6.2f} ms  (detect p99 {result['detect']['p99_ms']:.2f}, "
+            f"actuate p99 {result['actuate']['p99_ms']:.2f})  missed {result['missed']}"
+        )
+        ok &= result["missed"] == 0 and result["max_ms"] <= args.budget
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
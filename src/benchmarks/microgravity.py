@@ -0,0 +1,174 @@
+"""
+latency and false triggers of the microgravity phase detector
+
+run from src/:  python3 -m benchmarks.microgravity [--flights N] [--rate HZ]
+                python3 -m benchmarks.microgravity --recording flight.msw [--channel NAME]
+
+feeds MicrogravityDetector simulated parabolic flights (sim.parabola, with
+vibration, noise and turbulence bumps) in 20 ms batches, as the live
+detector thread sees them, and scores every event against the profile's
+true transition times: latency per event type, missed transitions and
+false triggers per flight hour. with --recording it replays the
+accelerometer channel of a flight recording and lists the events.
+"""
+
+import argparse
+import sys
+import time
+
+import numpy as np
+
+from analysis.microgravity import EVENTS, MicrogravityDetector
+from sim.parabola import ParabolaProfile
+
+BATCH_S = 0.02
+MATCH_WINDOW_S = (-2.0, 4.0)  # detected - true time that still counts as a hit
+
+
+def replay(detector, timestamps, xyz, batch_s=BATCH_S):
+    """feed samples in live-sized batches - returns (events, seconds spent)"""
+    edges = np.searchsorted(
+        timestamps, np.arange(timestamps[0], timestamps[-1] + batch_s, batch_s)
+    )
+    edges = np.append(edges, len(timestamps))
+    found = []
+    began = time.perf_counter()
+    for lo, hi in zip(edges[:-1], edges[1:]):
+        if hi > lo:
+            found += detector.process(
+                timestamps[lo:hi], xyz[lo:hi], now=timestamps[hi - 1]
+            )
+    return found, time.perf_counter() - began
+
+
+def score(found, transitions):
+    """match detected events to true transitions of the same name"""
+    latencies = {name: [] for name in EVENTS}
+    missed = {name: 0 for name in EVENTS}
+    used = set()
+    for true_t, name in transitions:
+        hit = None
+        for i, (found_name, t, _) in enumerate(found):
+            if i in used or found_name != name:
+                continue
+            if MATCH_WINDOW_S[0] <= t - true_t <= MATCH_WINDOW_S[1]:
+                hit = i
+                break
+        if hit is None:
+            missed[name] += 1
+        else:
+            used.add(hit)
+            latencies[name].append(found[hit][1] - true_t)
+    false = len(found) - len(used)
+    return latencies, missed, false
+
+
+def run(flights=10, parabolas=5, rate_hz=50.0, jitter_s=0.002, **detector_kwargs):
+    """score the detector on simulated flights with different noise seeds"""
+    latencies = {name: [] for name in EVENTS}
+    missed = {name: 0 for name in EVENTS}
+    false = 0
+    samples = 0
+    spent = 0.0
+    hours = 0.0
+    for seed in range(flights):
+        profile = ParabolaProfile(parabolas=parabolas, seed=seed)
+        rng = np.random.default_rng(seed)
+        timestamps = np.arange(0.0, profile.duration_s, 1.0 / rate_hz)
+        timestamps = np.sort(timestamps + rng.normal(0.0, jitter_s, len(timestamps)))
+        xyz = np.round(profile.sample(timestamps), 2)  # the driver's 0.01 g resolution
+
+        detector = MicrogravityDetector(**detector_kwargs)
+        found, seconds = replay(detector, timestamps, xyz)
+        lat, miss, fp = score(found, profile.transitions)
+        for name in EVENTS:
+            latencies[name] += lat[name]
+            missed[name] += miss[name]
+        false += fp
+        samples += len(timestamps)
+        spent += seconds
+        hours += profile.duration_s / 3600
+
+    events = {}
+    for name in EVENTS:
+        ms = np.asarray(latencies[name]) * 1000
+        events[name] = {
+            "detected": len(ms),
+            "missed": missed[name],
+            "mean_ms": round(float(ms.mean()), 1) if len(ms) else None,
+            "p95_ms": round(float(np.percentile(ms, 95)), 1) if len(ms) else None,
+            "max_ms": round(float(ms.max()), 1) if len(ms) else None,
+        }
+    return {
+        "flights": flights,
+        "parabolas": flights * parabolas,
+        "rate_hz": rate_hz,
+        "events": events,
+        "false_triggers": false,
+        "false_per_hour": round(false / hours, 2),
+        "us_per_sample": round(spent / samples * 1e6, 2),
+    }
+
+
+def replay_recording(path, channel=None, **detector_kwargs):
+    """events found in a flight recording's accelerometer channel"""
+    from telemetry.recorder import load_recording
+
+    _, channels = load_recording(path)
+    if channel is None:
+        channel = next(
+            (name for name, data in channels.items() if "z_g" in data.dtype.names), None
+        )
+        if channel is None:
+            raise ValueError(f"{path} has no accelerometer channel")
+    data = channels[channel]
+    xyz = np.column_stack([data["x_g"], data["y_g"], data["z_g"]]).astype(np.float64)
+    detector = MicrogravityDetector(**detector_kwargs)
+    found, _ = replay(detector, data["timestamp"], xyz)
+    return channel, found
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--flights", type=int, default=10)
+    parser.add_argument("--parabolas", type=int, default=5)
+    parser.add_argument(
+        "--rate", type=float, default=50.0, help="accelerometer rate (Hz)"
+    )
+    parser.add_argument("--window", type=float, default=0.2, help="filter window (s)")
+    parser.add_argument("--recording", help="replay a flight recording instead")
+    parser.add_argument("--channel", help="accelerometer channel in the recording")
+    args = parser.parse_args(argv)
+
+    if args.recording:
+        channel, found = replay_recording(
+            args.recording, args.channel, window_s=args.window
+        )
+        print(f"{args.recording} [{channel}]: {len(found)} events")
+        for name, t, magnitude in found:
+            print(f"  {t:12.3f}  {name:14s} {magnitude:.2f} g")
+        return 0
+
+    result = run(args.flights, args.parabolas, args.rate, window_s=args.window)
+    print(
+        f"{result['parabolas']} parabolas at {result['rate_hz']:g} Hz, "
+        f"{result['us_per_sample']:.1f} us per sample"
+    )
+    for name, stats in result["events"].items():
+        if stats["detected"]:
+            print(
+                f"  {name:14s} latency mean {stats['mean_ms']:7.1f} ms  "
+                f"p95 {stats['p95_ms']:7.1f} ms  max {stats['max_ms']:7.1f} ms  "
+                f"missed {stats['missed']}"
+            )
+        else:
+            print(f"  {name:14s} never detected, missed {stats['missed']}")
+    print(
+        f"  false triggers: {result['false_triggers']} ({result['false_per_hour']:.2f} per hour)"
+    )
+    missed = sum(stats["missed"] for stats in result["events"].values())
+    return 0 if missed == 0 and result["false_triggers"] == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
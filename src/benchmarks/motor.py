@@ -0,0 +1,172 @@
+"""
+achieved step rate and step jitter of the stepper motor
+
+run from src/:  python3 -m benchmarks.motor [--steps 50 400 2000] [--real]
+
+plays fixed_steps() moves of a few lengths there and back and listens
+to the STEP pin with a pigpio callback. the rising-edge ticks give the
+achieved rate and how far each step period strays from the motion
+profile's; the wall clock gives the overhead over the planned duration
+(wave build, chain start, the busy poll). a closed-loop goto() there and
+back reports settle time, chunks and final error from last_move.
+
+on real hardware the ticks are pigpio's hardware timestamps. the
+simulator stamps edges with their scheduled times, so there the tick
+jitter is ideal and the callback arrival jitter (monotonic clock on the
+transmitter thread) is the figure to watch.
+"""
+
+import argparse
+import sys
+import threading
+import time
+
+import numpy as np
+
+from benchmarks.common import select_hardware, summary
+
+MOVES = (50, 400, 2000)
+GOTO_COUNTS = 1640  # 40 full steps of encoder counts
+
+
+class EdgeLog:
+    """rising STEP edges as (pigpio tick, monotonic arrival) pairs"""
+
+    def __init__(self, pi, pin):
+        import pigpio
+
+        self._lock = threading.Lock()
+        self.ticks = []
+        self.arrivals = []
+        self._callback = pi.callback(pin, pigpio.RISING_EDGE, self._on_edge)
+
+    def _on_edge(self, pin, level, tick):
+        now = time.monotonic()
+        with self._lock:
+            self.ticks.append(tick)
+            self.arrivals.append(now)
+
+    def take(self):
+        with self._lock:
+            ticks, arrivals = self.ticks, self.arrivals
+            self.ticks, self.arrivals = [], []
+        return np.asarray(ticks, dtype=np.int64), np.asarray(arrivals)
+
+    def cancel(self):
+        self._callback.cancel()
+
+
+def expected_periods_us(profile):
+    """STEP period before every edge after the first, as the profile plans them"""
+    periods = list(profile.ramp_us) + [profile.cruise_us] * profile.cruise_steps
+    periods += list(profile.ramp_us[::-1])
+    return np.asarray(periods[:-1], dtype=np.float64)
+
+
+def bench_move(motor, edges, steps):
+    """one fixed_steps(steps) move: rate, overhead and period errors"""
+    profile = motor.plan(steps)
+    edges.take()
+    began = time.monotonic()
+    motor.fixed_steps(steps)
+    wall = time.monotonic() - began
+    time.sleep(0.02)  # late callbacks
+    ticks, arrivals = edges.take()
+
+    result = {
+        "edges": len(ticks),
+        "planned_ms": round(profile.duration_s * 1000, 2),
+        "wall_ms": round(wall * 1000, 2),
+        "overhead_ms": round((wall - profile.duration_s) * 1000, 2),
+        "achieved_hz": round(steps / wall, 1),
+        "max_hz": motor.MAX_HZ,
+    }
+    expected = expected_periods_us(profile)
+    if len(ticks) == steps and steps > 1:
+        tick_periods = (np.diff(ticks) & 0xFFFFFFFF).astype(np.float64)
+        arrival_periods = np.diff(arrivals) * 1e6
+        result["tick_jitter"] = summary(
+            np.abs(tick_periods - expected) / 1e6, unit="us", digits=1
+        )
+        result["callback_jitter"] = summary(
+            np.abs(arrival_periods - expected) / 1e6, unit="us", digits=1
+        )
+    return result
+
+
+def bench_goto(motor, counts=GOTO_COUNTS):
+    """goto() there and back - settle time, chunks and error of each leg"""
+    start = motor.actual
+    legs = {}
+    for name, target in (("out", start + counts), ("back", start)):
+        move = motor.goto(target)
+        legs[name] = {
+            "settle_ms": round(move["settle_s"] * 1000, 1),
+            "chunks": move["chunks"],
+            "error_counts": move["error"],
+            "missed_steps": move["missed_steps"],
+            "settled": move["settled"],
+        }
+    return legs
+
+
+def run(moves=MOVES, topology=None):
+    """step rate and jitter of fixed_steps() moves and a goto() round trip"""
+    import pigpio
+
+    from topology import load
+
+    topology = topology or load()
+    pi = pigpio.pi()
+    if not pi.connected:
+        raise RuntimeError("pigpio daemon not running")
+    motor = topology.create_actuator("motor", pi=pi)
+    edges = EdgeLog(pi, motor.STEP_PIN)
+    try:
+        results = {"moves": {}}
+        for steps in moves:
+            results["moves"][str(steps)] = bench_move(motor, edges, steps)
+            motor.fixed_steps(-steps)  # back to where it started
+        results["goto"] = bench_goto(motor)
+        return results
+    finally:
+        edges.cancel()
+        motor.stop()
+        motor.clear_waves()
+        pi.stop()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--steps", type=int, nargs="+", default=list(MOVES))
+    parser.add_argument("--real", action="store_true", help="drive the real motor")
+    args = parser.parse_args(argv)
+
+    select_hardware(args.real)
+    results = run(args.steps)
+    ok = True
+    for steps, move in results["moves"].items():
+        print(
+            f"{steps:>5s} steps: {move['achieved_hz']:7.1f} Hz achieved "
+            f"(cruise {move['max_hz']} Hz), {move['wall_ms']:8.1f} ms for "
+            f"{move['planned_ms']:8.1f} ms planned, {move['edges']} edges"
+        )
+        for kind in ("tick_jitter", "callback_jitter"):
+            if kind in move:
+                jitter = move[kind]
+                print(
+                    f"        {kind:16s} p50 {jitter['p50_us']:7.1f} us  "
+                    f"p99 {jitter['p99_us']:7.1f} us  max {jitter['max_us']:7.1f} us"
+                )
+        ok &= move["edges"] == int(steps)
+    for name, leg in results["goto"].items():
+        print(
+            f"goto {name:4s}: {leg['settle_ms']:7.1f} ms, {leg['chunks']} chunks, "
+            f"error {leg['error_counts']} counts"
+        )
+        ok &= leg["settled"]
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,91 @@
+"""
+per-call latency of every configured sensor's read()
+
+run from src/:  python3 -m benchmarks.sensor_reads [--reads N] [--real]
+
+builds the enabled sensors of the topology (config/topology.json or
+$MSW_CONFIG) against the simulated hardware - or the real bus with
+--real - and times read() calls one after another with a short pause
+between them. this is the cost the acquisition scheduler pays per
+sample, not the sensor's own conversion time: the calls come faster than
+the flight rates. results are a log-spaced histogram plus percentiles
+per sensor; failed reads are counted, not timed.
+"""
+
+import argparse
+import sys
+import time
+
+from benchmarks.common import histogram, select_hardware, summary
+
+
+def bench(sensor, reads=300, interval_s=0.002):
+    """(durations in seconds, failed reads) for `reads` calls of sensor.read()"""
+    sensor.read()  # warm up: first transaction, lazy buffers
+    durations = []
+    errors = 0
+    for _ in range(reads):
+        began = time.perf_counter()
+        try:
+            sensor.read()
+        except Exception:
+            errors += 1
+        else:
+            durations.append(time.perf_counter() - began)
+        time.sleep(interval_s)
+    return durations, errors
+
+
+def run(reads=300, interval_s=0.002, topology=None):
+    """read latency per enabled sensor - blocking drivers only, async ones are skipped"""
+    from sensors.base_sensor import BaseSensor
+    from topology import load
+
+    topology = topology or load()
+    _, sensors = topology.build_acquisition()
+    results = {}
+    try:
+        for name, sensor in sensors.items():
+            if not isinstance(sensor, BaseSensor):
+                results[name] = {"skipped": "not a blocking BaseSensor"}
+                continue
+            durations, errors = bench(sensor, reads, interval_s)
+            results[name] = dict(
+                summary(durations, unit="us", digits=1),
+                errors=errors,
+                histogram_us=histogram(durations),
+            )
+    finally:
+        topology.disconnect(sensors)
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--reads", type=int, default=300)
+    parser.add_argument(
+        "--interval", type=float, default=0.002, help="pause between reads (s)"
+    )
+    parser.add_argument("--real", action="store_true", help="read the real sensors")
+    args = parser.parse_args(argv)
+
+    select_hardware(args.real)
+    results = run(args.reads, args.interval)
+    failed = False
+    for name, result in results.items():
+        if "skipped" in result:
+            print(f"{name:18s} skipped: {result['skipped']}")
+            continue
+        print(
+            f"{name:18s} p50 {result['p50_us']:8.1f} us  p99 {result['p99_us']:8.1f} us  "
+            f"max {result['max_us']:8.1f} us  errors {result['errors']}"
+        )
+        for upper, n in result["histogram_us"].items():
+            label = f"<= {upper} us" if upper != "more" else "longer"
+            print(f"    {label:>14s} {n:6d}")
+        failed |= result["errors"] > 0
+    return 1 if failed or not results else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,139 @@
+"""
+startup time: import cost and time until the first samples
+
+run from src/:  python3 -m benchmarks.startup [--module mswua] [--top 15] [--no-launch]
+
+imports the entry module in a fresh interpreter under -X importtime and
+lists the modules it imports directly, slowest (cumulative) first, then
+launches mswua.py against the simulated hardware and measures how long
+it takes from process start until acquisition is running. the budget is
+the "sampling within a couple of seconds of power-on" target; the venv
+activation and the run.sh requirements check come on top.
+"""
+
+import argparse
+import os
+import re
+import signal
+import subprocess
+import sys
+import time
+
+SRC = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STARTUP_BUDGET_S = 2.0
+READY_LINE = "all sensors started successfully"
+
+_IMPORTTIME = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)")
+
+
+def _env(simulate=True, **extra):
+    env = dict(os.environ, **extra)
+    if simulate:
+        env["MSW_SIMULATE"] = "true"
+    return env
+
+
+def import_profile(module, simulate=True):
+    """
+    import module under -X importtime
+
+    returns (wall seconds, [(cumulative_us, self_us, depth, name)]) in
+    importtime's order, depth 0 being the outermost imports.
+    """
+    began = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=SRC,
+        env=_env(simulate),
+        capture_output=True,
+        text=True,
+    )
+    wall = time.perf_counter() - began
+    if proc.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{proc.stderr[-2000:]}")
+    rows = []
+    for line in proc.stderr.splitlines():
+        match = _IMPORTTIME.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            rows.append((int(cumulative_us), int(self_us), len(indent) // 2, name))
+    return wall, rows
+
+
+def direct_imports(rows, module):
+    """the imports module itself makes, slowest first - (cumulative_us, self_us, name)"""
+    # importtime lists children before their parent, one indent level deeper
+    end = next(i for i, row in enumerate(rows) if row[2] == 0 and row[3] == module)
+    begin = end
+    while begin > 0 and rows[begin - 1][2] > 0:
+        begin -= 1
+    children = [(c, s, name) for c, s, depth, name in rows[begin:end] if depth == 1]
+    return sorted(children, reverse=True)
+
+
+def time_to_sampling(script="mswua.py", timeout_s=30.0, **env):
+    """seconds from launching the script (simulated hardware) until acquisition runs"""
+    with open(os.devnull, "w") as devnull:
+        began = time.perf_counter()
+        proc = subprocess.Popen(
+            [sys.executable, script],
+            cwd=SRC,
+            text=True,
+            env=_env(True, MSW_RECORD_DIR=os.path.join("/tmp", "msw_startup"), **env),
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            stdin=devnull,
+        )
+        ready = None
+        try:
+            deadline = began + timeout_s
+            for line in proc.stdout:
+                if READY_LINE in line:
+                    ready = time.perf_counter() - began
+                    break
+                if time.perf_counter() > deadline:
+                    break
+        finally:
+            proc.send_signal(signal.SIGINT)
+            try:
+                proc.wait(timeout=5.0)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+    return ready
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--module", default="mswua", help="entry module to profile")
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument(
+        "--real",
+        action="store_true",
+        help="import against the installed hardware libraries, not the simulator",
+    )
+    parser.add_argument(
+        "--no-launch", action="store_true", help="only profile the imports"
+    )
+    args = parser.parse_args(argv)
+
+    wall, rows = import_profile(args.module, simulate=not args.real)
+    total_us = sum(self_us for _, self_us, _, _ in rows)
+    print(
+        f"import {args.module}: {wall * 1000:.0f} ms wall "
+        f"(interpreter + {total_us / 1000:.0f} ms of imports, {len(rows)} modules)"
+    )
+    for cumulative_us, self_us, name in direct_imports(rows, args.module)[: args.top]:
+        print(f"  {cumulative_us / 1000:8.1f} ms  (self {self_us / 1000:6.1f})  {name}")
+
+    if args.no_launch:
+        return 0
+    ready = time_to_sampling()
+    if ready is None:
+        print("mswua.py did not start sampling")
+        return 1
+    print(f"mswua.py sampling after {ready:.2f} s (budget {STARTUP_BUDGET_S:.1f} s)")
+    return 0 if ready <= STARTUP_BUDGET_S else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,58 @@
+import threading
+
+
+class LatestFrameQueue:
+    """
+    single-slot, latest-frame-wins handoff between threads
+
+    put() never blocks: a frame that has not been taken yet is replaced and
+    counted as dropped, so a slow consumer sees the newest frame instead of
+    a growing backlog and latency stays bounded to one frame.
+    """
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._item = None
+        self._full = False
+        self._closed = False
+        self.put_count = 0
+        self.dropped = 0
+
+    def put(self, item):
+        with self._cond:
+            if self._full:
+                self.dropped += 1
+            self._item = item
+            self._full = True
+            self.put_count += 1
+            self._cond.notify()
+
+    def get(self, timeout=None):
+        """wait for the next frame - None on timeout or once closed"""
+        with self._cond:
+            self._cond.wait_for(lambda: self._full or self._closed, timeout)
+            return self._take()
+
+    def get_nowait(self):
+        with self._cond:
+            return self._take()
+
+    def _take(self):
+        if not self._full:
+            return None
+        item, self._item, self._full = self._item, None, False
+        return item
+
+    def close(self):
+        """wake any waiting consumer for shutdown"""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    def reopen(self):
+        """make a closed queue usable again, dropping any frame left in it"""
+        with self._cond:
+            self._item, self._full, self._closed = None, False, False
+
+    def stats(self):
+        return {"frames": self.put_count, "dropped": self.dropped}
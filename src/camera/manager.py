@@ -0,0 +1,227 @@
+import logging
+import os
+import threading
+import time
+
+from picamera2 import Picamera2
+from picamera2.encoders import H264Encoder
+from picamera2.outputs import FileOutput
+
+from sensors.ring_buffer import RingBuffer
+from telemetry.instrumentation import timed
+
+logger = logging.getLogger(__name__)
+
+
+class ManagedCamera:
+    """
+    one picamera2 sensor running a preview stream and a full-res stream
+
+    the camera is configured once for video with two streams: `lores` at
+    preview size feeds the preview sinks from the post_callback, and `main`
+    at full resolution feeds the h264 encoder while recording and stills.
+    the stream never stops for a still - it is taken from the next request.
+
+    frame timestamps are the sensor's SensorTimestamp, which libcamera
+    reports on CLOCK_MONOTONIC - the same clock as time.monotonic() and
+    so as every sensor sample. each frame is also logged into `frames`
+    (sequence number per timestamp) so it can go into the flight recording.
+    """
+
+    def __init__(
+        self,
+        index,
+        preview_size=(560, 420),
+        video_size=(1920, 1080),
+        fps=30,
+        bitrate=10_000_000,
+    ):
+        """
+        args:
+            index: camera number as listed by Picamera2.global_camera_info()
+            preview_size: lores stream size handed to the preview sinks
+            video_size: main stream size used for recording and stills
+            fps: frame rate of both streams
+            bitrate: h264 bitrate while recording
+        """
+        self.index = index
+        self.preview_size = tuple(preview_size)
+        self.video_size = tuple(video_size)
+        self.fps = fps
+        self.bitrate = bitrate
+
+        self.frames = RingBuffer(("sequence",), capacity=1024)
+        self.latest_timestamp = None
+        self.recording_path = None
+        self._sinks = []
+        self._sequence = 0
+        self._encoder = None
+        self._lock = threading.Lock()
+
+        self.picam2 = Picamera2(index)
+        frame_us = int(1_000_000 / fps)
+        self.picam2.configure(
+            self.picam2.create_video_configuration(
+                main={"size": self.video_size, "format": "RGB888"},
+                lores={"size": self.preview_size, "format": "RGB888"},
+                controls={"FrameDurationLimits": (frame_us, frame_us)},
+            )
+        )
+        self.picam2.post_callback = self._on_frame
+
+    def add_preview_sink(self, sink):
+        """call sink(frame, timestamp) with each lores frame (camera thread)"""
+        self._sinks.append(sink)
+
+    @staticmethod
+    def _timestamp(metadata):
+        sensor_ns = metadata.get("SensorTimestamp")
+        return sensor_ns / 1e9 if sensor_ns else time.monotonic()
+
+    @timed("camera.frame")
+    def _on_frame(self, request):
+        timestamp = self._timestamp(request.get_metadata())
+        self.latest_timestamp = timestamp
+        self.frames.append(timestamp, (self._sequence,))
+        self._sequence += 1
+        if self._sinks:
+            frame = request.make_array("lores")
+            for sink in self._sinks:
+                try:
+                    sink(frame, timestamp)
+                except Exception:
+                    logger.exception("preview sink failed on camera %d", self.index)
+
+    # ---------- streaming ----------
+
+    def start(self):
+        self.picam2.start()
+
+    def stop(self):
+        self.stop_recording()
+        self.picam2.stop()
+
+    def close(self):
+        self.stop()
+        self.picam2.close()
+
+    # ---------- recording and stills ----------
+
+    def start_recording(self, path):
+        """encode the full-res stream to an h264 file while the preview runs"""
+        with self._lock:
+            if self._encoder is not None:
+                raise RuntimeError(f"camera {self.index} is already recording")
+            encoder = H264Encoder(bitrate=self.bitrate)
+            self.picam2.start_encoder(encoder, FileOutput(path), name="main")
+            self._encoder = encoder
+            self.recording_path = path
+        logger.info("camera %d recording to %s", self.index, path)
+
+    def stop_recording(self):
+        with self._lock:
+            if self._encoder is None:
+                return
+            self.picam2.stop_encoder()
+            self._encoder = None
+        logger.info("camera %d stopped recording %s", self.index, self.recording_path)
+
+    @property
+    def is_recording(self):
+        return self._encoder is not None
+
+    def capture_still(self, path=None):
+        """
+        full-res still from the running stream
+
+        returns (timestamp, array) - or (timestamp, path) after saving to
+        path, with the format taken from its extension.
+        """
+        request = self.picam2.capture_request()
+        try:
+            timestamp = self._timestamp(request.get_metadata())
+            if path is None:
+                return timestamp, request.make_array("main")
+            request.save("main", path)
+            return timestamp, path
+        finally:
+            request.release()
+
+
+class CameraManager:
+    """
+    opens every requested camera that is present and runs them side by side
+
+    each camera has its own picamera2 instance, streams and encoder, so both
+    bioreactor chambers can be recorded at full rate while previewing.
+    cameras that are not connected are skipped with a warning.
+    """
+
+    def __init__(self, indices=(0, 1), **camera_kwargs):
+        """
+        args:
+            indices: camera numbers to open
+            camera_kwargs: passed on to every ManagedCamera
+        """
+        available = len(Picamera2.global_camera_info())
+        self.cameras = {}
+        for index in indices:
+            if index >= available:
+                logger.warning("camera %d not connected (%d found)", index, available)
+                continue
+            self.cameras[index] = ManagedCamera(index, **camera_kwargs)
+
+    def __getitem__(self, index):
+        return self.cameras[index]
+
+    def get(self, index):
+        return self.cameras.get(index)
+
+    def start(self):
+        for camera in self.cameras.values():
+            camera.start()
+
+    def stop(self):
+        for camera in self.cameras.values():
+            camera.stop()
+
+    def close(self):
+        for camera in self.cameras.values():
+            try:
+                camera.close()
+            except Exception:
+                logger.exception("closing camera %d failed", camera.index)
+
+    def start_recording(self, directory, stem=None):
+        """record every camera to <directory>/<stem>_cam<index>.h264"""
+        os.makedirs(directory, exist_ok=True)
+        stem = stem or time.strftime("video_%Y%m%d_%H%M%S")
+        paths = {}
+        for index, camera in self.cameras.items():
+            path = os.path.join(directory, f"{stem}_cam{index}.h264")
+            camera.start_recording(path)
+            paths[index] = path
+        return paths
+
+    def stop_recording(self):
+        for camera in self.cameras.values():
+            camera.stop_recording()
+
+    def capture_stills(self, directory, stem=None):
+        """a still from every camera - returns {index: (timestamp, path)}"""
+        os.makedirs(directory, exist_ok=True)
+        stem = stem or time.strftime("image_%Y%m%d_%H%M%S")
+        return {
+            index: camera.capture_still(
+                os.path.join(directory, f"{stem}_cam{index}.jpg")
+            )
+            for index, camera in self.cameras.items()
+        }
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+        return False
@@ -0,0 +1,431 @@
+import logging
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+
+import numpy as np
+
+from sensors.ring_buffer import RingBuffer
+from telemetry.sink import event
+
+logger = logging.getLogger(__name__)
+
+
+class Rule(ABC):
+    """
+    one interlock condition over ring-buffer samples
+
+    check(now) is called from the interlock thread and returns None while
+    the condition holds, or (value, sample_time, detail) for the first
+    violating sample - sample_time is when the violation became true, the
+    start of the measured trip latency.
+    """
+
+    name = "rule"
+
+    def __init__(self, name=None):
+        if name:
+            self.name = name
+
+    def arm(self):
+        """start from the newest samples (called when the interlock starts)"""
+
+    @abstractmethod
+    def check(self, now):
+        """None while the condition holds, else (value, sample_time, detail)"""
+
+
+class _Cursor:
+    """read position in one ring buffer column"""
+
+    def __init__(self, buffer, field):
+        self.buffer = buffer
+        self.column = buffer.column(field)
+        self.seq = buffer.count
+        self.dropped = 0
+
+    def arm(self):
+        self.seq = self.buffer.count
+
+    def new(self):
+        timestamps, values, self.seq, dropped = self.buffer.read_since(self.seq)
+        self.dropped += dropped
+        return timestamps, values[:, self.column]
+
+
+class Threshold(Rule):
+    """trip when any sample is above high (or below low)"""
+
+    def __init__(self, buffer, field, high=None, low=None, name=None):
+        super().__init__(name or f"{field}_limit")
+        if high is None and low is None:
+            raise ValueError("threshold needs a high or low limit")
+        self.high = high
+        self.low = low
+        self._cursor = _Cursor(buffer, field)
+
+    def arm(self):
+        self._cursor.arm()
+
+    def check(self, now):
+        timestamps, values = self._cursor.new()
+        bad = np.zeros(len(values), dtype=bool)
+        if self.high is not None:
+            bad |= values > self.high
+        if self.low is not None:
+            bad |= values < self.low
+        if not bad.any():
+            return None
+        i = int(np.argmax(bad))
+        value = float(values[i])
+        if self.high is not None and value > self.high:
+            detail = f"{value:.3f} > {self.high}"
+        else:
+            detail = f"{value:.3f} < {self.low}"
+        return value, float(timestamps[i]), detail
+
+
+class RateOfRise(Rule):
+    """
+    trip when the value climbs faster than max_rate per second
+
+    the slope of each new sample is taken against the sample window_s
+    before it, so single-sample noise does not trip it.
+    """
+
+    def __init__(self, buffer, field, max_rate, window_s=0.5, name=None):
+        super().__init__(name or f"{field}_rate")
+        if window_s <= 0:
+            raise ValueError(f"window must be positive, got {window_s}")
+        self.max_rate = max_rate
+        self.window_s = window_s
+        self._cursor = _Cursor(buffer, field)
+
+    def arm(self):
+        self._cursor.arm()
+
+    def check(self, now):
+        timestamps, _ = self._cursor.new()
+        if len(timestamps) == 0:
+            return None
+        # the new samples plus a window of history before them - bounded at
+        # the last new one, in case more arrived since read_since()
+        history_t, history_v = self._cursor.buffer.window(
+            timestamps[0] - 2 * self.window_s, np.nextafter(timestamps[-1], np.inf)
+        )
+        history_v = history_v[:, self._cursor.column]
+        first = max(len(history_t) - len(timestamps), 0)
+        # sample each new one is compared against: the last at or before t - window
+        ref = (
+            np.searchsorted(history_t, history_t[first:] - self.window_s, side="right")
+            - 1
+        )
+        valid = ref >= 0
+        if not valid.any():
+            return None
+        idx = np.flatnonzero(valid) + first
+        ref = ref[valid]
+        dt = history_t[idx] - history_t[ref]
+        rate = np.divide(
+            history_v[idx] - history_v[ref], dt, out=np.zeros(len(idx)), where=dt > 0
+        )
+        bad = rate > self.max_rate
+        if not bad.any():
+            return None
+        i = int(np.argmax(bad))
+        return (
+            float(rate[i]),
+            float(history_t[idx[i]]),
+            f"rising {rate[i]:.3f}/s > {self.max_rate}/s",
+        )
+
+
+class Disagreement(Rule):
+    """
+    trip when two redundant sensors differ by more than max_diff for persist_s
+
+    each new sample of either sensor is compared with the other's newest
+    sample at that time. partner samples older than max_age_s are not
+    compared - a sensor that stopped is the Stale rule's job.
+    """
+
+    def __init__(
+        self,
+        buffer_a,
+        buffer_b,
+        field,
+        max_diff,
+        persist_s=0.2,
+        max_age_s=1.0,
+        name=None,
+    ):
+        super().__init__(name or f"{field}_disagreement")
+        self.max_diff = max_diff
+        self.persist_s = persist_s
+        self.max_age_s = max_age_s
+        self._a = _Cursor(buffer_a, field)
+        self._b = _Cursor(buffer_b, field)
+        self._since = None
+
+    def arm(self):
+        self._a.arm()
+        self._b.arm()
+        self._since = None
+
+    def check(self, now):
+        ta, va = self._a.new()
+        tb, vb = self._b.new()
+        if len(ta) == 0 and len(tb) == 0:
+            return None
+
+        # merge both streams in time order against the other's last value
+        times = np.concatenate([ta, tb])
+        order = np.argsort(times, kind="stable")
+        other_a = self._value_at(self._a, tb)
+        other_b = self._value_at(self._b, ta)
+        diff = np.abs(np.concatenate([va - other_b, other_a - vb]))[order]
+        times = times[order]
+        for t, d in zip(times, diff):
+            if not d > self.max_diff:  # nan (no partner sample yet) counts as agreeing
+                self._since = None
+            elif self._since is None:
+                self._since = t
+            if self._since is not None and t - self._since >= self.persist_s:
+                return (
+                    float(d),
+                    float(t),
+                    f"differ by {d:.3f} > {self.max_diff} for {t - self._since:.2f} s",
+                )
+        return None
+
+    def _value_at(self, cursor, times):
+        """the cursor's buffer value at or before each time (nan if none recent)"""
+        values = np.full(len(times), np.nan)
+        if len(times) == 0:
+            return values
+        history_t, history_v = cursor.buffer.window(times[0] - self.max_age_s)
+        i = np.searchsorted(history_t, times, side="right") - 1
+        found = i >= 0
+        found[found] = times[found] - history_t[i[found]] <= self.max_age_s
+        values[found] = history_v[i[found], cursor.column]
+        return values
+
+
+class Stale(Rule):
+    """trip when a buffer has had no new sample for timeout_s"""
+
+    def __init__(self, buffer, timeout_s, name=None):
+        super().__init__(name or "stale")
+        if timeout_s <= 0:
+            raise ValueError(f"timeout must be positive, got {timeout_s}")
+        self.buffer = buffer
+        self.timeout_s = timeout_s
+        self._armed_at = None
+
+    def arm(self):
+        self._armed_at = time.monotonic()
+
+    def check(self, now):
+        latest = self.buffer.latest()
+        last = self._armed_at if latest is None else max(latest[0], self._armed_at)
+        if now - last <= self.timeout_s:
+            return None
+        age = now - last
+        return float(age), float(last + self.timeout_s), f"no sample for {age:.2f} s"
+
+
+class Interlock:
+    """
+    safety loop that evaluates every rule on every raw sample
+
+    runs on its own thread, independent of the ui and the acquisition
+    scheduler. it wakes whenever wake() is called (hook it to
+    AcquisitionEngine.add_listener) and at least every poll_s, reads the
+    samples that arrived since the last pass with read_since(), and on the
+    first violated rule runs every action (close the valve, stop the
+    motor, ...) in the order they were added. the trip is latched until
+    reset().
+
+    the latency of each trip is measured from the violating sample's
+    timestamp to detection and to the last action completing, kept in
+    `trips` for the flight recording and reported by stats(). trips slower
+    than latency_budget_s are logged as errors.
+    """
+
+    def __init__(self, poll_s=0.005, latency_budget_s=0.05, priority=50):
+        """
+        args:
+            poll_s: longest time between passes without a wake()
+            latency_budget_s: sample-to-actuated time a trip must stay within
+            priority: SCHED_FIFO priority to ask for on linux (needs
+                CAP_SYS_NICE, otherwise the thread runs at normal priority)
+        """
+        self.poll_s = poll_s
+        self.latency_budget_s = latency_budget_s
+        self.priority = priority
+
+        self._rules = []
+        self._actions = []
+        self._wake = threading.Event()
+        self._stop_event = threading.Event()
+        self._thread = None
+
+        self.tripped = None  # (rule name, value, detail) once latched
+        self.trips = RingBuffer(
+            ("rule", "value", "detect_ms", "actuate_ms"), capacity=256
+        )
+        self.passes = 0
+        self.max_pass_ms = 0.0
+        self.max_gap_ms = 0.0
+        self.max_detect_ms = 0.0
+        self.max_actuate_ms = 0.0
+        self.realtime = False
+
+    def add_rule(self, rule):
+        if self.is_running:
+            raise RuntimeError("cannot add rules while the interlock is running")
+        self._rules.append(rule)
+        return rule
+
+    def add_action(self, name, action):
+        """call action() on a trip - it must be quick and safe to repeat"""
+        if self.is_running:
+            raise RuntimeError("cannot add actions while the interlock is running")
+        self._actions.append((name, action))
+
+    @property
+    def rules(self):
+        return list(self._rules)
+
+    @property
+    def is_running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def wake(self, *args):
+        """run a pass now - usable directly as an acquisition listener"""
+        self._wake.set()
+
+    # ---------- lifecycle ----------
+
+    def start(self):
+        if self.is_running:
+            return
+        if not self._rules:
+            raise RuntimeError("no interlock rules registered")
+        for rule in self._rules:
+            rule.arm()
+        self._stop_event.clear()
+        self._thread = threading.Thread(
+            target=self._loop, name="interlock", daemon=True
+        )
+        self._thread.start()
+        event(
+            logger,
+            "interlock.armed",
+            rules=[r.name for r in self._rules],
+            actions=[name for name, _ in self._actions],
+        )
+
+    def stop(self):
+        self._stop_event.set()
+        self._wake.set()
+        if self._thread:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+
+    def reset(self):
+        """clear a latched trip and re-arm from the newest samples"""
+        for rule in self._rules:
+            rule.arm()
+        self.tripped = None
+        event(logger, "interlock.reset")
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+        return False
+
+    # ---------- interlock thread ----------
+
+    def _raise_priority(self):
+        try:
+            os.sched_setscheduler(0, os.SCHED_FIFO, os.sched_param(self.priority))
+            self.realtime = True
+        except (AttributeError, OSError) as e:
+            logger.debug("interlock running without realtime priority: %s", e)
+
+    def _loop(self):
+        self._raise_priority()
+        last = time.monotonic()
+        while not self._stop_event.is_set():
+            self._wake.wait(self.poll_s)
+            self._wake.clear()
+            began = time.monotonic()
+            self.max_gap_ms = max(self.max_gap_ms, (began - last) * 1000)
+            last = began
+            try:
+                self._pass(began)
+            except Exception:
+                logger.exception("interlock pass failed")
+            self.passes += 1
+            self.max_pass_ms = max(self.max_pass_ms, (time.monotonic() - began) * 1000)
+
+    def _pass(self, now):
+        for index, rule in enumerate(self._rules):
+            violation = rule.check(now)
+            if violation is not None and self.tripped is None:
+                self._trip(index, rule, *violation)
+
+    def _trip(self, index, rule, value, sample_time, detail):
+        detected = time.monotonic()
+        for name, action in self._actions:
+            try:
+                action()
+            except Exception:
+                logger.exception("interlock action %s failed", name)
+        actuated = time.monotonic()
+
+        detect_ms = max(detected - sample_time, 0.0) * 1000
+        actuate_ms = (actuated - detected) * 1000
+        self.tripped = (rule.name, value, detail)
+        self.trips.append(actuated, (index, value, detect_ms, actuate_ms))
+        self.max_detect_ms = max(self.max_detect_ms, detect_ms)
+        self.max_actuate_ms = max(self.max_actuate_ms, actuate_ms)
+
+        total_s = (detect_ms + actuate_ms) / 1000
+        event(
+            logger,
+            "interlock.trip",
+            level=logging.CRITICAL,
+            msg=f"interlock tripped by {rule.name}: {detail} "
+            f"({detect_ms:.1f} ms to detect, {actuate_ms:.1f} ms to actuate)",
+            rule=rule.name,
+            value=value,
+            detail=detail,
+            detect_ms=round(detect_ms, 3),
+            actuate_ms=round(actuate_ms, 3),
+        )
+        if total_s > self.latency_budget_s:
+            logger.error(
+                "interlock trip took %.1f ms, over the %.1f ms budget",
+                total_s * 1000,
+                self.latency_budget_s * 1000,
+            )
+
+    def stats(self):
+        return {
+            "armed": self.is_running,
+            "tripped": self.tripped[0] if self.tripped else None,
+            "rules": len(self._rules),
+            "passes": self.passes,
+            "realtime": self.realtime,
+            "max_pass_ms": round(self.max_pass_ms, 3),
+            "max_gap_ms": round(self.max_gap_ms, 3),
+            "max_detect_ms": round(self.max_detect_ms, 3),
+            "max_actuate_ms": round(self.max_actuate_ms, 3),
+            "latency_budget_ms": self.latency_budget_s * 1000,
+        }
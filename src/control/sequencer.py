@@ -0,0 +1,380 @@
+import heapq
+import itertools
+import logging
+import threading
+import time
+from typing import NamedTuple
+
+from sensors.ring_buffer import RingBuffer
+from telemetry.sink import event
+
+logger = logging.getLogger(__name__)
+
+SKIP = "skip"
+ABORT = "abort"
+
+
+class Step(NamedTuple):
+    """
+    one timed action of a sequence
+
+    at: seconds after the sequence starts
+    action: name of a registered action, e.g. "valve.close"
+    args: positional arguments for the action
+    guard: name of a registered guard that must hold when the step is due
+    on_guard_fail: SKIP the step or ABORT the whole sequence
+    duration_s: how long the action occupies its resource (for overlap checks)
+    """
+
+    at: float
+    action: str
+    args: tuple = ()
+    guard: str = None
+    on_guard_fail: str = ABORT
+    duration_s: float = 0.0
+
+    @property
+    def resource(self):
+        """what the step drives - the action name up to the first dot"""
+        return self.action.split(".", 1)[0]
+
+
+class Sequence:
+    """
+    an experiment sequence as data: named steps at offsets from its start
+
+    trigger names the event that starts it when armed (see
+    Sequencer.arm), on_abort lists actions run when it is aborted.
+    """
+
+    def __init__(self, name, steps, trigger=None, on_abort=()):
+        self.name = name
+        self.steps = sorted(
+            (Step(*s) if not isinstance(s, Step) else s for s in steps),
+            key=lambda s: s.at,
+        )
+        self.trigger = trigger
+        self.on_abort = tuple(on_abort)
+
+    @classmethod
+    def from_dict(cls, data):
+        """build from {"name", "steps": [{"at", "action", ...}], "trigger", "on_abort"}"""
+        steps = [
+            Step(**dict(step, args=tuple(step.get("args", ()))))
+            for step in data["steps"]
+        ]
+        return cls(data["name"], steps, data.get("trigger"), data.get("on_abort", ()))
+
+    @property
+    def duration_s(self):
+        return max((s.at + s.duration_s for s in self.steps), default=0.0)
+
+    def validate(self, actions, guards=()):
+        """raise ValueError for unknown names, negative offsets or overlapping steps"""
+        if not self.steps:
+            raise ValueError(f"{self.name}: sequence has no steps")
+        busy_until = {}
+        for step in self.steps:
+            if step.at < 0:
+                raise ValueError(
+                    f"{self.name}: step {step.action} at negative offset {step.at}"
+                )
+            if step.action not in actions:
+                raise ValueError(f"{self.name}: unknown action {step.action}")
+            if step.guard is not None and step.guard not in guards:
+                raise ValueError(f"{self.name}: unknown guard {step.guard}")
+            if step.on_guard_fail not in (SKIP, ABORT):
+                raise ValueError(
+                    f"{self.name}: on_guard_fail must be {SKIP!r} or {ABORT!r}"
+                )
+            until = busy_until.get(step.resource)
+            if until is not None and step.at < until:
+                raise ValueError(
+                    f"{self.name}: {step.action} at {step.at} s overlaps the previous "
+                    f"{step.resource} step running until {until} s"
+                )
+            busy_until[step.resource] = step.at + step.duration_s
+        for name in self.on_abort:
+            if name not in actions:
+                raise ValueError(f"{self.name}: unknown abort action {name}")
+
+
+class Sequencer:
+    """
+    runs experiment sequences from one thread on the monotonic clock
+
+    every step is due at sequence start + offset, so a late or slow step
+    never shifts the ones after it. one sequence runs at a time - starting
+    another while one is running is refused. pause() holds the clock (the
+    remaining steps move back by the pause), abort() drops every pending
+    step and runs the sequence's on_abort actions.
+
+    sequences can also be armed on a trigger name and started by fire()
+    from any thread, e.g. a microgravity detector calling
+    fire("microgravity").
+
+    the lateness of every executed step is kept in `log` (step index,
+    lateness and run time in ms) for the flight recording, and summarised
+    in stats().
+    """
+
+    def __init__(self, actions, guards=None):
+        """
+        args:
+            actions: {name: callable(*args)} the steps may use
+            guards: {name: callable() -> bool} the steps may check
+        """
+        self.actions = dict(actions)
+        self.guards = dict(guards or {})
+
+        self._cond = threading.Condition()
+        self._queue = []  # (due, order, index, step)
+        self._order = itertools.count()
+        self._armed = {}  # trigger -> sequence
+        self._running = False
+        self._thread = None
+
+        self.current = None
+        self.started_at = None
+        self.paused_at = None
+        self.log = RingBuffer(("step", "lateness_ms", "run_ms"), capacity=1024)
+        self.executed = 0
+        self.skipped = 0
+        self.failed = 0
+        self.max_lateness_ms = 0.0
+        self._lateness_total = 0.0
+
+    # ---------- control (any thread) ----------
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._running = True
+        self._thread = threading.Thread(
+            target=self._loop, name="sequencer", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        """abort whatever runs and end the scheduler thread"""
+        self.abort("sequencer stopped")
+        with self._cond:
+            self._running = False
+            self._cond.notify()
+        if self._thread:
+            self._thread.join(timeout=2.0)
+            self._thread = None
+
+    def run(self, sequence):
+        """start a sequence now - RuntimeError if one is already running"""
+        sequence.validate(self.actions, self.guards)
+        with self._cond:
+            if self.current is not None:
+                raise RuntimeError(
+                    f"sequence {self.current.name} is still running - abort it first"
+                )
+            now = time.monotonic()
+            self.current = sequence
+            self.started_at = now
+            self.paused_at = None
+            for index, step in enumerate(sequence.steps):
+                heapq.heappush(
+                    self._queue, (now + step.at, next(self._order), index, step)
+                )
+            self._cond.notify()
+        event(
+            logger,
+            "sequence.start",
+            msg=f"sequence {sequence.name} started",
+            sequence=sequence.name,
+            steps=len(sequence.steps),
+            duration_s=sequence.duration_s,
+        )
+
+    def arm(self, sequence):
+        """start the sequence when its trigger is fired"""
+        if not sequence.trigger:
+            raise ValueError(f"sequence {sequence.name} has no trigger")
+        sequence.validate(self.actions, self.guards)
+        with self._cond:
+            self._armed[sequence.trigger] = sequence
+        event(
+            logger, "sequence.armed", sequence=sequence.name, trigger=sequence.trigger
+        )
+
+    def disarm(self, trigger):
+        with self._cond:
+            self._armed.pop(trigger, None)
+
+    def fire(self, trigger):
+        """
+        start the sequence armed on this trigger (one shot)
+
+        returns False if nothing is armed on it or a sequence is running.
+        """
+        with self._cond:
+            sequence = self._armed.get(trigger)
+            if sequence is None or self.current is not None:
+                return False
+            del self._armed[trigger]
+        try:
+            self.run(sequence)
+        except RuntimeError:
+            return False  # another sequence started in between
+        return True
+
+    def pause(self):
+        with self._cond:
+            if self.current is None or self.paused_at is not None:
+                return
+            self.paused_at = time.monotonic()
+        event(logger, "sequence.pause", sequence=self.current.name)
+
+    def resume(self):
+        with self._cond:
+            if self.paused_at is None:
+                return
+            held = time.monotonic() - self.paused_at
+            self.paused_at = None
+            self.started_at += held
+            self._queue = [
+                (due + held, order, i, s) for due, order, i, s in self._queue
+            ]
+            heapq.heapify(self._queue)
+            self._cond.notify()
+        event(
+            logger, "sequence.resume", sequence=self.current.name, held_s=round(held, 3)
+        )
+
+    def abort(self, reason="aborted"):
+        """drop every pending step and run the sequence's on_abort actions"""
+        with self._cond:
+            sequence = self.current
+            if sequence is None:
+                return
+            pending = len(self._queue)
+            self._queue.clear()
+            self.current = None
+            self.paused_at = None
+            self._cond.notify()
+        event(
+            logger,
+            "sequence.abort",
+            level=logging.WARNING,
+            msg=f"sequence {sequence.name} aborted ({reason}), {pending} steps dropped",
+            sequence=sequence.name,
+            reason=reason,
+            pending=pending,
+        )
+        for name in sequence.on_abort:
+            self._call(name, ())
+
+    @property
+    def is_paused(self):
+        return self.paused_at is not None
+
+    @property
+    def elapsed_s(self):
+        """seconds into the current sequence, not counting pauses"""
+        if self.current is None:
+            return None
+        return (self.paused_at or time.monotonic()) - self.started_at
+
+    # ---------- scheduler thread ----------
+
+    def _loop(self):
+        while True:
+            with self._cond:
+                while self._running and (
+                    not self._queue
+                    or self.paused_at is not None
+                    or self._queue[0][0] > time.monotonic()
+                ):
+                    timeout = None
+                    if self._queue and self.paused_at is None:
+                        timeout = self._queue[0][0] - time.monotonic()
+                    self._cond.wait(timeout)
+                if not self._running:
+                    return
+                due, _, index, step = heapq.heappop(self._queue)
+                sequence = self.current
+            self._execute(sequence, index, step, due)
+
+    def _execute(self, sequence, index, step, due):
+        if self.current is not sequence:
+            return  # aborted after the step was taken off the queue
+        if step.guard is not None and not self.guards[step.guard]():
+            self.skipped += 1
+            event(
+                logger,
+                "sequence.guard",
+                level=logging.WARNING,
+                msg=f"{sequence.name}: guard {step.guard} failed before {step.action}",
+                sequence=sequence.name,
+                action=step.action,
+                guard=step.guard,
+            )
+            if step.on_guard_fail == ABORT:
+                self.abort(f"guard {step.guard} failed")
+        else:
+            self._run_step(sequence, index, step, due)
+
+        with self._cond:
+            if self.current is sequence and not self._queue:
+                self.current = None
+                event(logger, "sequence.done", sequence=sequence.name)
+
+    def _run_step(self, sequence, index, step, due):
+        began = time.monotonic()
+        lateness_ms = (began - due) * 1000
+        ok = self._call(step.action, step.args)
+        run_ms = (time.monotonic() - began) * 1000
+        self.executed += 1
+        self.max_lateness_ms = max(self.max_lateness_ms, lateness_ms)
+        self._lateness_total += lateness_ms
+        self.log.append(began, (index, lateness_ms, run_ms))
+        event(
+            logger,
+            "sequence.step",
+            level=logging.INFO if ok else logging.ERROR,
+            msg=f"{sequence.name} +{step.at:g}s {step.action}{tuple(step.args) or ''} "
+            f"(late {lateness_ms:.1f} ms)",
+            sequence=sequence.name,
+            step=index,
+            action=step.action,
+            lateness_ms=round(lateness_ms, 3),
+            run_ms=round(run_ms, 3),
+        )
+
+    def _call(self, name, args):
+        try:
+            self.actions[name](*args)
+            return True
+        except Exception:
+            self.failed += 1
+            logger.exception("sequence action %s failed", name)
+            return False
+
+    def stats(self):
+        return {
+            "sequence": self.current.name if self.current else None,
+            "elapsed_s": round(self.elapsed_s, 3) if self.current else None,
+            "paused": self.is_paused,
+            "pending": len(self._queue),
+            "armed": sorted(self._armed),
+            "executed": self.executed,
+            "skipped": self.skipped,
+            "failed": self.failed,
+            "mean_lateness_ms": (
+                round(self._lateness_total / self.executed, 3) if self.executed else 0.0
+            ),
+            "max_lateness_ms": round(self.max_lateness_ms, 3),
+        }
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+        return False
@@ -1,42 +1,73 @@
+import os
+from sim.backend import install as install_simulator, is_enabled as simulate
+
+# simulated hardware has to be in place before any driver is imported
+if simulate():
+    install_simulator()
+
+import logging
 import tkinter as tk
 from tkinter import ttk
 import random
+import sys
 import time
 from contextlib import ExitStack
 import threading
-from actuators.stepper_motor import StepperMotor
-from PIL import Image, ImageTk
-from picamera2 import Picamera2
-#from sensors.real.pressure_sensor import PressureSensor
-
-USE_DUMMY = False
-
-if USE_DUMMY:
-#    from sensors.dummy.dummy_flow_sensor import FlowSensor
-    from sensors.dummy.dummy_pressure_sensor import PressureSensor
-   # from sensors.dummy.dummy_accelerometer import Accelerometer
-else:
- #   from sensors.real.flow_sensor import FlowSensor
-    from sensors.real.pressure_sensor import PressureSensor
-    from sensors.real.solenoid_valve import SolenoidValve
-
-    # from sensors.real.accelerometer import Accelerometer
+import drivers
+from telemetry import instrumentation, sink
+from telemetry.sink import event
+from topology import TopologyError, load as load_topology
+from analysis.growth import GrowthAnalyzer
+from analysis.microgravity import MICRO_G_ENTRY, MICRO_G_EXIT
+from control.interlock import Disagreement, Interlock, RateOfRise, Stale, Threshold
+from control.sequencer import Sequence, Sequencer, Step
+from ui.stats_panel import StatsPanel
+from ui.strip_chart import StripChart
+
+# sensors, pins, rates and thresholds come from config/topology.json (or
+# $MSW_CONFIG); drivers are imported on first use, so a missing library
+# only disables that sensor or actuator
+
+logger = logging.getLogger("dashboard")
+
+# experiment sequences: every step is due at its offset (s) from the start,
+# valve and motor steps only run while the interlock is clear
+_VALVE_FILL = [
+    Step(0, "valve.open", guard="interlock_clear"),
+    Step(60, "valve.close"),   # auto-close valve after 60 s
+]
+_MOTOR_CYCLE = [
+    Step(100, "motor.move", (1000,), guard="interlock_clear", duration_s=5),
+    Step(110, "motor.move", (-1000,), guard="interlock_clear", duration_s=5),
+]
+SEQUENCES = {
+    1: Sequence("init_motor", _VALVE_FILL + _MOTOR_CYCLE, on_abort=("valve.close",)),
+    2: Sequence("sensors_only", _VALVE_FILL, on_abort=("valve.close",)),
+    3: Sequence("continue_motor", _VALVE_FILL + _MOTOR_CYCLE, on_abort=("valve.close",)),
+    4: Sequence("sensors_valve", _VALVE_FILL, on_abort=("valve.close",)),
+}
+# injection inside the ~20 s micro-g window: armed from the ui, started by
+# the accelerometer's micro_g_entry and cut short by micro_g_exit
+MICROGRAVITY_SEQUENCE = Sequence(
+    "microgravity_injection",
+    [
+        Step(0, "valve.open", guard="interlock_clear"),
+        Step(1, "motor.move", (1000,), guard="interlock_clear", duration_s=5),
+        Step(12, "motor.move", (-1000,), guard="interlock_clear", duration_s=5),
+        Step(18, "valve.close"),
+    ],
+    trigger="microgravity",
+    on_abort=("valve.close",),
+)
 
 
 class MissionSpacewalkerDashboard(tk.Tk):
-    def __init__(self, mode="dummy"):
+    def __init__(self, mode="dummy", topology=None):
         super().__init__()
         self.title("Mission SpaceWalker - Bioreactor Dashboard")
         self.geometry("1400x800")
         self.mode = mode
-
-        self.sensor_classes = [
-  #          FlowSensor,
-            lambda: PressureSensor(address=0x5C),
-            lambda: PressureSensor(address=0x5D),
-           # PressureSensor,
-            # Accelerometer,
-        ]
+        self.topology = topology or load_topology()
 
         # Initialize motor
         try:
@@ -44,32 +75,60 @@ class MissionSpacewalkerDashboard(tk.Tk):
             self.pi = pigpio.pi()
             if not self.pi.connected:
                 raise RuntimeError("pigpio not connected")
-            self.motor = StepperMotor(self.pi)
+            self.motor = self.topology.create_actuator("motor", pi=self.pi)
         except Exception as e:
-            print(f"Stepper motor init failed: {e}. Using dummy motor.")
+            logger.warning("Stepper motor init failed: %s. Using dummy motor.", e)
 
             class DummyMotor:
                 def fixed_steps(self, steps):
-                    print(f"[Dummy] Would move motor {steps} steps")
+                    logger.info("[Dummy] Would move motor %d steps", steps)
 
             self.motor = DummyMotor()
 
         try:
-            self.valve = SolenoidValve(pin=6)
+            self.valve = self.topology.create_actuator("valve")
         except Exception as e:
-            print("nope")
+            logger.warning("solenoid valve init failed: %s", e)
         # basic system state
         self.running = False
-        self.pressure_threshold = 22.5
+        limits = self.topology.stage("interlock")
+        self.interlock_enabled = limits is not None
+        limits = limits or {}
+        self.pressure_threshold = limits.get("overpressure_psi", 22.5)
+        self.pressure_rise_limit = limits.get("rise_limit_psi_s", 5.0)     # psi/s - the solenoid fills at ~2 psi/s
+        self.pressure_disagreement = limits.get("disagreement_psi", 1.0)   # psi between the two lps22s
+        self.interlock_budget_s = limits.get("latency_budget_s", 0.05)      # sample to valve closed
 
-        # store recent flow values for graph
-        self.flow_data = []
-        self.max_points = 100   # max number of data points to keep
         self.update_interval_ms = 1000  # sensor update frequency in ms
+        self.ui_fps = 10  # readout refresh rate, independent of the sample rates
+        self.pressure_channels = []
+        self._charted_engine = None  # engine whose channels the charts show
+        self._shown = {}  # label -> options last applied, to skip no-op configs
+        self._render_due = None  # when the pending _render should run
+        self._render_lag = instrumentation.gauge("dashboard.render_lag_ms")
+        self.stats_panel = None
+        self.engine = None
+        self.sensors = {}
+        self.interlock = None
+        self.detector = None
+        # all timed experiment steps run from this one thread
+        self.sequencer = Sequencer(
+            actions={
+                "valve.open": lambda: self.valve.open(),
+                "valve.close": lambda: self.valve.close(),
+                "motor.move": lambda steps: self.motor.fixed_steps(steps),
+            },
+            guards={
+                "interlock_clear": lambda: self.interlock is None or self.interlock.tripped is None,
+            },
+        )
+        self.sequencer.start()
+        self.recorder = None
+        self.record_dir = (self.topology.stage("recorder") or {}).get("dir", "recordings")
 
         self._create_widgets()
         self._init_cameras()
-        
+        self._schedule_render()
 
     # build the ui layout
     def _create_widgets(self):
@@ -139,10 +198,11 @@ class MissionSpacewalkerDashboard(tk.Tk):
 
         self.stop_button.pack(pady=(0, 15))
         self.emergency_stop_button.pack(pady=(0, 15))
+        tk.Button(controls_frame, text="Loop stats", command=self.open_stats).pack(fill="x")
 
         # sensor readings section - larger fonts and spacing
         sensor_frame = tk.Frame(bottom_frame, bg="#1c1c1c")
-        sensor_frame.pack(fill="x", pady=(20, 0))
+        sensor_frame.pack(side="left", anchor="n", pady=(20, 0))
 
         self.pressure_label = tk.Label(sensor_frame, text="Pressure: --- kPa",
                                        fg="white", bg="#1c1c1c", font=("Arial", 18, "bold"))
@@ -155,38 +215,71 @@ class MissionSpacewalkerDashboard(tk.Tk):
         self.temp_label = tk.Label(sensor_frame, text="Temperature: --- °C",
                                    fg="white", bg="#1c1c1c", font=("Arial", 18, "bold"))
         self.temp_label.pack(anchor="w", pady=10)
+
+        self.interlock_label = tk.Label(sensor_frame, text="Interlock: off",
+                                        fg="white", bg="#1c1c1c", font=("Arial", 14, "bold"))
+        self.interlock_label.pack(anchor="w", pady=10)
+
+        self.phase_label = tk.Label(sensor_frame, text="Flight phase: ---",
+                                    fg="white", bg="#1c1c1c", font=("Arial", 14, "bold"))
+        self.phase_label.pack(anchor="w", pady=10)
+
+        # strip charts, one per quantity - traces are added per sensor once
+        # acquisition starts (see _attach_charts)
+        charts_frame = tk.Frame(bottom_frame, bg="#1c1c1c")
+        charts_frame.pack(side="left", fill="both", expand=True, padx=(20, 0))
+        self.charts = {}
+        for fields, title in (
+            (("pressure_psi",), "Pressure (psi)"),
+            (("flow_ml_min",), "Flow (mL/min)"),
+            (("x_g", "y_g", "z_g"), "Acceleration (g)"),
+        ):
+            chart = StripChart(charts_frame, title=title, width=400, height=200)
+            chart.pack(side="left", fill="both", expand=True, padx=5)
+            chart.start()
+            self.charts[fields] = chart
         self._create_sequence_controls(controls_frame)
 
     def _init_cameras(self):
-       # Initialize PiCamera2 in preview mode (lighter, lower latency)
-        self.picam2 = Picamera2()
-        self.picam2.configure(
-            self.picam2.create_preview_configuration(
-                main={"size": (560, 420), "format": "RGB888"},  # smaller & faster
-                controls={"FrameDurationLimits": (33333, 33333)}  # ~30 fps
+        # one picamera2 per chamber: lores stream for the preview, full-res
+        # stream for recording (~30 fps)
+        options = dict(self.topology.cameras)
+        indices = tuple(options.get("indices", (0, 1)))[:2]  # one per canvas
+        if not options.get("enabled", True) or not indices:
+            self.cameras = None
+            return
+        try:
+            CameraPreview = drivers.load("CameraPreview")
+            self.cameras = drivers.create(
+                "CameraManager",
+                indices=indices,
+                preview_size=tuple(options.get("preview_size", (560, 420))),
+                fps=options.get("fps", 30),
             )
-        )
-        self.picam2.start()
-
-        # Tell camera to call update_camera_feed when a new frame is ready
-        self.picam2.post_callback = self.update_camera_feed
-
-    def update_camera_feed(self, request):
-        # Get preview frame directly from the request
-        frame = request.make_array("main")
-
-        # Convert to ImageTk
-        img = Image.fromarray(frame)
-    
-        imgtk = ImageTk.PhotoImage(image=img)
-
-        # Update Camera 1 feed
-        self.cam1_canvas.imgtk = imgtk
-        self.cam1_canvas.create_image(0, 0, anchor="nw", image=imgtk)
+        except Exception as e:
+            logger.warning("camera init failed: %s", e)
+            self.cameras = None
+            return
 
-        # Mirror the same feed in Camera 2 for now
-        self.cam2_canvas.imgtk = imgtk
-        self.cam2_canvas.create_image(0, 0, anchor="nw", image=imgtk)
+        # previews convert off the ui thread and paste into one PhotoImage
+        # per canvas from tk's own loop; growth metrics come off the same
+        # lores frames at 2 Hz on their own thread
+        self.previews = {}
+        self.analyzers = {}
+        for index, canvas in zip(indices, (self.cam1_canvas, self.cam2_canvas)):
+            camera = self.cameras.get(index)
+            if camera is None:
+                continue  # keeps its "no feed" placeholder
+            preview = CameraPreview(canvas)
+            camera.add_preview_sink(preview.submit)
+            preview.start()
+            self.previews[index] = preview
+
+            analyzer = GrowthAnalyzer(rate_hz=2.0)
+            camera.add_preview_sink(analyzer.submit)
+            analyzer.start()
+            self.analyzers[index] = analyzer
+        self.cameras.start()
 
     # draw a placeholder box with a message for the camera feeds
     def _draw_camera_placeholder(self, canvas: tk.Canvas, msg: str):
@@ -202,57 +295,81 @@ class MissionSpacewalkerDashboard(tk.Tk):
                            fill="#2ecc71", font=("Arial", 14, "bold"))
     def _run_system(self):
         try:
-            print("starting all sensors...")
-
-        # create sensor instances once
-            sensors = []
-            for sensor_class in self.sensor_classes:
-                sensor = sensor_class()  # create sensor
-                sensor.connect()
-                sensor.start()
-                sensors.append(sensor)
-               
-            print("all sensors started successfully.")
-
+            logger.info("starting all sensors...")
+
+        # create sensor instances once and schedule each at its own rate
+            self.pressure_channels = []
+            self.detector = None
+            self.engine, self.sensors = self.topology.build_acquisition()
+            self.recorder = self.topology.create_recorder()
+            pressure_channels = []
+            for spec in self.topology.enabled_sensors:
+                sensor = self.sensors.get(spec.name)
+                if sensor is None:
+                    continue  # its driver or hardware is missing
+                self.recorder.add_sensor(spec.name, sensor)
+                if spec.driver == "PressureSensor":
+                    pressure_channels.append(spec.name)
+
+            # parabola phases from every raw accelerometer sample
+            self.detector = self.topology.create_detector(self.sensors)
+            if self.detector is not None:
+                self.detector.add_listener(self._on_flight_phase)
+                self.engine.add_listener(self.detector.wake)
+                self.recorder.add_channel("microgravity", self.detector.events)
+            self.pressure_channels = pressure_channels
+
+            # valve and motor commands go into the same recording
+            if hasattr(self, "valve"):
+                self.recorder.add_channel("valve", self.valve.events)
+            if hasattr(self.motor, "events"):
+                self.recorder.add_channel("motor", self.motor.events)
+
+            # video frame timestamps share the sensors' monotonic clock
+            if self.cameras is not None:
+                for index, camera in self.cameras.cameras.items():
+                    self.recorder.add_channel(f"camera_{index}", camera.frames)
+                for index, analyzer in self.analyzers.items():
+                    self.recorder.add_channel(f"growth_{index}", analyzer.buffer)
+
+            # overpressure and sensor-fault protection on every raw sample,
+            # on its own thread - independent of this loop and the ui
+            self.interlock = None
+            if pressure_channels and self.interlock_enabled:
+                self.interlock = self._build_interlock(pressure_channels)
+            if self.interlock is not None:
+                self.recorder.add_channel("interlock", self.interlock.trips)
+            self.recorder.add_channel("sequence", self.sequencer.log)
+
+            self.recorder.start()
+            self.engine.start()
+            if self.interlock is not None:
+                self.interlock.start()
+            if self.detector is not None:
+                self.detector.start()
+            if self.cameras is not None:
+                self.cameras.start_recording(self.record_dir)
+            logger.info("all sensors started successfully.")
+
+            # the tk thread renders from engine.latest() on its own clock
+            # (see _render) - this thread only keeps the acquisition alive
             while self.running:
-                flow_value = None
-                pressure_values = []  # store multiple sensor pressures
-                temperature_values = []
-
-                for sensor in sensors:
-                    try:
-                        data = sensor.read()
-                        sensor_name = sensor.__class__.__name__
-
-                        if sensor_name == "PressureSensor":
-                            pressure_values.append(data["pressure_psi"])
-                            temperature_values.append(data["temperature_c"])
-                    # elif sensor_name == "FlowSensor":
-                    #     flow_value = data["flow_ml_min"]
-
-                    except Exception as e:
-                        print(f"error reading {sensor.__class__.__name__}: {e}")
-
-#             Combine or average readings if multiple sensors
-                if pressure_values:
-                    avg_pressure = round(sum(pressure_values) / len(pressure_values), 2)
-                    avg_temp = round(sum(temperature_values) / len(temperature_values), 2)
-                else:
-                    avg_pressure = None
-                    avg_temp = None
-
-                self._update_sensors(
-                    flow=flow_value,
-                    pressure=avg_pressure,
-                    temp=avg_temp,
-                )
-
-                time.sleep(0.5)  # read every 0.5 seconds
+                time.sleep(0.1)
+
+            if self.cameras is not None:
+                self.cameras.stop_recording()
+            if self.detector is not None:
+                self.detector.stop()
+            if self.interlock is not None:
+                self.interlock.stop()
+            self.engine.stop()
+            self.recorder.stop()
+            self.topology.disconnect(self.sensors)
 
         except KeyboardInterrupt:
-            print("stopping all sensors...")
+            logger.info("stopping all sensors...")
             # add cleanup if necessary
-            print("all sensors stopped.")
+            logger.info("all sensors stopped.")
 
         """    def _run_system(self):
         try:
@@ -339,16 +456,38 @@ class MissionSpacewalkerDashboard(tk.Tk):
         tk.Button(sequence_frame, text="Sequence 4 (Sensors + Valve)",
                   command=lambda: self.run_sequence(4)).pack(fill="x", pady=2)
 
+        self.pause_button = tk.Button(sequence_frame, text="Pause", command=self.toggle_pause)
+        self.pause_button.pack(fill="x", pady=(8, 2))
+        tk.Button(sequence_frame, text="Abort sequence",
+                  command=lambda: self.sequencer.abort("abort pressed")).pack(fill="x", pady=2)
+        tk.Button(sequence_frame, text="Arm injection on micro-g",
+                  command=lambda: self.sequencer.arm(MICROGRAVITY_SEQUENCE)).pack(fill="x", pady=2)
+
+    # detector thread: align the armed injection with the micro-g window
+    def _on_flight_phase(self, name, timestamp, magnitude_g):
+        if name == MICRO_G_ENTRY:
+            self.sequencer.fire(MICROGRAVITY_SEQUENCE.trigger)
+        elif name == MICRO_G_EXIT and self.sequencer.current is MICROGRAVITY_SEQUENCE:
+            self.sequencer.abort("micro-g ended")
+
+    def toggle_pause(self):
+        if self.sequencer.is_paused:
+            self.sequencer.resume()
+        else:
+            self.sequencer.pause()
+
     # stop the system loop
     def emergency_stop_system(self):
-      print("system emergency stop triggered")
+      event(logger, "system.emergency_stop", level=logging.WARNING,
+            msg="system emergency stop triggered → closing valve")
+      self.sequencer.abort("emergency stop")
       self.valve.close()
-      print("Emergency stop → closing valve") 
       threading.Thread(target=lambda: self.motor.fixed_steps(-1000), daemon=True).start() 
 
     def stop_system(self):
-      print("system emergency stop triggered")
+      event(logger, "system.stop", msg="system stop triggered")
       self.running = False
+      self.sequencer.abort("stop pressed")   # pending steps must not fire later
 
       self.valve.close()
 
@@ -356,25 +495,22 @@ class MissionSpacewalkerDashboard(tk.Tk):
       if hasattr(self.motor, "stop"):
           self.motor.stop()
 
-      print("stop → closing valve")
+      logger.info("stop → closing valve")
     def run_sequence(self, seq_number):
         """Run the chosen sequence based on your experiment plan."""
-        print(f"Running Sequence {seq_number}...")
+        logger.info("Running Sequence %d...", seq_number)
 
     # Ensure sensors are running
         if not self.running:
             self.running = True
             threading.Thread(target=self._run_system, daemon=True).start()
-            print("Sensors started...")
-
-    # Open valve immediately
-        self.valve.open()
-        threading.Timer(60, self.valve.close).start()  # auto-close valve after 60s
+            logger.info("Sensors started...")
 
-    # Motor timing (only for sequences 1 & 3)
-        if seq_number in (1, 3):
-            threading.Timer(100, lambda: self.motor.fixed_steps(1000)).start()
-            threading.Timer(110, lambda: self.motor.fixed_steps(-1000)).start()
+    # valve and motor timing come from the sequence definition
+        try:
+            self.sequencer.run(SEQUENCES[seq_number])
+        except RuntimeError as e:
+            logger.warning("sequence %d not started: %s", seq_number, e)
 
     # called every update interval to refresh values
     def _tick(self):
@@ -393,85 +529,126 @@ class MissionSpacewalkerDashboard(tk.Tk):
 
         self.after(self.update_interval_ms, self._tick)
 
-    # update the label text/colors for sensor readings
+    # timers, counters and gauges of the hot paths, refreshed once a second
+    def open_stats(self):
+        if self.stats_panel is not None and self.stats_panel.winfo_exists():
+            self.stats_panel.lift()
+            return
+        self.stats_panel = StatsPanel(self)
+
+    def _schedule_render(self):
+        interval_ms = int(1000 / self.ui_fps)
+        self._render_due = time.monotonic() + interval_ms / 1000
+        self.after(interval_ms, self._render)
+
+    # refresh the readouts from the newest samples - runs on the tk thread at
+    # ui_fps however fast the sensors are sampled
+    @instrumentation.timed("dashboard.render")
+    def _render(self):
+        # how late tk ran us - a stalled ui loop shows up here first
+        self._render_lag.set((time.monotonic() - self._render_due) * 1000)
+        try:
+            engine = self.engine
+            if engine is not None and engine.is_running and engine is not self._charted_engine:
+                self._attach_charts(engine)
+            flow, pressure, temp = self._sensor_snapshot()
+            self._update_sensors(flow, pressure, temp)
+            self._update_interlock()
+            detector = self.detector
+            if detector is not None and detector.magnitude_g is not None:
+                self._set_label(self.phase_label,
+                                text=f"Flight phase: {detector.phase} ({detector.magnitude_g:.1f} g)")
+            self._set_label(self.pause_button,
+                            text="Resume" if self.sequencer.is_paused else "Pause")
+        except Exception:
+            logger.exception("dashboard render failed")
+        self._schedule_render()
+
+    # safety rules for the pressure sensors, acting on the valve and motor
+    def _build_interlock(self, pressure_channels):
+        interlock = Interlock(latency_budget_s=self.interlock_budget_s)
+        buffers = [self.engine.channels[name].sensor.buffer for name in pressure_channels]
+        stale_s = max(0.5, 5 / self.topology.rate_hz("PressureSensor"))
+        for name, buffer in zip(pressure_channels, buffers):
+            interlock.add_rule(Threshold(buffer, "pressure_psi", high=self.pressure_threshold,
+                                         name=f"{name}.overpressure"))
+            interlock.add_rule(RateOfRise(buffer, "pressure_psi", self.pressure_rise_limit,
+                                          name=f"{name}.rise"))
+            interlock.add_rule(Stale(buffer, stale_s, name=f"{name}.stale"))
+        if len(buffers) == 2:
+            interlock.add_rule(Disagreement(*buffers, "pressure_psi", self.pressure_disagreement,
+                                            name="pressure.disagreement"))
+
+        if hasattr(self, "valve"):
+            interlock.add_action("valve.close", self.valve.close)
+        if hasattr(self.motor, "stop"):
+            interlock.add_action("motor.stop", self.motor.stop)
+        interlock.add_action("sequence.abort", lambda: self.sequencer.abort("interlock trip"))
+        # evaluate as soon as any sample lands, not just on the poll
+        self.engine.add_listener(interlock.wake)
+        return interlock
+
+    # plot every sensor field that has a chart straight from its ring buffer
+    def _attach_charts(self, engine):
+        self._charted_engine = engine
+        for fields, chart in self.charts.items():
+            chart.clear_traces()
+            for name, channel in engine.channels.items():
+                buffer = channel.sensor.buffer
+                for field in fields:
+                    if field in buffer.fields:
+                        label = name if len(fields) == 1 else f"{name}.{field}"
+                        chart.add_trace(label, buffer, field)
+
+    # latest reading of every channel, combined for display
+    def _sensor_snapshot(self):
+        engine = self.engine
+        if engine is None or not self.running:
+            return None, None, None
+
+        pressure_values = []  # store multiple sensor pressures
+        temperature_values = []
+        for name in self.pressure_channels:
+            data = engine.latest(name)  # the channel's last dict, read without locking
+            if data is not None:
+                pressure_values.append(data["pressure_psi"])
+                temperature_values.append(data["temperature_c"])
+
+        # combine or average readings if multiple sensors
+        if not pressure_values:
+            return None, None, None
+        avg_pressure = round(sum(pressure_values) / len(pressure_values), 2)
+        avg_temp = round(sum(temperature_values) / len(temperature_values), 2)
+        return None, avg_pressure, avg_temp
+
+    # configure a widget only when what it shows actually changes
+    def _set_label(self, label, **options):
+        if self._shown.get(label) == options:
+            return
+        label.config(**options)
+        self._shown[label] = options
+
+    # update the label text/colors for sensor readings (tk thread only)
     def _update_sensors(self, flow: float, pressure: float, temp: float):
         if pressure is None:
             return  # no data yet
-    
-        color = "red" if pressure > self.pressure_threshold else "white"
-        self.pressure_label.config(
-            text=f"Pressure: {pressure} psi", fg=color)
-        self.flow_label.config(text=f"Flow Rate: {flow} mL/min")
-        self.temp_label.config(text=f"Temperature: {temp} °C")
-       
-        if pressure > self.pressure_threshold:
-            print(f"!!! Emergency shutdown: pressure exceeded {self.pressure_threshold} psi")
-            self.emergency_stop_system()
-    # store the new flow value and trigger a redraw
-    def _update_graph(self, flow: float):
-        self.flow_data.append(flow)
-        if len(self.flow_data) > self.max_points:
-            self.flow_data = self.flow_data[-self.max_points:]
-        self._redraw_graph()
-
-    # redraw the flow graph from stored data
-    def _redraw_graph(self):
-        c = self.graph_canvas
-        c.delete("all")
-        w = c.winfo_width()
-        h = c.winfo_height()
-        if w < 10 or h < 10:
-            return
-
-        # more padding on the left for y-axis numbers
-        pad_left = 20
-        pad_right = 20
-        pad_top = 20
-        pad_bottom = 30
-
-        x0, y0 = pad_left, pad_top
-        x1, y1 = w - pad_right, h - pad_bottom
 
-        # draw main rectangle (plot area)
-        c.create_rectangle(x0, y0, x1, y1, outline="#cccccc")
-
-        if not self.flow_data:
-            c.create_text(w//2, h//2, text="no data yet", fill="#888")
-            return
-
-        data = self.flow_data
-        x_step = (x1 - x0) / max(1, self.max_points - 1)
-        ymin = min(data) - 0.1
-        ymax = max(data) + 0.1
-        if abs(ymax - ymin) < 1e-6:
-            ymax = ymin + 1.0
-
-        def to_xy(i, val):
-            x = x0 + i * x_step
-            y = y1 - (val - ymin) / (ymax - ymin) * (y1 - y0)
-            return x, y
-
-        # horizontal grid lines + y-axis labels
-        for frac in (0.0, 0.25, 0.5, 0.75, 1.0):
-            y = y1 - frac * (y1 - y0)
-            c.create_line(x0, y, x1, y, fill="#eeeeee")
-            val = ymin + frac * (ymax - ymin)
-            # align numbers to the left of the y-axis
-            c.create_text(
-                x0 - 5, y, text=f"{val:.2f}", anchor="e", fill="#666")
-
-        # draw the flow line
-        points = []
-        for i, val in enumerate(data[-self.max_points:]):
-            points.extend(to_xy(i, val))
-        if len(points) >= 4:
-            c.create_line(points, width=2)
-
-        # axis labels
-        c.create_text((x0 + x1)//2, y1 + 18,
-                      text="time (samples)", fill="#444")
-        c.create_text(x0 - 50, (y0 + y1)//2,
-                      text="flow", angle=90, fill="#444")
+        color = "red" if pressure > self.pressure_threshold else "white"
+        self._set_label(self.pressure_label, text=f"Pressure: {pressure} psi", fg=color)
+        self._set_label(self.flow_label, text=f"Flow Rate: {flow} mL/min")
+        self._set_label(self.temp_label, text=f"Temperature: {temp} °C")
+
+    # interlock state - the interlock acts on its own, this only shows it
+    def _update_interlock(self):
+        interlock = self.interlock
+        if interlock is None or not interlock.is_running:
+            self._set_label(self.interlock_label, text="Interlock: off", fg="white")
+        elif interlock.tripped is not None:
+            rule, value, detail = interlock.tripped
+            self._set_label(self.interlock_label,
+                            text=f"Interlock: TRIPPED - {rule} ({detail})", fg="red")
+        else:
+            self._set_label(self.interlock_label, text="Interlock: armed", fg="#2ecc71")
 
     # temporary: updates camera placeholders so it looks alive
     def _update_cameras_placeholder(self):
@@ -479,5 +656,23 @@ class MissionSpacewalkerDashboard(tk.Tk):
 
 
 if __name__ == "__main__":
-    app = MissionSpacewalkerDashboard()
-    app.mainloop()
+    try:
+        topology = load_topology()
+    except (OSError, TopologyError) as e:
+        sys.exit(f"invalid topology: {e}")
+    # the telemetry log goes next to the recordings, as in mswua.py
+    record_dir = (topology.stage("recorder") or {}).get("dir", "recordings")
+    sink.configure(
+        path=os.path.join(record_dir, time.strftime("telemetry_%Y%m%d_%H%M%S.jsonl"))
+    )
+    app = MissionSpacewalkerDashboard(topology=topology)
+    with ExitStack() as stack:
+        # live figures on a local socket while running, and to a file at exit
+        if instrumentation.is_enabled():
+            stack.callback(instrumentation.dump, os.path.join(
+                app.record_dir, time.strftime("instrumentation_%Y%m%d_%H%M%S.json")))
+            stack.enter_context(instrumentation.InstrumentationServer())
+        app.mainloop()
+        app.sequencer.stop()
+        if app.cameras is not None:
+            app.cameras.close()
@@ -1,32 +1,25 @@
 import time
-from contextlib import ExitStack
 
-USE_DUMMY = False
+from topology import load as load_topology
 
-if USE_DUMMY:
-    from sensors.dummy.dummy_flow_sensor import FlowSensor
-    from sensors.dummy.dummy_pressure_sensor import PressureSensor
-else:
-    from sensors.real.flow_sensor import FlowSensor
-    from sensors.real.pressure_sensor import PressureSensor
+# the sensors (and dummy vs real drivers) come from config/topology.json;
+# USE_DUMMY_SENSORS=true runs the dummies
 
-def run_sensors():
-    with ExitStack() as stack:
-        sensors = []
-        for sensor_class in [FlowSensor, PressureSensor]:
-            sensor = stack.enter_context(sensor_class())
-            sensor.start()
-            sensors.append(sensor)
 
+def run_sensors():
+    topology = load_topology()
+    engine, sensors = topology.build_acquisition()
+    try:
         print("Sensors started. Press Ctrl+C to stop.\n")
-        while True:
-            for sensor in sensors:
-                try:
-                    data = sensor.read()
-                    print(f"{sensor.__class__.__name__}: {data}")
-                except Exception as e:
-                    print(f"Error reading {sensor.__class__.__name__}: {e}")
-            time.sleep(1)  # adjust polling rate here
+        with engine:
+            while True:
+                for name in sensors:
+                    data = engine.latest(name)
+                    if data is not None:
+                        print(f"{name}: {data}")
+                time.sleep(1)  # printing rate - sample rates are in the topology
+    finally:
+        topology.disconnect(sensors)
 
 if __name__ == "__main__":
     run_sensors()
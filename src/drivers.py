@@ -0,0 +1,106 @@
+"""
+registry of sensor and actuator drivers, imported only when used
+
+every driver module pulls in its hardware library at import time
+(pigpio, RPi.GPIO, board, adafruit_lps2x, the sensirion stack,
+picamera2). naming drivers here as "module:Class" strings means a
+process only imports the hardware it is configured for, and a missing
+library becomes a DriverUnavailable for that one driver - callers log it
+and carry on without it - instead of an ImportError at startup.
+
+    from drivers import load, create
+    PressureSensor = load("PressureSensor")          # real driver
+    flow = create("FlowSensor", variant=DUMMY)       # dummy instance
+"""
+
+import importlib
+import threading
+
+REAL = "real"
+DUMMY = "dummy"
+ASYNC_DUMMY = "async_dummy"
+
+# name -> {variant: "module:Class"}
+_DRIVERS = {}
+_loaded = {}
+_lock = threading.Lock()
+
+
+class DriverUnavailable(ImportError):
+    """the driver or a library it needs cannot be imported"""
+
+
+def register(name, target, variant=REAL):
+    """
+    make a driver loadable by name
+
+    args:
+        name: driver name, e.g. "PressureSensor"
+        target: "package.module:Class"
+        variant: REAL, DUMMY or ASYNC_DUMMY
+    """
+    if ":" not in target:
+        raise ValueError(f"driver target must be 'module:Class', got {target!r}")
+    _DRIVERS.setdefault(name, {})[variant] = target
+
+
+def names(variant=None):
+    """registered driver names (those with the given variant, if any)"""
+    return sorted(n for n, v in _DRIVERS.items() if variant is None or variant in v)
+
+
+def load(name, variant=REAL):
+    """
+    import a driver class on first use
+
+    raises KeyError for unknown drivers and DriverUnavailable when the
+    driver module or its hardware library is missing.
+    """
+    try:
+        target = _DRIVERS[name][variant]
+    except KeyError:
+        raise KeyError(f"no {variant} driver registered as {name!r}") from None
+    with _lock:
+        if target in _loaded:
+            return _loaded[target]
+        module_name, class_name = target.split(":")
+        try:
+            module = importlib.import_module(module_name)
+        except ImportError as e:
+            raise DriverUnavailable(f"{name} ({variant}) unavailable: {e}") from e
+        cls = getattr(module, class_name)
+        _loaded[target] = cls
+        return cls
+
+
+def create(name, variant=REAL, **kwargs):
+    """load a driver and construct it with kwargs"""
+    return load(name, variant)(**kwargs)
+
+
+def loaded():
+    """the driver modules imported so far"""
+    return sorted(_loaded)
+
+
+# ---------- the drivers this project ships ----------
+
+register("PressureSensor", "sensors.real.pressure_sensor:PressureSensor")
+register("PressureSensor", "sensors.dummy.dummy_pressure_sensor:PressureSensor", DUMMY)
+register(
+    "PressureSensor",
+    "sensors.dummy.dummy_pressure_sensor:AsyncPressureSensor",
+    ASYNC_DUMMY,
+)
+register("FlowSensor", "sensors.real.flow_sensor:FlowSensor")
+register("FlowSensor", "sensors.dummy.dummy_flow_sensor:FlowSensor", DUMMY)
+register("FlowSensor", "sensors.dummy.dummy_flow_sensor:AsyncFlowSensor", ASYNC_DUMMY)
+register("Accelerometer", "sensors.real.accelerometer:Accelerometer")
+register("Accelerometer", "sensors.dummy.dummy_accelerometer:Accelerometer", DUMMY)
+register(
+    "Accelerometer", "sensors.dummy.dummy_accelerometer:AsyncAccelerometer", ASYNC_DUMMY
+)
+register("SolenoidValve", "sensors.real.solenoid_valve:SolenoidValve")
+register("StepperMotor", "actuators.stepper_motor:StepperMotor")
+register("CameraManager", "camera.manager:CameraManager")
+register("CameraPreview", "ui.camera_preview:CameraPreview")
@@ -1,62 +1,114 @@
+import logging
 import os
+import sys
 import time
 from contextlib import ExitStack
 
-USE_DUMMY = os.getenv("USE_DUMMY_SENSORS", "false").lower() == "true"
-# USE_DUMMY = True
+from sim.backend import install as install_simulator, is_enabled as simulate
 
-if USE_DUMMY:
-    from sensors.dummy.dummy_flow_sensor import FlowSensor
-    from sensors.dummy.dummy_pressure_sensor import PressureSensor
-   # from sensors.dummy.dummy_accelerometer import Accelerometer
-else:
-    from sensors.real.flow_sensor import FlowSensor
-    from sensors.real.pressure_sensor import PressureSensor
-    #from sensors.real.accelerometer import Accelerometer
+# simulated hardware has to be in place before any driver is imported
+if simulate():
+    install_simulator()
+
+from telemetry import instrumentation, sink
+from telemetry.sink import event
+from topology import TopologyError, load as load_topology
+
+# which sensors run, their drivers, buses, rates and the pipeline stages
+# come from config/topology.json (or $MSW_CONFIG); USE_DUMMY_SENSORS,
+# MSW_ASYNC_SENSORS, MSW_DOWNLINK_PORT and MSW_RECORD_DIR override it
+
+logger = logging.getLogger("mswua")
 
 
 def main():
-    sensor_classes = [
-        FlowSensor,
-        # PressureSensor,
-        # Accelerometer,
-    ]
+    try:
+        topology = load_topology()
+    except (OSError, TopologyError) as e:
+        sys.exit(f"invalid topology: {e}")
+    record_dir = (topology.stage("recorder") or {}).get("dir", "recordings")
+
+    # status and data go through the background telemetry writer: console,
+    # a json-lines log next to the recording, and MSW_TELEMETRY_UDP/_SOCKET
+    sink.configure(
+        path=os.path.join(record_dir, time.strftime("telemetry_%Y%m%d_%H%M%S.jsonl"))
+    )
 
     try:
-        print("starting all sensors...")
+        logger.info("starting all sensors from %s...", topology.source)
 
         # manages multiple context managers
         with ExitStack() as stack:
-            # enter all sensor contexts and start them
-            sensors = []
-            for sensor_class in sensor_classes:
-                sensor = stack.enter_context(sensor_class())
-                sensor.start()
-                sensors.append(sensor)
+            # MSW_INSTRUMENT=true: hot-path timers served on a local socket
+            # while running and written next to the recording at shutdown
+            if instrumentation.is_enabled():
+                stack.callback(
+                    instrumentation.dump,
+                    os.path.join(
+                        record_dir, time.strftime("instrumentation_%Y%m%d_%H%M%S.json")
+                    ),
+                )
+                stack.enter_context(instrumentation.InstrumentationServer())
+
+            # blocking sensors come back connected and started, async ones are
+            # brought up on the engine's loop
+            engine, sensors = topology.build_acquisition()
+            stack.callback(topology.disconnect, sensors)
+            if not sensors:
+                logger.error("no sensor could be started - nothing to sample")
+                return
+
+            recorder = topology.create_recorder()
+            downlink = topology.create_downlink()
+            for name, sensor in sensors.items():
+                recorder.add_sensor(name, sensor)
+                if downlink is not None:
+                    downlink.add_sensor(name, sensor)
+            detector = topology.create_detector(sensors)
+            if detector is not None:
+                engine.add_listener(detector.wake)
+                recorder.add_channel("microgravity", detector.events)
 
-            print("all sensors started successfully.")
+            stack.enter_context(recorder)
+            if downlink is not None and topology.engine == "async":
+                engine.add_service(downlink.serve)
+            elif downlink is not None:
+                stack.enter_context(downlink)
+            stack.enter_context(engine)
+            if detector is not None:
+                stack.enter_context(detector)
+            logger.info("all sensors started successfully.")
 
             while True:
-                for sensor in sensors:
-                    try:
-                        data = sensor.read()
-                        sensor_name = sensor.__class__.__name__
-                        if sensor_name == "FlowSensor":
-                            if isinstance(data,dict) and "flow_µl_min" in data: 
-                                print(f"{sensor_name} | Flow: {data['flow_µl_min']} ml/min | Temp: {data['temperature_c']}C")
-                            else:
-                                print("garbage <3")
-                        else:
-                            print(f"{sensor_name} data: {data}")
-                    except Exception as e:
-                        print(f"error reading {sensor.__class__.__name__}: {e}")
-
-                time.sleep(0.5)  # read every 0.5 seconds
+                time.sleep(topology.report_interval_s)
+                for name in engine.channels:
+                    data = engine.latest(name)
+                    if data is None:
+                        continue
+                    if "flow_ml_min" in data:
+                        msg = f"{name} | Flow: {data['flow_ml_min']} ml/min | Temp: {data['temperature_c']}C"
+                    else:
+                        msg = f"{name} data: {data}"
+                    event(logger, "sensor.sample", msg=msg, channel=name, **data)
+                event(
+                    logger,
+                    "acquisition.stats",
+                    msg=engine.format_stats(),
+                    channels=engine.stats(),
+                )
+                if instrumentation.is_enabled():
+                    event(
+                        logger,
+                        "instrumentation.stats",
+                        level=logging.DEBUG,
+                        msg=instrumentation.format_table(),
+                        metrics=instrumentation.snapshot(),
+                    )
 
     except KeyboardInterrupt:
-        print("stopping all sensors...")
+        logger.info("stopping all sensors...")
         # context managers will automatically handle disconnect()
-        print("all sensors stopped.")
+        logger.info("all sensors stopped.")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,231 @@
+import heapq
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+
+class SensorChannel:
+    """scheduling state and rate statistics for one sensor in the engine"""
+
+    def __init__(self, name, sensor, rate_hz):
+        if rate_hz <= 0:
+            raise ValueError(f"rate for {name} must be positive, got {rate_hz}")
+        self.name = name
+        self.sensor = sensor
+        self.rate_hz = float(rate_hz)
+        self.period = 1.0 / self.rate_hz
+
+        # set by the scheduler thread, cleared by the worker that did the read
+        self.busy = False
+
+        self.samples = 0
+        self.errors = 0
+        self.overruns = 0
+        self.last_error = None
+        self.latest = None
+        self.latest_time = None
+
+        # recent completion times for the achieved-rate estimate
+        self._times = deque(maxlen=max(4, int(self.rate_hz * 2)))
+        self._latency_total = 0.0
+        self.max_latency = 0.0
+        self.max_lateness = 0.0
+
+    def _record(self, timestamp, data, lateness, latency):
+        """store a completed sample (called from a worker thread)"""
+        self.samples += 1
+        self.latest = data
+        self.latest_time = timestamp
+        self._times.append(timestamp)
+        self._latency_total += latency
+        self.max_latency = max(self.max_latency, latency)
+        self.max_lateness = max(self.max_lateness, lateness)
+
+    @property
+    def achieved_hz(self):
+        """sample rate achieved over the last couple of seconds"""
+        times = self._times
+        if len(times) < 2 or times[-1] <= times[0]:
+            return 0.0
+        return (len(times) - 1) / (times[-1] - times[0])
+
+    def stats(self):
+        """requested vs achieved rate plus read timing for this channel"""
+        mean_latency = self._latency_total / self.samples if self.samples else 0.0
+        return {
+            "requested_hz": self.rate_hz,
+            "achieved_hz": round(self.achieved_hz, 2),
+            "samples": self.samples,
+            "errors": self.errors,
+            "overruns": self.overruns,
+            "mean_read_ms": round(mean_latency * 1000, 3),
+            "max_read_ms": round(self.max_latency * 1000, 3),
+            "max_lateness_ms": round(self.max_lateness * 1000, 3),
+        }
+
+
+class AcquisitionEngine:
+    """
+    samples every registered sensor at its own rate on a worker pool
+
+    a single scheduler thread keeps a deadline heap on the monotonic clock and
+    hands due reads to the pool, so a slow i2c transaction on one sensor only
+    delays that sensor. deadlines sit on a fixed grid (start + k * period) so
+    the rate does not drift; if a read is still in flight when its next slot
+    comes round, the slot is skipped and counted as an overrun rather than
+    queued behind it.
+    """
+
+    def __init__(self, max_workers=None):
+        """
+        args:
+            max_workers: size of the read pool (defaults to one per sensor)
+        """
+        self._channels = {}
+        self._listeners = []
+        self._max_workers = max_workers
+        self._pool = None
+        self._thread = None
+        self._stop_event = threading.Event()
+        self._started_at = None
+
+    def add_sensor(self, sensor, rate_hz, name=None):
+        """
+        register a started sensor to be sampled at rate_hz
+
+        args:
+            sensor: any BaseSensor - the engine only calls read()
+            rate_hz: requested sample rate
+            name: channel name (defaults to the sensor class name)
+        """
+        if self.is_running:
+            raise RuntimeError("cannot add sensors while the engine is running")
+        name = name or sensor.__class__.__name__
+        if name in self._channels:
+            raise ValueError(f"duplicate sensor channel name: {name}")
+        channel = SensorChannel(name, sensor, rate_hz)
+        self._channels[name] = channel
+        return channel
+
+    def add_listener(self, callback):
+        """
+        register callback(name, timestamp, data) for every completed sample
+
+        callbacks run on the pool threads and must not block.
+        """
+        self._listeners.append(callback)
+
+    @property
+    def channels(self):
+        return dict(self._channels)
+
+    @property
+    def is_running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        """start the scheduler and worker pool"""
+        if self.is_running:
+            return
+        if not self._channels:
+            raise RuntimeError("no sensors registered")
+
+        workers = self._max_workers or len(self._channels)
+        self._pool = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="acquisition"
+        )
+        self._stop_event.clear()
+        self._started_at = time.monotonic()
+        self._thread = threading.Thread(
+            target=self._schedule_loop, name="acquisition-scheduler", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        """stop scheduling and wait for in-flight reads"""
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout=2.0)
+            self._thread = None
+        if self._pool:
+            self._pool.shutdown(wait=True)
+            self._pool = None
+
+    def latest(self, name):
+        """most recent reading for a channel, or None before the first sample"""
+        return self._channels[name].latest
+
+    def stats(self):
+        """per-channel requested vs achieved rate and read timing"""
+        return {name: channel.stats() for name, channel in self._channels.items()}
+
+    def format_stats(self):
+        """one line per channel, for periodic console reports"""
+        lines = []
+        for name, s in self.stats().items():
+            lines.append(
+                f"{name}: {s['achieved_hz']:.1f}/{s['requested_hz']:.1f} Hz, "
+                f"read {s['mean_read_ms']:.2f} ms (max {s['max_read_ms']:.2f}), "
+                f"overruns {s['overruns']}, errors {s['errors']}"
+            )
+        return "\n".join(lines)
+
+    def _schedule_loop(self):
+        """dispatch reads as their deadlines come due"""
+        heap = []
+        for order, channel in enumerate(self._channels.values()):
+            heapq.heappush(heap, (self._started_at, order, channel))
+
+        while not self._stop_event.is_set():
+            deadline, order, channel = heap[0]
+            now = time.monotonic()
+            if deadline > now:
+                self._stop_event.wait(deadline - now)
+                continue
+
+            heapq.heappop(heap)
+            if channel.busy:
+                channel.overruns += 1
+            else:
+                channel.busy = True
+                self._pool.submit(self._sample, channel, deadline)
+
+            # stay on the fixed grid, skipping any slots we already missed
+            next_deadline = deadline + channel.period
+            if next_deadline <= now:
+                missed = int((now - deadline) / channel.period)
+                channel.overruns += missed
+                next_deadline = deadline + (missed + 1) * channel.period
+            heapq.heappush(heap, (next_deadline, order, channel))
+
+    def _sample(self, channel, deadline):
+        """perform one read on a pool thread"""
+        started = time.monotonic()
+        try:
+            data = channel.sensor.read()
+        except Exception as e:
+            channel.errors += 1
+            channel.last_error = str(e)
+            logger.warning("error reading %s: %s", channel.name, e)
+            return
+        finally:
+            channel.busy = False
+
+        finished = time.monotonic()
+        channel._record(finished, data, started - deadline, finished - started)
+        for callback in self._listeners:
+            try:
+                callback(channel.name, finished, data)
+            except Exception:
+                logger.exception("acquisition listener failed for %s", channel.name)
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
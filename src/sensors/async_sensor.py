@@ -0,0 +1,370 @@
+import asyncio
+import logging
+import threading
+import time
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+
+from sensors.acquisition import AcquisitionEngine
+from sensors.base_sensor import BaseSensor
+from sensors.ring_buffer import RingBuffer
+
+logger = logging.getLogger(__name__)
+
+# blocking driver calls share one small pool - the i2c bus serialises the
+# transactions anyway, so more workers would only add threads
+BLOCKING_WORKERS = 2
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def blocking_executor():
+    """the shared, bounded pool the blocking sensor adapters run in"""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=BLOCKING_WORKERS, thread_name_prefix="sensor-io"
+            )
+        return _executor
+
+
+async def ticks(period):
+    """
+    yield deadlines on a fixed grid (start + k * period) of the monotonic clock
+
+    sleeps until each deadline; slots that already passed while the caller
+    was busy are skipped, and the number skipped is yielded with the next
+    deadline - returns (deadline, missed) pairs.
+    """
+    deadline = time.monotonic()
+    while True:
+        now = time.monotonic()
+        if deadline > now:
+            await asyncio.sleep(deadline - now)
+            now = time.monotonic()
+        missed = 0
+        if now - deadline >= period:
+            missed = int((now - deadline) / period)
+            deadline += missed * period
+        yield deadline, missed
+        deadline += period
+
+
+class AsyncSensor(ABC):
+    """
+    asyncio version of the BaseSensor contract
+
+    the same lifecycle (connect, start, read, stop, disconnect) as
+    coroutines, the same FIELDS and ring buffer, and stream() to iterate
+    over readings. blocking drivers are wrapped with BlockingSensorAdapter;
+    simulated sensors subclass GeneratedSensor.
+    """
+
+    FIELDS = ()
+    BUFFER_CAPACITY = 4096
+
+    def __init__(self, buffer_capacity=None):
+        """
+        args:
+            buffer_capacity: samples kept in the ring buffer (default BUFFER_CAPACITY)
+        """
+        self._measuring = False
+        self.buffer = RingBuffer(
+            self.FIELDS, capacity=buffer_capacity or self.BUFFER_CAPACITY
+        )
+
+    def _record(self, *values, timestamp=None):
+        """append one sample to the ring buffer"""
+        self.buffer.append(time.monotonic() if timestamp is None else timestamp, values)
+
+    @abstractmethod
+    async def connect(self):
+        """establish connection to sensor hardware"""
+
+    @abstractmethod
+    async def disconnect(self):
+        """disconnect from sensor hardware and cleanup resources"""
+
+    @abstractmethod
+    async def start(self):
+        """start measurement process"""
+
+    @abstractmethod
+    async def stop(self):
+        """stop measurement process"""
+
+    @abstractmethod
+    async def read(self):
+        """read data from sensor - returns dict with sensor readings"""
+
+    async def stream(self, rate_hz):
+        """
+        read at rate_hz on a fixed grid - yields (timestamp, data)
+
+        a read that runs past the next slot skips that slot rather than
+        queueing behind it, as in the acquisition engine.
+        """
+        async for _, _ in ticks(1.0 / rate_hz):
+            data = await self.read()
+            yield time.monotonic(), data
+
+    @property
+    def is_measuring(self):
+        return self._measuring
+
+    async def __aenter__(self):
+        await self.connect()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.disconnect()
+        return False
+
+
+class BlockingSensorAdapter(AsyncSensor):
+    """
+    runs a blocking BaseSensor's calls in a bounded thread pool
+
+    the driver's own ring buffer is shared, so recorders and the downlink
+    see the same samples whichever interface reads them. one call per
+    sensor is in flight at a time.
+    """
+
+    def __init__(self, sensor, executor=None):
+        """
+        args:
+            sensor: the BaseSensor to wrap
+            executor: pool for the blocking calls (default blocking_executor())
+        """
+        self.sensor = sensor
+        self.FIELDS = sensor.FIELDS
+        self.buffer = sensor.buffer
+        self._executor = executor
+        self._lock = None  # created on the loop that first uses it
+
+    async def _call(self, method, *args):
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        loop = asyncio.get_running_loop()
+        async with self._lock:
+            return await loop.run_in_executor(
+                self._executor or blocking_executor(), method, *args
+            )
+
+    async def connect(self):
+        await self._call(self.sensor.connect)
+
+    async def disconnect(self):
+        await self._call(self.sensor.disconnect)
+
+    async def start(self):
+        await self._call(self.sensor.start)
+
+    async def stop(self):
+        await self._call(self.sensor.stop)
+
+    async def read(self):
+        return await self._call(self.sensor.read)
+
+    @property
+    def is_measuring(self):
+        return self.sensor.is_measuring
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({self.sensor.__class__.__name__})"
+
+
+class GeneratedSensor(AsyncSensor):
+    """
+    a sensor whose samples come from an async generator on the event loop
+
+    subclasses implement samples(), yielding one tuple of FIELDS values per
+    sample and awaiting between them; start() runs it as a task that
+    records every sample, read() returns the newest. no thread is involved.
+    """
+
+    def __init__(self, buffer_capacity=None):
+        super().__init__(buffer_capacity)
+        self._connected = False
+        self._task = None
+
+    @abstractmethod
+    def samples(self):
+        """async generator of FIELDS value tuples"""
+
+    async def connect(self):
+        self._connected = True
+
+    async def disconnect(self):
+        if self._measuring:
+            await self.stop()
+        self._connected = False
+
+    async def start(self):
+        if not self._connected:
+            raise RuntimeError("sensor not connected")
+        self._measuring = True
+        self._task = asyncio.create_task(self._pump())
+        # the first sample is produced without waiting, so read() works at once
+        await asyncio.sleep(0)
+
+    async def stop(self):
+        self._measuring = False
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _pump(self):
+        try:
+            async for values in self.samples():
+                self._record(*values)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("%s sample generator failed", self.__class__.__name__)
+            self._measuring = False
+
+    async def read(self):
+        if not self._connected:
+            raise RuntimeError("sensor not connected")
+        if not self._measuring:
+            raise RuntimeError("measurement not started")
+        latest = self.buffer.latest()
+        if latest is None:
+            raise RuntimeError("no sample yet")
+        return self.buffer.as_dict(latest[1])
+
+
+class AsyncAcquisition(AcquisitionEngine):
+    """
+    the acquisition engine on a single asyncio event loop
+
+    same interface as AcquisitionEngine (add_sensor, add_listener, latest,
+    stats, start/stop) but every channel is a task on one loop instead of a
+    scheduler thread plus a worker per sensor. blocking sensors are wrapped
+    in BlockingSensorAdapter and share its bounded pool; GeneratedSensor
+    (the dummy sensors) needs no thread at all.
+
+    other coroutines can share the loop through add_service(), e.g. the
+    downlink's TelemetryServer.serve. run() is the coroutine itself for
+    callers that already have a loop; start() runs it on one thread.
+    """
+
+    def __init__(self, executor=None):
+        """
+        args:
+            executor: pool for blocking sensors (default blocking_executor())
+        """
+        super().__init__()
+        self._executor = executor
+        self._services = []
+        self._owned = []
+        self._loop = None
+        self._stop = None
+        self._ready = threading.Event()
+
+    def add_sensor(self, sensor, rate_hz, name=None):
+        """
+        register a sensor to be sampled at rate_hz
+
+        args:
+            sensor: AsyncSensor, or a started BaseSensor (wrapped in the pool)
+            rate_hz: requested sample rate
+            name: channel name (defaults to the sensor class name)
+        """
+        name = name or sensor.__class__.__name__
+        if isinstance(sensor, BaseSensor):
+            sensor = BlockingSensorAdapter(sensor, self._executor)
+        return super().add_sensor(sensor, rate_hz, name)
+
+    def add_service(self, factory):
+        """run factory() - a coroutine - on the acquisition loop until stop()"""
+        if self.is_running:
+            raise RuntimeError("cannot add services while the engine is running")
+        self._services.append(factory)
+
+    def start(self):
+        """run the loop on a background thread"""
+        if self.is_running:
+            return
+        if not self._channels:
+            raise RuntimeError("no sensors registered")
+        self._ready.clear()
+        self._thread = threading.Thread(
+            target=asyncio.run, args=(self.run(),), name="acquisition-loop", daemon=True
+        )
+        self._thread.start()
+        self._ready.wait(timeout=5.0)
+        if not self._thread.is_alive():
+            self._thread = None
+            raise RuntimeError("acquisition loop failed to start")
+
+    def stop(self):
+        """stop every channel and service and wait for the loop to finish"""
+        if self._loop is not None and self._stop is not None:
+            self._loop.call_soon_threadsafe(self._stop.set)
+        if self._thread:
+            self._thread.join(timeout=5.0)
+            self._thread = None
+
+    async def run(self):
+        """sample every channel in the current event loop until stop()"""
+        self._loop = asyncio.get_running_loop()
+        self._stop = asyncio.Event()
+        self._started_at = time.monotonic()
+
+        self._owned = []
+        tasks = []
+        try:
+            # sensors that are not running yet are brought up (and later down) here
+            for channel in self._channels.values():
+                if not channel.sensor.is_measuring:
+                    await channel.sensor.connect()
+                    self._owned.append(channel.sensor)
+                    await channel.sensor.start()
+
+            tasks = [
+                asyncio.create_task(self._poll(c)) for c in self._channels.values()
+            ]
+            tasks += [asyncio.create_task(factory()) for factory in self._services]
+            self._ready.set()
+            await self._stop.wait()
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            for sensor in reversed(self._owned):
+                try:
+                    await sensor.disconnect()
+                except Exception:
+                    logger.exception("error stopping %r", sensor)
+            self._ready.set()
+
+    async def _poll(self, channel):
+        """read one channel on its fixed grid"""
+        async for deadline, missed in ticks(channel.period):
+            channel.overruns += missed
+            started = time.monotonic()
+            try:
+                data = await channel.sensor.read()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                channel.errors += 1
+                channel.last_error = str(e)
+                logger.warning("error reading %s: %s", channel.name, e)
+                continue
+
+            finished = time.monotonic()
+            channel._record(finished, data, started - deadline, finished - started)
+            for callback in self._listeners:
+                try:
+                    callback(channel.name, finished, data)
+                except Exception:
+                    logger.exception("acquisition listener failed for %s", channel.name)
@@ -1,6 +1,10 @@
+import time
 from abc import ABC, abstractmethod
 from enum import Enum
 
+from sensors.ring_buffer import RingBuffer
+from telemetry.instrumentation import timed
+
 
 class SensorType(Enum):
     """enumeration for different sensor communication types"""
@@ -13,22 +17,56 @@ class SensorType(Enum):
 class BaseSensor(ABC):
     """base class for all sensors - supports i2c, analog, and other communication types"""
 
-    def __init__(self, sensor_type=SensorType.I2C, i2c_port="/dev/i2c-1", **kwargs):
+    # names of the numeric values each sample carries, in ring buffer column order
+    FIELDS = ()
+    # default number of samples kept in the ring buffer
+    BUFFER_CAPACITY = 4096
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        # every driver's read() is timed per class (sensor.<class>.read)
+        read = cls.__dict__.get("read")
+        if read is not None and not getattr(read, "__isabstractmethod__", False):
+            cls.read = timed(f"sensor.{cls.__name__}.read")(read)
+
+    def __init__(
+        self,
+        sensor_type=SensorType.I2C,
+        i2c_port="/dev/i2c-1",
+        buffer_capacity=None,
+        **kwargs,
+    ):
         """
         initialize base sensor
 
         args:
             sensor_type: type of sensor communication (i2c, analog, etc.)
             i2c_port: i2c device path for i2c sensors
+            buffer_capacity: samples kept in the ring buffer (default BUFFER_CAPACITY)
             **kwargs: additional sensor-specific parameters (supply_voltage, etc.)
         """
         self.sensor_type = sensor_type
         self.i2c_port = i2c_port if sensor_type == SensorType.I2C else None
         self._measuring = False
 
+        # every sample the sensor produces is kept here, not just the latest
+        self.buffer = RingBuffer(
+            self.FIELDS, capacity=buffer_capacity or self.BUFFER_CAPACITY
+        )
+
         # store any additional parameters for sensor-specific use
         self.sensor_params = kwargs
 
+    def _record(self, *values, timestamp=None):
+        """
+        append one sample to the ring buffer from the measurement thread
+
+        args:
+            *values: one value per entry in FIELDS
+            timestamp: monotonic sample time (defaults to now)
+        """
+        self.buffer.append(time.monotonic() if timestamp is None else timestamp, values)
+
     @abstractmethod
     def connect(self):
         """establish connection to sensor hardware"""
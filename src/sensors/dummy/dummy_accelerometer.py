@@ -1,12 +1,32 @@
+import asyncio
+import logging
 import threading
 import time
+from sensors.async_sensor import GeneratedSensor
 from sensors.base_sensor import BaseSensor
 import random
 
+logger = logging.getLogger(__name__)
+
+SAMPLE_PERIOD_S = 0.02  # 50 Hz update rate
+# starting readings - z-axis assumed to be aligned with gravity
+INITIAL_READINGS = (0.0, 0.0, 1.0)
+
+
+def _readings(x, y, z):
+    """endless random walk of realistic accelerometer variations"""
+    while True:
+        x = round(x + random.uniform(-0.1, 0.1), 2)
+        y = round(y + random.uniform(-0.1, 0.1), 2)
+        z = round(z + random.uniform(-0.05, 0.05), 2)
+        yield x, y, z
+
 
 class Accelerometer(BaseSensor):
+    FIELDS = ("x_g", "y_g", "z_g")
+
     def __init__(self, i2c_port="/dev/null"):
-        super().__init__(i2c_port)
+        super().__init__(i2c_port=i2c_port)
         self._connected = False
         self._thread = None
         self._stop_thread = False
@@ -15,20 +35,15 @@ class Accelerometer(BaseSensor):
         self._product_id = "DummyAccelerometer"
         self._serial_number = "D12345678"
 
-        # current readings
-        self._current_readings = {
-            "x_g": 0.0,
-            "y_g": 0.0,
-            "z_g": 1.0,  # assuming z-axis is aligned with gravity
-        }
+        self._initial_readings = INITIAL_READINGS
 
     def connect(self):
-        print("[DummyAccelerometer] Connecting to dummy accelerometer...")
+        logger.info("Connecting to dummy accelerometer...")
         time.sleep(0.1)  # simulate connection time
         self._connected = True
 
     def disconnect(self):
-        print("[DummyAccelerometer] Disconnecting dummy accelerometer...")
+        logger.info("Disconnecting dummy accelerometer...")
         if self._measuring:
             self.stop()
         self._connected = False
@@ -36,9 +51,11 @@ class Accelerometer(BaseSensor):
     def start(self):
         if not self._connected:
             raise RuntimeError("sensor not connected")
-        print("[DummyAccelerometer] Starting dummy accelerometer measurement.")
+        logger.info("Starting dummy accelerometer measurement.")
         self._measuring = True
         self._stop_thread = False
+        if self.buffer.latest() is None:
+            self._record(*self._initial_readings)
 
         # start background thread to simulate continuous measurement
         self._thread = threading.Thread(target=self._measurement_loop)
@@ -46,7 +63,7 @@ class Accelerometer(BaseSensor):
         self._thread.start()
 
     def stop(self):
-        print("[DummyAccelerometer] Stopping dummy accelerometer measurement.")
+        logger.info("Stopping dummy accelerometer measurement.")
         if self._measuring:
             self._measuring = False
             self._stop_thread = True
@@ -59,11 +76,8 @@ class Accelerometer(BaseSensor):
         if not self._connected:
             raise RuntimeError("Sensor not connected.")
 
-        return {
-            "x_g": self._current_readings["x_g"],
-            "y_g": self._current_readings["y_g"],
-            "z_g": self._current_readings["z_g"],
-        }
+        _, values = self.buffer.latest()
+        return self.buffer.as_dict(values)
 
     def get_info(self):
         """get dummy accelerometer info"""
@@ -75,20 +89,12 @@ class Accelerometer(BaseSensor):
 
     def _measurement_loop(self):
         """background thread that updates dummy readings"""
+        readings = _readings(*self.buffer.latest()[1])
         while not self._stop_thread:
-            # simulate realistic accelerometer variations
-            x_noise = random.uniform(-0.1, 0.1)
-            y_noise = random.uniform(-0.1, 0.1)
-            z_noise = random.uniform(-0.05, 0.05)
-
-            # update current readings
-            self._current_readings = {
-                "x_g": round(self._current_readings["x_g"] + x_noise, 2),
-                "y_g": round(self._current_readings["y_g"] + y_noise, 2),
-                "z_g": round(self._current_readings["z_g"] + z_noise, 2),
-            }
+            # every sample goes into the ring buffer
+            self._record(*next(readings))
 
-            time.sleep(0.02)  # 50 Hz update rate
+            time.sleep(SAMPLE_PERIOD_S)
 
     def __enter__(self):
         """context manager entry"""
@@ -98,3 +104,15 @@ class Accelerometer(BaseSensor):
     def __exit__(self, exc_type, exc_val, exc_tb):
         """context manager exit"""
         self.disconnect()
+
+
+class AsyncAccelerometer(GeneratedSensor):
+    """dummy accelerometer for the asyncio sensor api - runs on the event loop, no thread"""
+
+    FIELDS = Accelerometer.FIELDS
+
+    async def samples(self):
+        yield INITIAL_READINGS
+        for values in _readings(*INITIAL_READINGS):
+            await asyncio.sleep(SAMPLE_PERIOD_S)
+            yield values
@@ -1,40 +1,65 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 
+import asyncio
+import logging
 import time
 import random
 import threading
+from sensors.async_sensor import GeneratedSensor
 from sensors.base_sensor import BaseSensor
 
+logger = logging.getLogger(__name__)
+
+SAMPLE_PERIOD_S = 0.02  # 50 Hz update rate
+BASE_FLOW = 25.0
+BASE_TEMP = 22.0
+
+
+def _readings(base_flow, base_temp):
+    """endless (flow, temperature, flags) samples around the base values"""
+    while True:
+        # simulate realistic flow variations
+        flow = max(0, base_flow + random.uniform(-2.0, 2.0))
+
+        # simulate temperature variations
+        temperature = base_temp + random.uniform(-0.5, 0.5)
+
+        # occasionally set flags
+        if random.random() < 0.05:  # 5% chance
+            flags = random.randint(1, 3)
+        else:
+            flags = 0
+
+        yield flow, temperature, flags
+
 
 class FlowSensor(BaseSensor):
     """dummy flow sensor for testing"""
 
+    # same keys as the real slf3s driver
+    FIELDS = ("flow_ml_min", "temperature_c", "flags")
+
     def __init__(self, i2c_port="/dev/i2c-1", slave_address=0x08):
-        super().__init__(i2c_port)
+        super().__init__(i2c_port=i2c_port)
         self.slave_address = slave_address
         self._connected = False
         self._thread = None
         self._stop_thread = False
 
         # dummy sensor parameters
-        self._base_flow = 25.0
-        self._base_temp = 22.0
+        self._base_flow = BASE_FLOW
+        self._base_temp = BASE_TEMP
         self._product_id = "SF06-LF-DUMMY"
         self._serial_number = "D12345678"
 
-        # current readings
-        self._current_flow = self._base_flow
-        self._current_temp = self._base_temp
-        self._current_flags = 0
-
     def connect(self):
-        print("[DummyFlowSensor] Initializing dummy flow sensor")
+        logger.info("Initializing dummy flow sensor")
         time.sleep(0.1)  # simulate connection time
         self._connected = True
 
     def disconnect(self):
-        print("[DummyFlowSensor] Disconnecting dummy flow sensor")
+        logger.info("Disconnecting dummy flow sensor")
         if self._measuring:
             self.stop()
         self._connected = False
@@ -44,9 +69,11 @@ class FlowSensor(BaseSensor):
         if not self._connected:
             raise RuntimeError("sensor not connected")
 
-        print("[DummySlowSensor] Starting dummy flow measurement")
+        logger.info("Starting dummy flow measurement")
         self._measuring = True
         self._stop_thread = False
+        if self.buffer.latest() is None:
+            self._record(self._base_flow, self._base_temp, 0)
 
         # start background thread to simulate continuous measurement
         self._thread = threading.Thread(target=self._measurement_loop)
@@ -56,7 +83,7 @@ class FlowSensor(BaseSensor):
     def stop(self):
         """stop dummy measurement"""
         if self._measuring:
-            print("[DummyFlowSensor] Stopping dummy flow measurement")
+            logger.info("Stopping dummy flow measurement")
             self._measuring = False
             self._stop_thread = True
             if self._thread:
@@ -69,10 +96,11 @@ class FlowSensor(BaseSensor):
         if not self._measuring:
             raise RuntimeError("measurement not started")
 
+        _, (flow, temperature, flags) = self.buffer.latest()
         return {
-            "flow": self._current_flow,
-            "temperature": self._current_temp,
-            "flags": self._current_flags,
+            "flow_ml_min": float(flow),
+            "temperature_c": float(temperature),
+            "flags": int(flags),
             "timestamp": time.time(),
         }
 
@@ -89,22 +117,11 @@ class FlowSensor(BaseSensor):
 
     def _measurement_loop(self):
         """background thread that updates dummy readings"""
+        readings = _readings(self._base_flow, self._base_temp)
         while not self._stop_thread:
-            # simulate realistic flow variations
-            flow_noise = random.uniform(-2.0, 2.0)
-            self._current_flow = max(0, self._base_flow + flow_noise)
-
-            # simulate temperature variations
-            temp_noise = random.uniform(-0.5, 0.5)
-            self._current_temp = self._base_temp + temp_noise
+            self._record(*next(readings))
 
-            # occasionally set flags
-            if random.random() < 0.05:  # 5% chance
-                self._current_flags = random.randint(1, 3)
-            else:
-                self._current_flags = 0
-
-            time.sleep(0.02)  # 50 Hz update rate
+            time.sleep(SAMPLE_PERIOD_S)
 
     def __enter__(self):
         self.connect()
@@ -112,3 +129,14 @@ class FlowSensor(BaseSensor):
 
     def __exit__(self, exc_type, exc_val, exc_tb):
         self.disconnect()
+
+
+class AsyncFlowSensor(GeneratedSensor):
+    """dummy flow sensor for the asyncio sensor api - runs on the event loop, no thread"""
+
+    FIELDS = FlowSensor.FIELDS
+
+    async def samples(self):
+        for values in _readings(BASE_FLOW, BASE_TEMP):
+            yield values
+            await asyncio.sleep(SAMPLE_PERIOD_S)
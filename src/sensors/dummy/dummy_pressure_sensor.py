@@ -1,33 +1,54 @@
+import asyncio
+import logging
 import time
+from sensors.async_sensor import GeneratedSensor
 from sensors.base_sensor import BaseSensor
 import random
 import threading
 
+logger = logging.getLogger(__name__)
+
+SAMPLE_PERIOD_S = 0.02  # 50 Hz update rate
+BASE_PRESSURE = 14.70  # psi (1013.25 hPa)
+BASE_TEMP = 25.0  # Celsius
+
+
+def _readings(base_pressure, base_temp):
+    """endless (pressure, temperature) samples around the base values"""
+    while True:
+        # simulate realistic pressure variations
+        yield (
+            round(base_pressure + random.uniform(-0.015, 0.015), 2),
+            round(base_temp + random.uniform(-0.5, 0.5), 2),
+        )
+
 
 class PressureSensor(BaseSensor):
-    def __init__(self, i2c_port="/dev/null"):
-        super().__init__(i2c_port)
+    # same keys as the real lps22 driver
+    FIELDS = ("pressure_psi", "temperature_c")
+
+    def __init__(self, i2c_port="/dev/null", address=0x5D):
+        super().__init__(i2c_port=i2c_port)
+        self.address = address
 
         self._connected = False
         self._thread = None
         self._stop_thread = False
 
         # dummy sensor parameters
-        self._base_pressure = 1013.25  # hPa
-        self._base_temp = 25.0  # Celsius
+        self._base_pressure = BASE_PRESSURE
+        self._base_temp = BASE_TEMP
         self._product_id = "DummyPressureSensor"
         self._serial_number = "D12345678"
 
-        # current readings
-        self._current_pressure = self._base_pressure
-        self._current_temp = self._base_temp
-
     def start(self):
         if not self._connected:
             raise RuntimeError("Call connect() first.")
-        print("[DummyPressureSensor] Starting dummy pressure sensor")
+        logger.info("Starting dummy pressure sensor")
         self._measuring = True
         self._stop_thread = False
+        if self.buffer.latest() is None:
+            self._record(self._base_pressure, self._base_temp)
 
         # start background thread to simulate continuous measurement
         self._thread = threading.Thread(target=self._measurement_loop)
@@ -35,7 +56,7 @@ class PressureSensor(BaseSensor):
         self._thread.start()
 
     def stop(self):
-        print("[DummyPressureSensor] Stopping dummy pressure sensor")
+        logger.info("Stopping dummy pressure sensor")
         if self._measuring:
             self._measuring = False
             self._stop_thread = True
@@ -43,12 +64,12 @@ class PressureSensor(BaseSensor):
                 self._thread.join(timeout=1.0)
 
     def connect(self):
-        print("[DummyPressureSensor] Connecting dummy pressure sensor")
+        logger.info("Connecting dummy pressure sensor")
         time.sleep(0.1)
         self._connected = True
 
     def disconnect(self):
-        print("[DummyPressureSensor] Disconnecting dummy pressure sensor")
+        logger.info("Disconnecting dummy pressure sensor")
         if self._measuring:
             self.stop()
         self._connected = False
@@ -60,10 +81,8 @@ class PressureSensor(BaseSensor):
         if not self._measuring:
             raise RuntimeError("measurement not started")
 
-        return {
-            "pressure_hPa": self._current_pressure,
-            "temperature_C": self._current_temp,
-        }
+        _, values = self.buffer.latest()
+        return self.buffer.as_dict(values)
 
     def get_info(self):
         """get sensor info"""
@@ -78,15 +97,11 @@ class PressureSensor(BaseSensor):
 
     def _measurement_loop(self):
         """background thread that updates dummy readings"""
+        readings = _readings(self._base_pressure, self._base_temp)
         while not self._stop_thread:
-            # simulate realistic pressure variations
-            pressure_noise = random.uniform(-1.0, 1.0)
-            temp_noise = random.uniform(-0.5, 0.5)
-
-            self._current_pressure = round(1013 + pressure_noise, 2)
-            self._current_temp = round(25 + temp_noise, 2)
+            self._record(*next(readings))
 
-            time.sleep(0.02)  # 50 Hz update rate
+            time.sleep(SAMPLE_PERIOD_S)
 
     def __enter__(self):
         """context manager entry"""
@@ -96,3 +111,14 @@ class PressureSensor(BaseSensor):
     def __exit__(self, exc_type, exc_val, exc_tb):
         """context manager exit"""
         self.disconnect()
+
+
+class AsyncPressureSensor(GeneratedSensor):
+    """dummy pressure sensor for the asyncio sensor api - runs on the event loop, no thread"""
+
+    FIELDS = PressureSensor.FIELDS
+
+    async def samples(self):
+        for values in _readings(BASE_PRESSURE, BASE_TEMP):
+            yield values
+            await asyncio.sleep(SAMPLE_PERIOD_S)
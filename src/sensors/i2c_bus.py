@@ -0,0 +1,135 @@
+import logging
+import threading
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+
+class _LockedTransceiver:
+    """sensirion transceiver proxy that serializes transfers on the bus lock"""
+
+    def __init__(self, transceiver, lock):
+        self._transceiver = transceiver
+        self._lock = lock
+
+    def transceive(self, *args, **kwargs):
+        with self._lock:
+            return self._transceiver.transceive(*args, **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self._transceiver, name)
+
+
+class SharedI2CBus:
+    """
+    one open i2c bus shared by every device attached to it
+
+    the bus owns a single handle per driver stack (a blinka busio object for
+    the adafruit drivers, a LinuxI2cTransceiver for the sensirion drivers),
+    opened on first use and closed when the last device detaches. every
+    transfer goes through one lock, and transaction() holds it across several
+    transfers so a device's reads run back-to-back without another device
+    cutting in between them.
+    """
+
+    def __init__(self, port):
+        self.port = port
+        self.lock = threading.RLock()
+        self._users = 0
+        self._busio = None
+        self._transceiver = None
+
+    @property
+    def _is_board_bus(self):
+        return self.port == "/dev/i2c-1"
+
+    @property
+    def users(self):
+        return self._users
+
+    @contextmanager
+    def transaction(self):
+        """hold the bus for a group of transfers"""
+        with self.lock:
+            yield self
+
+    @property
+    def busio(self):
+        """shared busio.I2C-compatible handle for adafruit drivers"""
+        with self.lock:
+            if self._busio is None:
+                self._busio = self._open_busio()
+            return self._busio
+
+    def transceiver(self):
+        """shared, lock-serialized sensirion transceiver"""
+        with self.lock:
+            if self._transceiver is None:
+                from sensirion_i2c_driver import LinuxI2cTransceiver
+
+                transceiver = LinuxI2cTransceiver(self.port)
+                transceiver.open()
+                self._transceiver = _LockedTransceiver(transceiver, self.lock)
+            return self._transceiver
+
+    def _open_busio(self):
+        if self._is_board_bus:
+            import board
+
+            return board.I2C()
+
+        # any other /dev/i2c-N needs the extended bus helper
+        from adafruit_extended_bus import ExtendedI2C
+
+        return ExtendedI2C(int(self.port.rsplit("-", 1)[-1]))
+
+    def close(self):
+        """close every handle - called when the last device detaches"""
+        with self.lock:
+            if self._transceiver is not None:
+                try:
+                    self._transceiver.close()
+                except Exception as e:
+                    logger.warning("error closing %s transceiver: %s", self.port, e)
+                self._transceiver = None
+            if self._busio is not None:
+                # board.I2C() is a process-wide singleton - leave it open
+                if not self._is_board_bus:
+                    try:
+                        self._busio.deinit()
+                    except Exception as e:
+                        logger.warning("error closing %s: %s", self.port, e)
+                self._busio = None
+
+
+class I2CBusManager:
+    """registry of shared buses, reference counted by attached devices"""
+
+    def __init__(self):
+        self._buses = {}
+        self._lock = threading.Lock()
+
+    def attach(self, port="/dev/i2c-1"):
+        """get the shared bus for a port, opening it on first use"""
+        with self._lock:
+            bus = self._buses.get(port)
+            if bus is None:
+                bus = SharedI2CBus(port)
+                self._buses[port] = bus
+            bus._users += 1
+            return bus
+
+    def detach(self, bus):
+        """release a device's hold on a bus, closing it after the last one"""
+        with self._lock:
+            bus._users -= 1
+            if bus._users <= 0:
+                bus.close()
+                self._buses.pop(bus.port, None)
+
+    def buses(self):
+        return dict(self._buses)
+
+
+# process-wide manager used by the i2c sensor drivers
+bus_manager = I2CBusManager()
@@ -1,9 +1,16 @@
+import logging
+
 from sensors.base_sensor import BaseSensor, SensorType
+from telemetry.sink import event
 import analogio
 import board
 
+logger = logging.getLogger(__name__)
+
 
 class Accelerometer(BaseSensor):
+    FIELDS = ("x_g", "y_g", "z_g")
+
     def __init__(self, supply_voltage=3.3):
         """
         initialize adxl326 analog accelerometer
@@ -24,7 +31,12 @@ class Accelerometer(BaseSensor):
         self._y = analogio.AnalogIn(board.A2)
         self._z = analogio.AnalogIn(board.A3)
         self._connected = True
-        print("adxl326 accelerometer connected to analog pins")
+        event(
+            logger,
+            "sensor.connected",
+            msg="adxl326 accelerometer connected to analog pins",
+            sensor="adxl326",
+        )
 
     def disconnect(self):
         """disconnect and cleanup analog pin resources"""
@@ -33,7 +45,12 @@ class Accelerometer(BaseSensor):
             self._y.deinit()
             self._z.deinit()
             self._connected = False
-            print("adxl326 accelerometer disconnected")
+            event(
+                logger,
+                "sensor.disconnected",
+                msg="adxl326 accelerometer disconnected",
+                sensor="adxl326",
+            )
 
     def start(self):
         """start measuring acceleration"""
@@ -50,10 +67,15 @@ class Accelerometer(BaseSensor):
         if not self._measuring or not self._connected:
             raise RuntimeError("sensor not ready - ensure connected and measuring")
 
+        x_g = self._convert_to_g(self._x)
+        y_g = self._convert_to_g(self._y)
+        z_g = self._convert_to_g(self._z)
+        self._record(x_g, y_g, z_g)
+
         return {
-            "x_g": self._convert_to_g(self._x),
-            "y_g": self._convert_to_g(self._y),
-            "z_g": self._convert_to_g(self._z),
+            "x_g": x_g,
+            "y_g": y_g,
+            "z_g": z_g,
         }
 
     def _convert_to_g(self, axis):
@@ -1,34 +1,49 @@
 #!/usr/bin/env python3
 
-import subprocess
-import time
+import os
+import sys
 import threading
 
-def capture_image():
-    timestamp = time.strftime("%Y%m%d_%H%M%S")
-    filename = f"image_{timestamp}.jpg"
+# run as a script from anywhere: make src/ importable
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from sim.backend import install as install_simulator, is_enabled as simulate
+
+if simulate():
+    install_simulator()
+
+from camera.manager import CameraManager
+
+# stills and videos are taken from the running streams, so there is no
+# rpicam process to start per capture
+CAPTURE_DIR = "."
+
+
+def capture_image(cameras):
     try:
-        subprocess.run(["rpicam-still", "-o", filename, "--nopreview"], check=True)
-        print(f"[✓] Image captured: {filename}")
-    except subprocess.CalledProcessError as e:
+        for index, (timestamp, filename) in cameras.capture_stills(CAPTURE_DIR).items():
+            print(f"[✓] Image captured: {filename} (camera {index}, t={timestamp:.3f})")
+    except Exception as e:
         print(f"[!] Failed to capture image: {e}")
 
-def record_video(duration=None, stop_event=None):
-    timestamp = time.strftime("%Y%m%d_%H%M%S")
-    filename = f"video_{timestamp}.h264"
-    print(f"[•] Recording video to {filename}...")
 
+def record_video(cameras, duration=None, stop_event=None):
     try:
+        paths = cameras.start_recording(CAPTURE_DIR)
+        for filename in paths.values():
+            print(f"[•] Recording video to {filename}...")
         if duration:
-            subprocess.run(["rpicam-vid", "-o", filename, "-t", str(int(duration) * 1000), "--nopreview"], check=True)
+            threading.Event().wait(duration)
         else:
-            process = subprocess.Popen(["rpicam-vid", "-o", filename, "--timeout", "0", "--nopreview"])
             stop_event.wait()
-            process.terminate()
+        cameras.stop_recording()
+        for filename in paths.values():
             print(f"[✓] Stopped recording video: {filename}")
     except Exception as e:
+        cameras.stop_recording()
         print(f"[!] Failed to record video: {e}")
 
+
 def main():
     print("📷 Camera Control")
     print("Type one of the following:")
@@ -40,47 +55,54 @@ def main():
     video_thread = None
     stop_event = threading.Event()
 
-    while True:
-        try:
-            cmd = input(">>> ").strip().lower()
-            if cmd == "capture":
-                capture_image()
+    with CameraManager((0, 1)) as cameras:
+        if not cameras.cameras:
+            print("[!] No camera found.")
+            return
+        while True:
+            try:
+                cmd = input(">>> ").strip().lower()
+                if cmd == "capture":
+                    capture_image(cameras)
 
-            elif cmd.startswith("record"):
-                parts = cmd.split()
-                if len(parts) == 2 and parts[1].isdigit():
-                    record_video(duration=int(parts[1]))
-                else:
+                elif cmd.startswith("record"):
+                    parts = cmd.split()
                     if video_thread and video_thread.is_alive():
                         print("[!] Already recording.")
+                    elif len(parts) == 2 and parts[1].isdigit():
+                        record_video(cameras, duration=int(parts[1]))
                     else:
                         stop_event.clear()
-                        video_thread = threading.Thread(target=record_video, kwargs={"stop_event": stop_event})
+                        video_thread = threading.Thread(
+                            target=record_video,
+                            args=(cameras,),
+                            kwargs={"stop_event": stop_event},
+                        )
                         video_thread.start()
 
-            elif cmd == "stop":
-                if video_thread and video_thread.is_alive():
-                    stop_event.set()
-                    video_thread.join()
+                elif cmd == "stop":
+                    if video_thread and video_thread.is_alive():
+                        stop_event.set()
+                        video_thread.join()
+                    else:
+                        print("[!] Not currently recording.")
+
+                elif cmd == "exit":
+                    if video_thread and video_thread.is_alive():
+                        stop_event.set()
+                        video_thread.join()
+                    break
+
                 else:
-                    print("[!] Not currently recording.")
+                    print("[!] Unknown command. Try `capture`, `record`, `record <seconds>`, or `stop`.")
 
-            elif cmd == "exit":
+            except KeyboardInterrupt:
+                print("\n[!] Keyboard interrupt received.")
                 if video_thread and video_thread.is_alive():
                     stop_event.set()
                     video_thread.join()
                 break
 
-            else:
-                print("[!] Unknown command. Try `capture`, `record`, `record <seconds>`, or `stop`.")
-
-        except KeyboardInterrupt:
-            print("\n[!] Keyboard interrupt received.")
-            if video_thread and video_thread.is_alive():
-                stop_event.set()
-                video_thread.join()
-            break
-
 
 if __name__ == "__main__":
     main()
@@ -6,16 +6,22 @@ import time
 import logging
 
 from sensirion_driver_adapters.i2c_adapter.i2c_channel import I2cChannel
-from sensirion_i2c_driver import CrcCalculator, I2cConnection, LinuxI2cTransceiver
+from sensirion_i2c_driver import CrcCalculator, I2cConnection
 from sensirion_i2c_sf06_lf.commands import InvFlowScaleFactors
 from sensirion_i2c_sf06_lf.device import Sf06LfDevice
 
 from sensors.base_sensor import BaseSensor, SensorType
+from sensors.i2c_bus import bus_manager
+from telemetry.sink import event
+
+logger = logging.getLogger(__name__)
 
 
 class FlowSensor(BaseSensor):
     """slf3s-0600f liquid flow sensor"""
 
+    FIELDS = ("flow_ml_min", "temperature_c", "flags")
+
     def __init__(self, i2c_port="/dev/i2c-1", slave_address=0x08):
         """
         initialize slf3s-0600f flow sensor
@@ -26,6 +32,7 @@ class FlowSensor(BaseSensor):
         """
         super().__init__(sensor_type=SensorType.I2C, i2c_port=i2c_port)
         self.slave_address = slave_address
+        self._bus = None
         self._transceiver = None
         self._channel = None
         self._device = None
@@ -38,8 +45,9 @@ class FlowSensor(BaseSensor):
         """connect to sensor and initialize i2c communication"""
         try:
             if self._transceiver is None:
-                self._transceiver = LinuxI2cTransceiver(self.i2c_port)
-                self._transceiver.__enter__()
+                # share the bus handle and lock with the other i2c sensors
+                self._bus = bus_manager.attach(self.i2c_port)
+                self._transceiver = self._bus.transceiver()
                 self._channel = I2cChannel(
                     I2cConnection(self._transceiver),
                     slave_address=self.slave_address,
@@ -52,10 +60,15 @@ class FlowSensor(BaseSensor):
                     self._device.stop_continuous_measurement()
                     time.sleep(0.1)
                 except Exception as e:
-                    logging.warning(f"could not stop existing measurement: {e}")
+                    logger.warning("could not stop existing measurement: %s", e)
 
                 self._connected = True
-                print("slf3s-0600f flow sensor connected")
+                event(
+                    logger,
+                    "sensor.connected",
+                    msg="slf3s-0600f flow sensor connected",
+                    sensor="slf3s-0600f",
+                )
 
         except Exception as e:
             self._cleanup()
@@ -66,15 +79,21 @@ class FlowSensor(BaseSensor):
         if self._measuring:
             self.stop()
         self._cleanup()
-        print("slf3s-0600f flow sensor disconnected")
+        event(
+            logger,
+            "sensor.disconnected",
+            msg="slf3s-0600f flow sensor disconnected",
+            sensor="slf3s-0600f",
+        )
 
     def _cleanup(self):
         """internal cleanup method"""
-        if self._transceiver:
+        if self._bus:
             try:
-                self._transceiver.__exit__(None, None, None)
+                bus_manager.detach(self._bus)
             except Exception:
                 pass
+            self._bus = None
             self._transceiver = None
             self._channel = None
             self._device = None
@@ -88,7 +107,12 @@ class FlowSensor(BaseSensor):
         try:
             self._device.start_h2o_continuous_measurement()
             self._measuring = True
-            print("flow measurement started")
+            event(
+                logger,
+                "sensor.started",
+                msg="flow measurement started",
+                sensor="slf3s-0600f",
+            )
         except Exception as e:
             raise RuntimeError(f"failed to start measurement: {e}")
 
@@ -98,9 +122,14 @@ class FlowSensor(BaseSensor):
             try:
                 self._device.stop_continuous_measurement()
                 self._measuring = False
-                print("flow measurement stopped")
+                event(
+                    logger,
+                    "sensor.stopped",
+                    msg="flow measurement stopped",
+                    sensor="slf3s-0600f",
+                )
             except Exception as e:
-                logging.warning(f"error stopping measurement: {e}")
+                logger.warning("error stopping measurement: %s", e)
 
     def read(self):
         """read flow data from sensor"""
@@ -113,6 +142,7 @@ class FlowSensor(BaseSensor):
             flow, temperature, flags = self._device.read_measurement_data(
                 self.scale_factor
             )
+            self._record(flow, temperature, flags)
             return {
                 "flow_ml_min": flow,  # more descriptive name
                 "temperature_c": temperature,
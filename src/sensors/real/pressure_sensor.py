@@ -1,30 +1,108 @@
 # lps22_sensor.py
 
+import logging
+import time
+
+import numpy as np
+
 from sensors.base_sensor import BaseSensor, SensorType
-import board
+from sensors.i2c_bus import bus_manager
+from telemetry.sink import event
 import adafruit_lps2x
 
+logger = logging.getLogger(__name__)
+
+HPA_TO_PSI = 0.0145038
+
+# registers shared by both lps22 variants
+_WHO_AM_I = 0x0F
+_CTRL_REG1 = 0x10
+_CTRL_REG2 = 0x11
+_ODR_MASK = 0x70
+_BDU = 0x02
+
+# fifo register maps - the adafruit driver only exposes single-shot reads, so
+# stream mode is configured directly through its i2c device
+_FIFO_MAPS = {
+    # lps22hb: 32-sample fifo, data read back through the output registers
+    0xB1: {
+        "name": "lps22hb",
+        "fifo_ctrl": 0x14,
+        "fifo_status": 0x26,
+        "level_mask": 0x3F,
+        "overrun_bit": 0x40,
+        "fifo_data": 0x28,
+        "depth": 32,
+        "fifo_en": 0x40,  # ctrl_reg2 bit
+        "stream_mode": 0x40,  # f_mode = 010 in bits 7:5
+        "rates": {1: 1, 10: 2, 25: 3, 50: 4, 75: 5},
+    },
+    # lps22hh: 128-sample fifo with dedicated output registers
+    0xB3: {
+        "name": "lps22hh",
+        "fifo_ctrl": 0x13,
+        "fifo_status": 0x25,
+        "level_mask": 0xFF,
+        "overrun_bit": None,
+        "fifo_data": 0x78,
+        "depth": 128,
+        "fifo_en": 0x00,
+        "stream_mode": 0x02,  # f_mode = 010 (continuous) in bits 2:0
+        "rates": {1: 1, 10: 2, 25: 3, 50: 4, 75: 5, 100: 6, 200: 7},
+    },
+}
+_FIFO_SAMPLE_BYTES = 5  # 3 bytes pressure + 2 bytes temperature
+
 
 class PressureSensor(BaseSensor):
-    def __init__(self, i2c_port="/dev/i2c-1"):
+    FIELDS = ("pressure_psi", "temperature_c")
+
+    def __init__(self, i2c_port="/dev/i2c-1", address=0x5D):
+        """
+        initialize lps22 pressure sensor
+
+        args:
+            i2c_port: i2c device path
+            address: i2c address (0x5D default, 0x5C with SDO pulled low)
+        """
         super().__init__(sensor_type=SensorType.I2C, i2c_port=i2c_port)
+        self.address = address
+        self._bus = None
         self._i2c = None
         self._sensor = None
         self._connected = False
 
+        # set while the hardware fifo is streaming
+        self._fifo = None
+        self._fifo_rate_hz = None
+        self._saved_ctrl = None
+
     def connect(self):
         """establish i2c connection and initialize sensor"""
         if self._connected:
-            print("lps22 pressure sensor already connected")
+            logger.info("lps22 pressure sensor already connected")
             return
 
-        # use board.I2C() instead of busio.I2C()
-        self._i2c = board.I2C()
+        # share one bus handle with every other device on this port
+        self._bus = bus_manager.attach(self.i2c_port)
+        try:
+            self._i2c = self._bus.busio
 
-        # create LPS22 sensor instance
-        self._sensor = adafruit_lps2x.LPS22(self._i2c)
+            # create LPS22 sensor instance
+            with self._bus.transaction():
+                self._sensor = adafruit_lps2x.LPS22(self._i2c, address=self.address)
+        except Exception:
+            bus_manager.detach(self._bus)
+            self._bus = None
+            raise
         self._connected = True
-        print("lps22 pressure sensor connected")
+        event(
+            logger,
+            "sensor.connected",
+            msg=f"lps22 pressure sensor connected at {self.address:#04x}",
+            sensor="lps22",
+            address=self.address,
+        )
 
     def disconnect(self):
         """disconnect and cleanup sensor resources"""
@@ -33,11 +111,21 @@ class PressureSensor(BaseSensor):
 
         if self._measuring:
             self.stop()
+        if self._fifo:
+            self.stop_fifo()
 
         self._sensor = None
         self._i2c = None
+        bus_manager.detach(self._bus)
+        self._bus = None
         self._connected = False
-        print("lps22 pressure sensor disconnected")
+        event(
+            logger,
+            "sensor.disconnected",
+            msg=f"lps22 pressure sensor at {self.address:#04x} disconnected",
+            sensor="lps22",
+            address=self.address,
+        )
 
     def start(self):
         """start pressure measurement"""
@@ -59,11 +147,28 @@ class PressureSensor(BaseSensor):
         if not self._measuring:
             raise RuntimeError("sensor not measuring - call start() first")
 
-        pressure_hpa = round(self._sensor.pressure, 2)
-        temperature_c = round(self._sensor.temperature, 2)
+        # in stream mode the output registers belong to the fifo - drain it
+        # and report the newest sample instead
+        if self._fifo:
+            batch = self.read_fifo()
+            if len(batch["timestamp"]) == 0:
+                latest = self.buffer.latest()
+                if latest is None:
+                    raise RuntimeError("fifo has not produced a sample yet")
+                return self.buffer.as_dict(latest[1])
+            return {
+                "pressure_psi": float(batch["pressure_psi"][-1]),
+                "temperature_c": float(batch["temperature_c"][-1]),
+            }
+
+        # both reads back-to-back while holding the bus
+        with self._bus.transaction():
+            pressure_hpa = round(self._sensor.pressure, 2)
+            temperature_c = round(self._sensor.temperature, 2)
     
         # convert hPa → psi
-        pressure_psi = round(pressure_hpa * 0.0145038, 2)
+        pressure_psi = round(pressure_hpa * HPA_TO_PSI, 2)
+        self._record(pressure_psi, temperature_c)
 
 
         return {
@@ -71,6 +176,134 @@ class PressureSensor(BaseSensor):
             "temperature_c": temperature_c,
         }
 
+    @property
+    def fifo_rate_hz(self):
+        """output data rate while streaming, None in single-shot mode"""
+        return self._fifo_rate_hz
+
+    def start_fifo(self, rate_hz=75):
+        """
+        put the sensor in continuous (stream) fifo mode at a native output rate
+
+        the chip samples on its own clock and buffers up to 32 (lps22hb) or
+        128 (lps22hh) samples, which read_fifo() then drains in a single
+        burst transaction. drain at least every depth / rate_hz seconds or the
+        oldest samples are overwritten.
+
+        args:
+            rate_hz: output data rate - 1, 10, 25, 50, 75 (and 100, 200 on the hh)
+        """
+        if not self._connected:
+            raise RuntimeError("sensor not connected - call connect() first")
+
+        chip_id = self._read_register(_WHO_AM_I)
+        fifo = _FIFO_MAPS.get(chip_id)
+        if fifo is None:
+            raise RuntimeError(f"no fifo support for chip id {chip_id:#04x}")
+        if rate_hz not in fifo["rates"]:
+            raise ValueError(
+                f"{fifo['name']} supports fifo rates {sorted(fifo['rates'])} Hz"
+            )
+
+        ctrl1 = self._read_register(_CTRL_REG1)
+        ctrl2 = self._read_register(_CTRL_REG2)
+        if self._saved_ctrl is None:
+            self._saved_ctrl = (ctrl1, ctrl2)
+
+        # bypass first to flush anything left over, then switch to stream mode
+        self._write_register(fifo["fifo_ctrl"], 0x00)
+        self._write_register(_CTRL_REG2, ctrl2 | fifo["fifo_en"])
+        self._write_register(
+            _CTRL_REG1,
+            (ctrl1 & ~_ODR_MASK) | (fifo["rates"][rate_hz] << 4) | _BDU,
+        )
+        self._write_register(fifo["fifo_ctrl"], fifo["stream_mode"])
+
+        self._fifo = fifo
+        self._fifo_rate_hz = rate_hz
+        return rate_hz
+
+    def stop_fifo(self):
+        """return the sensor to bypass mode and its previous output data rate"""
+        if not self._fifo:
+            return
+        self._write_register(self._fifo["fifo_ctrl"], 0x00)
+        if self._saved_ctrl is not None:
+            ctrl1, ctrl2 = self._saved_ctrl
+            self._write_register(_CTRL_REG1, ctrl1)
+            self._write_register(_CTRL_REG2, ctrl2)
+            self._saved_ctrl = None
+        self._fifo = None
+        self._fifo_rate_hz = None
+
+    def read_fifo(self):
+        """
+        drain every buffered sample in one burst read
+
+        samples are appended to the ring buffer and also returned as arrays.
+        the chip does not timestamp its fifo, so sample times are spaced at
+        the output data rate back from the moment of the drain.
+
+        returns:
+            dict of numpy arrays ("timestamp", "pressure_psi", "temperature_c")
+            plus "overrun" (True if the fifo filled and samples were lost)
+        """
+        if not self._fifo:
+            raise RuntimeError("fifo not running - call start_fifo() first")
+
+        fifo = self._fifo
+        with self._bus.transaction():
+            status = self._read_register(fifo["fifo_status"])
+            drained_at = time.monotonic()
+            level = min(status & fifo["level_mask"], fifo["depth"])
+            overrun = bool(fifo["overrun_bit"] and status & fifo["overrun_bit"])
+
+            if level == 0:
+                empty = np.empty(0)
+                return {
+                    "timestamp": empty,
+                    "pressure_psi": empty,
+                    "temperature_c": empty,
+                    "overrun": overrun,
+                }
+
+            # auto-increment wraps from the last output register back to the
+            # first, so the whole fifo comes out in one transaction
+            raw = bytearray(level * _FIFO_SAMPLE_BYTES)
+            with self._sensor.i2c_device as device:
+                device.write_then_readinto(bytes([fifo["fifo_data"]]), raw)
+
+        samples = np.frombuffer(raw, dtype=np.uint8).reshape(level, _FIFO_SAMPLE_BYTES)
+        samples = samples.astype(np.int32)
+        pressure_raw = samples[:, 0] | (samples[:, 1] << 8) | (samples[:, 2] << 16)
+        pressure_raw = (pressure_raw ^ 0x800000) - 0x800000  # 24-bit two's complement
+        temperature_raw = samples[:, 3] | (samples[:, 4] << 8)
+        temperature_raw = (temperature_raw ^ 0x8000) - 0x8000
+
+        pressure_psi = np.round(pressure_raw / 4096.0 * HPA_TO_PSI, 2)
+        temperature_c = np.round(temperature_raw / 100.0, 2)
+        timestamps = drained_at - np.arange(level - 1, -1, -1) / self._fifo_rate_hz
+
+        self.buffer.extend(timestamps, np.column_stack((pressure_psi, temperature_c)))
+        return {
+            "timestamp": timestamps,
+            "pressure_psi": pressure_psi,
+            "temperature_c": temperature_c,
+            "overrun": overrun,
+        }
+
+    def _read_register(self, register):
+        """read one 8-bit register"""
+        buf = bytearray(1)
+        with self._bus.transaction(), self._sensor.i2c_device as device:
+            device.write_then_readinto(bytes([register]), buf)
+        return buf[0]
+
+    def _write_register(self, register, value):
+        """write one 8-bit register"""
+        with self._bus.transaction(), self._sensor.i2c_device as device:
+            device.write(bytes([register, value & 0xFF]))
+
     def __enter__(self):
         """context manager entry"""
         self.connect()
@@ -1,6 +1,14 @@
 import RPi.GPIO as GPIO
+import logging
+import threading
 import time
 
+from sensors.ring_buffer import RingBuffer
+from telemetry.instrumentation import timed
+from telemetry.sink import event
+
+logger = logging.getLogger(__name__)
+
 class SolenoidValve:
     def __init__(self, pin=6):  # BCM6 = physical pin 31
         self.pin = pin
@@ -9,21 +17,34 @@ class SolenoidValve:
         GPIO.cleanup(self.pin)  # free pin if already in use
         GPIO.setup(self.pin, GPIO.OUT, initial=GPIO.HIGH)  # HIGH = OFF (active-LOW)
 
+        # open/close history (1 = open, 0 = closed) for the flight recorder
+        self.events = RingBuffer(("open",), capacity=256)
+        # open/close come from several threads (ui, sequencer, interlock),
+        # the ring buffer takes one writer at a time
+        self._events_lock = threading.Lock()
+
+    @timed("valve.open")
     def open(self, seconds=None):
-        print("Solenoid valve OPEN")
         GPIO.output(self.pin, GPIO.LOW)  # ON
+        event(logger, "valve.open", msg="Solenoid valve OPEN", pin=self.pin, seconds=seconds)
+        self._log_state(1)
         if seconds:
             time.sleep(seconds)
             self.close()
 
+    @timed("valve.close")
     def close(self):
-        print("Solenoid valve CLOSED")
         GPIO.output(self.pin, GPIO.HIGH)  # OFF
+        event(logger, "valve.close", msg="Solenoid valve CLOSED", pin=self.pin)
+        self._log_state(0)
 
     def auto_close(self, delay=80):
         """Close automatically after delay seconds (non-blocking)."""
-        import threading
         threading.Timer(delay, self.close).start()
 
+    def _log_state(self, is_open):
+        with self._events_lock:
+            self.events.append(time.monotonic(), (is_open,))
+
     def cleanup(self):
         GPIO.cleanup(self.pin)
@@ -0,0 +1,143 @@
+import numpy as np
+
+
+class RingBuffer:
+    """
+    fixed-capacity sample store for one sensor channel
+
+    timestamps and values live in preallocated numpy arrays that are twice the
+    capacity: every sample is written at index i and mirrored at i + capacity,
+    so any run of up to `capacity` recent samples is one contiguous slice and
+    can be handed out as a view without copying.
+
+    the buffer is lock-free for a single writer (the sensor's measurement
+    thread) and any number of readers. the writer fills the slot first and
+    only then bumps the sample count, so readers never see a half-written
+    sample. a view returned by last()/window()/read_since() stays valid until
+    another `capacity - len(view)` samples have been written - copy it if you
+    need to hold on to it longer than that.
+    """
+
+    def __init__(self, fields, capacity=4096, dtype=np.float64):
+        """
+        args:
+            fields: names of the value columns, e.g. ("x_g", "y_g", "z_g")
+            capacity: number of samples kept
+            dtype: storage type for the value columns
+        """
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        self.fields = tuple(fields)
+        self.capacity = int(capacity)
+        self._index = {name: i for i, name in enumerate(self.fields)}
+        self._timestamps = np.zeros(2 * self.capacity, dtype=np.float64)
+        self._values = np.zeros((2 * self.capacity, len(self.fields)), dtype=dtype)
+        self._count = 0
+
+    @property
+    def count(self):
+        """total number of samples ever written (a monotonic sequence number)"""
+        return self._count
+
+    def __len__(self):
+        return min(self._count, self.capacity)
+
+    def column(self, field):
+        """index of a field in the value columns"""
+        return self._index[field]
+
+    def append(self, timestamp, values):
+        """write one sample - values is a sequence in `fields` order"""
+        count = self._count
+        i = count % self.capacity
+        j = i + self.capacity
+        self._timestamps[i] = timestamp
+        self._timestamps[j] = timestamp
+        self._values[i] = values
+        self._values[j] = values
+        self._count = count + 1
+
+    def extend(self, timestamps, values):
+        """write a batch of samples (e.g. a drained hardware fifo)"""
+        timestamps = np.asarray(timestamps, dtype=np.float64)
+        values = np.asarray(values, dtype=self._values.dtype).reshape(
+            len(timestamps), len(self.fields)
+        )
+        n = len(timestamps)
+        if n == 0:
+            return
+        if n > self.capacity:
+            # only the newest `capacity` samples can survive anyway
+            skipped = n - self.capacity
+            timestamps = timestamps[skipped:]
+            values = values[skipped:]
+        else:
+            skipped = 0
+
+        count = self._count + skipped
+        idx = (count + np.arange(len(timestamps))) % self.capacity
+        self._timestamps[idx] = timestamps
+        self._timestamps[idx + self.capacity] = timestamps
+        self._values[idx] = values
+        self._values[idx + self.capacity] = values
+        self._count = count + len(timestamps)
+
+    def _span(self, end, n):
+        """views onto the n samples ending at sequence number `end`"""
+        start = (end - n) % self.capacity
+        return (
+            self._timestamps[start : start + n],
+            self._values[start : start + n],
+        )
+
+    def last(self, n=None):
+        """
+        views of the newest n samples (all stored samples if n is None)
+
+        returns:
+            (timestamps, values) with shapes (n,) and (n, len(fields))
+        """
+        end = self._count
+        available = min(end, self.capacity)
+        n = available if n is None else min(int(n), available)
+        return self._span(end, n)
+
+    def latest(self):
+        """newest (timestamp, values) pair, or None if nothing was written yet"""
+        end = self._count
+        if end == 0:
+            return None
+        i = (end - 1) % self.capacity
+        return self._timestamps[i], self._values[i]
+
+    def window(self, start_time, end_time=None):
+        """views of the stored samples with start_time <= t < end_time"""
+        timestamps, values = self.last()
+        lo = np.searchsorted(timestamps, start_time, side="left")
+        hi = (
+            len(timestamps)
+            if end_time is None
+            else np.searchsorted(timestamps, end_time, side="left")
+        )
+        return timestamps[lo:hi], values[lo:hi]
+
+    def read_since(self, seq):
+        """
+        samples written after sequence number `seq`, for cursor-style consumers
+
+        returns:
+            (timestamps, values, next_seq, dropped) - dropped counts samples that
+            were overwritten before the consumer got to them
+        """
+        end = self._count
+        n = end - seq
+        dropped = 0
+        if n > self.capacity:
+            dropped = n - self.capacity
+            n = self.capacity
+        timestamps, values = self._span(end, max(n, 0))
+        return timestamps, values, end, dropped
+
+    def as_dict(self, values):
+        """map one row of values back to field names"""
+        return {name: float(values[i]) for i, name in enumerate(self.fields)}
@@ -0,0 +1,110 @@
+import os
+import sys
+import types
+
+from sim import fake_camera, fake_gpio, fake_i2c, fake_pigpio, fake_sensirion
+from sim.world import get_world
+
+SIMULATE_ENV = "MSW_SIMULATE"
+# fly this many simulated parabolas on the accelerometer (unset = 1 g at rest)
+PARABOLAS_ENV = "MSW_SIM_PARABOLAS"
+
+
+def is_enabled():
+    """true when the process was asked to run against simulated hardware"""
+    return os.getenv(SIMULATE_ENV, "false").lower() == "true"
+
+
+def _module(name, **attrs):
+    module = types.ModuleType(name)
+    module.__dict__.update(attrs)
+    module.__sim__ = True
+    return module
+
+
+def install(world=None):
+    """
+    register the simulated hardware libraries in sys.modules
+
+    must run before any driver module is imported - the real drivers then
+    import pigpio, RPi.GPIO, board, adafruit_lps2x, the sensirion stack and
+    picamera2 as usual and get the simulated versions, all backed by one
+    SimWorld.
+
+    args:
+        world: SimWorld to use (defaults to the process-wide one)
+    """
+    if world is not None:
+        from sim.world import set_world
+
+        set_world(world)
+    world = get_world()
+    if os.getenv(PARABOLAS_ENV) and world.accel_profile is None:
+        from sim.parabola import ParabolaProfile
+
+        world.accel_profile = ParabolaProfile(parabolas=int(os.getenv(PARABOLAS_ENV)))
+
+    rpi = _module("RPi", GPIO=fake_gpio)
+    board = _module(
+        "board",
+        I2C=lambda: fake_i2c.get_bus("/dev/i2c-1"),
+        A1="A1",
+        A2="A2",
+        A3="A3",
+    )
+    i2c_device = _module("adafruit_bus_device.i2c_device", I2CDevice=fake_i2c.I2CDevice)
+    bus_device = _module("adafruit_bus_device", i2c_device=i2c_device)
+    i2c_channel = _module(
+        "sensirion_driver_adapters.i2c_adapter.i2c_channel",
+        I2cChannel=fake_sensirion.I2cChannel,
+    )
+    i2c_adapter = _module(
+        "sensirion_driver_adapters.i2c_adapter", i2c_channel=i2c_channel
+    )
+    commands = _module(
+        "sensirion_i2c_sf06_lf.commands",
+        InvFlowScaleFactors=fake_sensirion.InvFlowScaleFactors,
+    )
+    device = _module(
+        "sensirion_i2c_sf06_lf.device", Sf06LfDevice=fake_sensirion.Sf06LfDevice
+    )
+    encoders = _module("picamera2.encoders", H264Encoder=fake_camera.H264Encoder)
+    outputs = _module("picamera2.outputs", FileOutput=fake_camera.FileOutput)
+
+    sys.modules.update(
+        {
+            "pigpio": fake_pigpio,
+            "RPi": rpi,
+            "RPi.GPIO": fake_gpio,
+            "board": board,
+            "analogio": _module("analogio", AnalogIn=fake_i2c.AnalogIn),
+            "adafruit_bus_device": bus_device,
+            "adafruit_bus_device.i2c_device": i2c_device,
+            "adafruit_lps2x": _module("adafruit_lps2x", LPS22=fake_i2c.LPS22),
+            "sensirion_i2c_driver": _module(
+                "sensirion_i2c_driver",
+                CrcCalculator=fake_sensirion.CrcCalculator,
+                I2cConnection=fake_sensirion.I2cConnection,
+                LinuxI2cTransceiver=fake_sensirion.LinuxI2cTransceiver,
+            ),
+            "sensirion_driver_adapters": _module(
+                "sensirion_driver_adapters", i2c_adapter=i2c_adapter
+            ),
+            "sensirion_driver_adapters.i2c_adapter": i2c_adapter,
+            "sensirion_driver_adapters.i2c_adapter.i2c_channel": i2c_channel,
+            "sensirion_i2c_sf06_lf": _module(
+                "sensirion_i2c_sf06_lf", commands=commands, device=device
+            ),
+            "sensirion_i2c_sf06_lf.commands": commands,
+            "sensirion_i2c_sf06_lf.device": device,
+            "picamera2": _module(
+                "picamera2",
+                Picamera2=fake_camera.Picamera2,
+                encoders=encoders,
+                outputs=outputs,
+            ),
+            "picamera2.encoders": encoders,
+            "picamera2.outputs": outputs,
+        }
+    )
+    return world
@@ -0,0 +1,260 @@
+"""simulated picamera2 - synthetic culture frames at the configured frame rate"""
+
+import threading
+import time
+
+import numpy as np
+
+from sim.world import get_world
+
+
+def _frame_size(config, stream):
+    return tuple(config.get(stream, {}).get("size", (640, 480)))
+
+
+class _Request:
+    def __init__(self, camera, arrays, timestamp_ns):
+        self._camera = camera
+        self._arrays = arrays
+        self._metadata = {
+            "SensorTimestamp": timestamp_ns,
+            "FrameDuration": camera.frame_duration_us,
+        }
+
+    def make_array(self, name="main"):
+        return self._arrays[name].copy()
+
+    def get_metadata(self):
+        return dict(self._metadata)
+
+    def save(self, name, file_output, format=None):
+        from PIL import Image
+
+        Image.fromarray(self._arrays[name]).save(file_output, format=format)
+
+    def release(self):
+        pass
+
+
+class Picamera2:
+    """frame source with the slice of the picamera2 api the dashboard uses"""
+
+    def __init__(self, camera_num=0):
+        self.camera_num = camera_num
+        self.camera_config = None
+        self.post_callback = None
+        self.pre_callback = None
+        self.frame_duration_us = 33333
+        self.started = False
+        self._thread = None
+        self._stop_event = threading.Event()
+        self._latest = None
+        self._latest_lock = threading.Condition()
+        self._encoder = None
+        self._frame_index = 0
+        self._rng = np.random.default_rng(camera_num)
+        get_world().cameras[camera_num] = self
+
+    @staticmethod
+    def global_camera_info():
+        return [
+            {
+                "Model": "imx708",
+                "Location": 2,
+                "Id": f"/base/sim/camera{num}",
+                "Num": num,
+            }
+            for num in range(get_world().camera_count)
+        ]
+
+    # ---------- configuration ----------
+
+    def _configuration(self, main=None, lores=None, controls=None, **kwargs):
+        config = {"main": dict(main or {}), "controls": dict(controls or {})}
+        config["main"].setdefault("size", (640, 480))
+        if lores:
+            config["lores"] = dict(lores)
+        return config
+
+    def create_preview_configuration(self, main=None, lores=None, controls=None, **kw):
+        return self._configuration(main, lores, controls)
+
+    def create_video_configuration(self, main=None, lores=None, controls=None, **kw):
+        main = dict(main or {})
+        main.setdefault("size", (1280, 720))
+        return self._configuration(main, lores, controls)
+
+    def create_still_configuration(self, main=None, lores=None, controls=None, **kw):
+        main = dict(main or {})
+        main.setdefault("size", (2304, 1296))
+        return self._configuration(main, lores, controls)
+
+    def configure(self, config):
+        self.camera_config = config
+        limits = config.get("controls", {}).get("FrameDurationLimits")
+        if limits:
+            self.frame_duration_us = limits[0]
+        self._base = {
+            stream: self._make_base(_frame_size(config, stream))
+            for stream in ("main", "lores")
+            if stream in config
+        }
+
+    def set_controls(self, controls):
+        limits = controls.get("FrameDurationLimits")
+        if limits:
+            self.frame_duration_us = limits[0]
+
+    def _make_base(self, size):
+        """a green culture channel on a dark background"""
+        width, height = size
+        frame = np.full((height, width, 3), 30, dtype=np.uint8)
+        frame[height // 3 : 2 * height // 3, :, 1] = 140
+        frame[height // 3 : 2 * height // 3, :, 0] = 40
+        return frame
+
+    # ---------- streaming ----------
+
+    def start(self, config=None, show_preview=False):
+        if config is not None:
+            self.configure(config)
+        if self.camera_config is None:
+            self.configure(self.create_preview_configuration())
+        if self.started:
+            return
+        self.started = True
+        self._stop_event.clear()
+        self._thread = threading.Thread(
+            target=self._run, name=f"sim-camera-{self.camera_num}", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join(timeout=1.0)
+        self._thread = None
+        self.started = False
+
+    def close(self):
+        self.stop_encoder()
+        self.stop()
+
+    def _render(self):
+        arrays = {}
+        for stream, base in self._base.items():
+            frame = base.copy()
+            # slow drift in the culture plus a moving meniscus
+            shift = (self._frame_index // 3) % frame.shape[1]
+            frame[:, shift : shift + 4, :] = 200
+            arrays[stream] = frame
+        self._frame_index += 1
+        return arrays
+
+    def _run(self):
+        period = self.frame_duration_us / 1_000_000
+        next_frame = time.monotonic()
+        while not self._stop_event.is_set():
+            next_frame += period
+            request = _Request(self, self._render(), time.monotonic_ns())
+            with self._latest_lock:
+                self._latest = request
+                self._latest_lock.notify_all()
+            if self.post_callback is not None:
+                self.post_callback(request)
+            if self._encoder is not None:
+                self._encoder._frame(request)
+            delay = next_frame - time.monotonic()
+            if delay > 0:
+                self._stop_event.wait(delay)
+            else:
+                next_frame = time.monotonic()
+
+    def _next_request(self, timeout=1.0):
+        with self._latest_lock:
+            seen = self._latest
+            self._latest_lock.wait_for(lambda: self._latest is not seen, timeout)
+            return self._latest
+
+    def capture_request(self, flush=None, wait=None):
+        return self._next_request()
+
+    def capture_array(self, name="main", wait=None):
+        return self._next_request().make_array(name)
+
+    def capture_metadata(self, wait=None):
+        return self._next_request().get_metadata()
+
+    def capture_file(self, file_output, name="main", format=None, wait=None):
+        self._next_request().save(name, file_output, format=format)
+
+    # ---------- encoders ----------
+
+    def start_encoder(self, encoder, output=None, name="main", **kwargs):
+        encoder.output = output if output is not None else encoder.output
+        encoder._stream = name
+        encoder._open()
+        self._encoder = encoder
+
+    def stop_encoder(self, encoders=None):
+        if self._encoder is not None:
+            self._encoder._close()
+            self._encoder = None
+
+    def start_recording(self, encoder, output, **kwargs):
+        self.start_encoder(encoder, output, **kwargs)
+        self.start()
+
+    def stop_recording(self):
+        self.stop()
+        self.stop_encoder()
+
+
+class H264Encoder:
+    """writes one small record per frame so recordings have a realistic size"""
+
+    def __init__(self, bitrate=None, repeat=False, iperiod=None):
+        self.bitrate = bitrate
+        self.output = None
+        self._stream = "main"
+        self.frames = 0
+
+    def _open(self):
+        if self.output is not None:
+            self.output.start()
+
+    def _frame(self, request):
+        self.frames += 1
+        if self.output is not None:
+            self.output.outputframe(
+                b"\x00\x00\x00\x01" + bytes(64),
+                keyframe=self.frames % 30 == 1,
+                timestamp=request.get_metadata()["SensorTimestamp"] // 1000,
+            )
+
+    def _close(self):
+        if self.output is not None:
+            self.output.stop()
+
+
+class FileOutput:
+    def __init__(self, file=None, pts=None):
+        self._path = file
+        self._file = None
+
+    def start(self):
+        if isinstance(self._path, str):
+            self._file = open(self._path, "wb")
+        else:
+            self._file = self._path
+
+    def outputframe(
+        self, frame, keyframe=True, timestamp=None, packet=None, audio=False
+    ):
+        if self._file is not None:
+            self._file.write(frame)
+
+    def stop(self):
+        if self._file is not None and isinstance(self._path, str):
+            self._file.close()
+        self._file = None
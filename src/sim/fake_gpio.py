@@ -0,0 +1,61 @@
+"""simulated RPi.GPIO module - shares pin levels with the fake pigpio"""
+
+from sim.world import get_world
+
+BCM = 11
+BOARD = 10
+OUT = 0
+IN = 1
+HIGH = 1
+LOW = 0
+PUD_OFF = 20
+PUD_DOWN = 21
+PUD_UP = 22
+
+_mode = None
+
+
+def setmode(mode):
+    global _mode
+    _mode = mode
+
+
+def getmode():
+    return _mode
+
+
+def setwarnings(flag):
+    pass
+
+
+def _pins(channel):
+    return channel if isinstance(channel, (list, tuple)) else (channel,)
+
+
+def setup(channel, direction, pull_up_down=PUD_OFF, initial=None):
+    gpio = get_world().gpio
+    for pin in _pins(channel):
+        gpio.modes[pin] = direction
+        if direction == OUT and initial is not None:
+            gpio.write(pin, initial)
+        elif direction == IN and pull_up_down == PUD_UP:
+            gpio.write(pin, HIGH)
+        elif direction == IN and pull_up_down == PUD_DOWN:
+            gpio.write(pin, LOW)
+
+
+def output(channel, value):
+    gpio = get_world().gpio
+    for pin in _pins(channel):
+        gpio.write(pin, value)
+
+
+def input(channel):
+    return get_world().gpio.read(channel)
+
+
+def cleanup(channel=None):
+    # real cleanup returns pins to inputs; levels are left to the world model
+    gpio = get_world().gpio
+    for pin in _pins(channel) if channel is not None else list(gpio.modes):
+        gpio.modes.pop(pin, None)
@@ -0,0 +1,282 @@
+"""simulated i2c bus and devices behind the blinka / adafruit interfaces"""
+
+import struct
+import threading
+import time
+from collections import deque
+
+from sim.world import get_world
+
+PSI_TO_HPA = 1 / 0.0145038
+
+
+class FakeI2C:
+    """busio.I2C stand-in that routes transfers to simulated devices"""
+
+    def __init__(self, frequency=400_000, transaction_overhead_s=0.0001):
+        self.frequency = frequency
+        self.transaction_overhead_s = transaction_overhead_s
+        self.devices = {}
+        self._lock = threading.Lock()
+
+    def _bus_time(self, nbytes):
+        """hold the caller for roughly the time the transfer takes on the wire"""
+        duration = self.transaction_overhead_s + (nbytes + 1) * 9 / self.frequency
+        end = time.perf_counter() + duration
+        while time.perf_counter() < end:
+            time.sleep(0)
+
+    def _device(self, address):
+        device = self.devices.get(address)
+        if device is None:
+            raise OSError(121, f"no i2c device at {address:#04x}")  # EREMOTEIO
+        return device
+
+    def try_lock(self):
+        return self._lock.acquire(blocking=False)
+
+    def unlock(self):
+        self._lock.release()
+
+    def scan(self):
+        return sorted(self.devices)
+
+    def writeto(self, address, buffer, *, start=0, end=None):
+        data = bytes(buffer[start:end])
+        self._bus_time(len(data))
+        self._device(address).write(data)
+
+    def readfrom_into(self, address, buffer, *, start=0, end=None):
+        end = len(buffer) if end is None else end
+        self._bus_time(end - start)
+        buffer[start:end] = self._device(address).read(end - start)
+
+    def writeto_then_readfrom(
+        self,
+        address,
+        buffer_out,
+        buffer_in,
+        *,
+        out_start=0,
+        out_end=None,
+        in_start=0,
+        in_end=None,
+    ):
+        out = bytes(buffer_out[out_start:out_end])
+        in_end = len(buffer_in) if in_end is None else in_end
+        self._bus_time(len(out) + in_end - in_start)
+        device = self._device(address)
+        device.write(out)
+        buffer_in[in_start:in_end] = device.read(in_end - in_start)
+
+    def deinit(self):
+        pass
+
+
+class I2CDevice:
+    """adafruit_bus_device.i2c_device.I2CDevice stand-in"""
+
+    def __init__(self, i2c, device_address, probe=True):
+        self.i2c = i2c
+        self.device_address = device_address
+        if probe:
+            with self:
+                i2c.writeto(device_address, b"")
+
+    def readinto(self, buf, *, start=0, end=None):
+        self.i2c.readfrom_into(self.device_address, buf, start=start, end=end)
+
+    def write(self, buf, *, start=0, end=None):
+        self.i2c.writeto(self.device_address, buf, start=start, end=end)
+
+    def write_then_readinto(
+        self,
+        out_buffer,
+        in_buffer,
+        *,
+        out_start=0,
+        out_end=None,
+        in_start=0,
+        in_end=None,
+    ):
+        self.i2c.writeto_then_readfrom(
+            self.device_address,
+            out_buffer,
+            in_buffer,
+            out_start=out_start,
+            out_end=out_end,
+            in_start=in_start,
+            in_end=in_end,
+        )
+
+    def __enter__(self):
+        while not self.i2c.try_lock():
+            time.sleep(0)
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.i2c.unlock()
+        return False
+
+
+class FakeLPS22:
+    """
+    lps22hb register model
+
+    covers the registers the drivers touch: who_am_i, ctrl_reg1/2, the
+    output registers (with address auto-increment) and the 32-sample fifo
+    in stream mode, where burst reads wrap from TEMP_OUT_H back to
+    PRESS_OUT_XL.
+    """
+
+    WHO_AM_I = 0x0F
+    CTRL_REG1 = 0x10
+    CTRL_REG2 = 0x11
+    FIFO_CTRL = 0x14
+    FIFO_STATUS = 0x26
+    PRESS_OUT_XL = 0x28
+    TEMP_OUT_H = 0x2C
+    DEPTH = 32
+    RATES_HZ = {1: 1, 2: 10, 3: 25, 4: 50, 5: 75}
+
+    def __init__(self, address, world=None):
+        self.address = address
+        self.world = world or get_world()
+        self.registers = {
+            self.WHO_AM_I: 0xB1,
+            self.CTRL_REG1: 0x00,
+            self.CTRL_REG2: 0x10,
+            self.FIFO_CTRL: 0x00,
+        }
+        self._pointer = 0
+        self._fifo = deque(maxlen=self.DEPTH)
+        self._fifo_overrun = False
+        self._fifo_started = None
+        self._fifo_produced = 0
+
+    def _sample_bytes(self):
+        pressure = int(round(self.world.pressure_psi(self.address) * PSI_TO_HPA * 4096))
+        temperature = int(round(self.world.temperature() * 100))
+        return struct.pack("<i", pressure)[:3] + struct.pack("<h", temperature)
+
+    @property
+    def _streaming(self):
+        return (
+            self.registers[self.CTRL_REG2] & 0x40
+            and self.registers[self.FIFO_CTRL] >> 5 != 0
+            and self.registers[self.CTRL_REG1] & 0x70
+        )
+
+    def _fill_fifo(self):
+        """add the samples the chip would have taken since the last access"""
+        if not self._streaming:
+            return
+        rate = self.RATES_HZ[(self.registers[self.CTRL_REG1] >> 4) & 0x07]
+        now = time.monotonic()
+        due = int((now - self._fifo_started) * rate) - self._fifo_produced
+        if due > self.DEPTH:
+            self._fifo_overrun = True
+            self._fifo_produced += due - self.DEPTH
+            due = self.DEPTH
+        for _ in range(due):
+            if len(self._fifo) == self.DEPTH:
+                self._fifo_overrun = True
+            self._fifo.append(self._sample_bytes())
+        self._fifo_produced += due
+
+    def write(self, data):
+        if not data:
+            return
+        self._pointer = data[0]
+        for offset, value in enumerate(data[1:]):
+            register = self._pointer + offset
+            self.registers[register] = value
+            if register == self.FIFO_CTRL and value >> 5 == 0:
+                # bypass mode empties the fifo
+                self._fifo.clear()
+                self._fifo_overrun = False
+                self._fifo_started = None
+        if self._streaming and self._fifo_started is None:
+            self._fifo_started = time.monotonic()
+            self._fifo_produced = 0
+
+    def read(self, n):
+        self._fill_fifo()
+        if self._pointer == self.FIFO_STATUS:
+            status = min(len(self._fifo), self.DEPTH)
+            if self._fifo_overrun:
+                status |= 0x40
+            return bytes([status] + [0] * (n - 1))
+
+        if self.PRESS_OUT_XL <= self._pointer <= self.TEMP_OUT_H:
+            if self._streaming:
+                out = bytearray()
+                while len(out) < n:
+                    sample = (
+                        self._fifo.popleft() if self._fifo else self._sample_bytes()
+                    )
+                    out += sample
+                self._fifo_overrun = False
+                return bytes(out[:n])
+            sample = self._sample_bytes()
+            offset = self._pointer - self.PRESS_OUT_XL
+            return bytes((sample * 2)[offset : offset + n])
+
+        return bytes(self.registers.get(self._pointer + i, 0) for i in range(n))
+
+
+class LPS22:
+    """adafruit_lps2x.LPS22 stand-in reading through the register model"""
+
+    def __init__(self, i2c_bus, address=0x5D):
+        self.i2c_device = I2CDevice(i2c_bus, address)
+        # the adafruit driver leaves the chip running at 75 hz
+        with self.i2c_device as device:
+            device.write(bytes([FakeLPS22.CTRL_REG1, 0x52]))
+
+    def _read(self, register, n):
+        buf = bytearray(n)
+        with self.i2c_device as device:
+            device.write_then_readinto(bytes([register]), buf)
+        return buf
+
+    @property
+    def pressure(self):
+        raw = self._read(FakeLPS22.PRESS_OUT_XL, 3)
+        value = int.from_bytes(raw, "little", signed=True)
+        return value / 4096.0
+
+    @property
+    def temperature(self):
+        raw = self._read(0x2B, 2)
+        return int.from_bytes(raw, "little", signed=True) / 100.0
+
+
+class AnalogIn:
+    """analogio.AnalogIn stand-in for the adxl326 axes on A1..A3"""
+
+    _AXES = {"A1": 0, "A2": 1, "A3": 2}
+
+    def __init__(self, pin):
+        self._axis = self._AXES[pin]
+        self._world = get_world()
+
+    @property
+    def value(self):
+        g = self._world.acceleration_g()[self._axis]
+        return int(min(max(g / 32.0 + 0.5, 0.0), 1.0) * 65535)
+
+    def deinit(self):
+        pass
+
+
+def get_bus(port="/dev/i2c-1", world=None):
+    """the simulated bus for a port, populated with the flight devices"""
+    world = world or get_world()
+    bus = world.i2c_buses.get(port)
+    if bus is None:
+        bus = FakeI2C()
+        for address in (0x5C, 0x5D):
+            bus.devices[address] = FakeLPS22(address, world)
+        world.i2c_buses[port] = bus
+    return bus
@@ -0,0 +1,271 @@
+"""simulated pigpio module - same calls as the real client, driving SimWorld pins"""
+
+import itertools
+import threading
+import time
+
+from sim.world import get_world, tick_us
+
+INPUT = 0
+OUTPUT = 1
+
+PUD_OFF = 0
+PUD_DOWN = 1
+PUD_UP = 2
+
+RISING_EDGE = 0
+FALLING_EDGE = 1
+EITHER_EDGE = 2
+
+WAVE_MODE_ONE_SHOT = 0
+WAVE_MODE_REPEAT = 1
+
+# the real daemon's limits
+_MAX_WAVES = 250
+_MAX_PULSES = 12000
+
+
+class pulse:
+    """one wave entry: pins to set, pins to clear, then delay in microseconds"""
+
+    def __init__(self, gpio_on, gpio_off, delay):
+        self.gpio_on = gpio_on
+        self.gpio_off = gpio_off
+        self.delay = delay
+
+
+def tickDiff(t1, t2):
+    """microseconds from tick t1 to tick t2, allowing for wrap-around"""
+    return (t2 - t1) & 0xFFFFFFFF
+
+
+class _Callback:
+    def __init__(self, gpio_bus, pin, edge, func):
+        self._gpio = gpio_bus
+        self._pin = pin
+        self._edge = edge
+        self._func = func
+        self.tally = 0
+        gpio_bus.add_listener(pin, self._fire)
+
+    def _fire(self, pin, level, tick):
+        if self._edge == RISING_EDGE and level != 1:
+            return
+        if self._edge == FALLING_EDGE and level != 0:
+            return
+        self.tally += 1
+        if self._func is not None:
+            self._func(pin, level, tick)
+
+    def cancel(self):
+        self._gpio.remove_listener(self._pin, self._fire)
+
+
+class _Transmitter(threading.Thread):
+    """plays a stream of pulses against the pins at (roughly) real time"""
+
+    def __init__(self, gpio_bus, pulses):
+        super().__init__(name="sim-pigpio-wave", daemon=True)
+        self._gpio = gpio_bus
+        self._pulses = pulses
+        self._stop_event = threading.Event()
+
+    def run(self):
+        start = time.monotonic()
+        start_tick = tick_us()
+        elapsed_us = 0
+        for p in self._pulses:
+            if self._stop_event.is_set():
+                return
+            tick = (start_tick + elapsed_us) & 0xFFFFFFFF
+            self._apply(p.gpio_off, 0, tick)
+            self._apply(p.gpio_on, 1, tick)
+            elapsed_us += p.delay
+
+            # stay roughly in step with the wall clock
+            ahead = start + elapsed_us / 1_000_000 - time.monotonic()
+            if ahead > 0.002:
+                self._stop_event.wait(ahead)
+
+    def _apply(self, mask, level, tick):
+        pin = 0
+        while mask:
+            if mask & 1:
+                self._gpio.write(pin, level, tick)
+            mask >>= 1
+            pin += 1
+
+    def stop(self):
+        self._stop_event.set()
+        if self is not threading.current_thread():
+            self.join()
+
+
+def _parse_chain(data, waves):
+    """turn chain bytes into nested (body, repeat) nodes - repeat None is forever"""
+    stack = [[]]
+    i = 0
+    while i < len(data):
+        byte = data[i]
+        if byte != 255:
+            if byte not in waves:
+                raise ValueError(f"wave_chain: unknown wave id {byte}")
+            stack[-1].append(list(waves[byte]))
+            i += 1
+            continue
+        command = data[i + 1]
+        if command == 0:
+            stack.append([])
+            i += 2
+        elif command in (1, 3):
+            if len(stack) == 1:
+                raise ValueError("wave_chain: loop end without loop start")
+            body = stack.pop()
+            if command == 1:
+                repeat = data[i + 2] + 256 * data[i + 3]
+                i += 4
+            else:
+                repeat = None
+                i += 2
+            stack[-1].append((body, repeat))
+        elif command == 2:
+            stack[-1].append([pulse(0, 0, data[i + 2] + 256 * data[i + 3])])
+            i += 4
+        else:
+            raise ValueError(f"wave_chain: bad command 255 {command}")
+    if len(stack) != 1:
+        raise ValueError("wave_chain: unterminated loop")
+    return stack[0]
+
+
+def _play_chain(nodes):
+    for node in nodes:
+        if isinstance(node, list):
+            yield from node
+            continue
+        body, repeat = node
+        count = itertools.count() if repeat is None else range(repeat)
+        for _ in count:
+            yield from _play_chain(body)
+
+
+class pi:
+    """stand-in for pigpio.pi() connected to the simulated world"""
+
+    def __init__(self, host=None, port=None, world=None):
+        self._world = world or get_world()
+        self._gpio = self._world.gpio
+        self.connected = True
+        self._waves = {}
+        self._pending = []
+        self._tx = None
+        self._lock = threading.RLock()
+
+    # ---------- basic gpio ----------
+
+    def set_mode(self, gpio, mode):
+        self._gpio.modes[gpio] = mode
+        return 0
+
+    def get_mode(self, gpio):
+        return self._gpio.modes.get(gpio, INPUT)
+
+    def set_pull_up_down(self, gpio, pud):
+        self._gpio.pulls[gpio] = pud
+        if pud == PUD_UP and self._gpio.modes.get(gpio) == INPUT:
+            self._gpio.write(gpio, 1)
+        return 0
+
+    def set_glitch_filter(self, gpio, steady):
+        return 0
+
+    def read(self, gpio):
+        return self._gpio.read(gpio)
+
+    def write(self, gpio, level):
+        self._gpio.write(gpio, level)
+        return 0
+
+    def callback(self, user_gpio, edge=RISING_EDGE, func=None):
+        return _Callback(self._gpio, user_gpio, edge, func)
+
+    def get_current_tick(self):
+        return tick_us()
+
+    def stop(self):
+        self.wave_tx_stop()
+        self.connected = False
+
+    # ---------- waves ----------
+
+    def wave_clear(self):
+        with self._lock:
+            self._waves.clear()
+            self._pending = []
+        return 0
+
+    def wave_add_new(self):
+        self._pending = []
+        return 0
+
+    def wave_add_generic(self, pulses):
+        with self._lock:
+            self._pending.extend(pulses)
+            return len(self._pending)
+
+    def wave_create(self):
+        with self._lock:
+            if len(self._waves) >= _MAX_WAVES or len(self._pending) > _MAX_PULSES:
+                return -1
+            wid = next(i for i in range(_MAX_WAVES) if i not in self._waves)
+            self._waves[wid] = self._pending
+            self._pending = []
+            return wid
+
+    def wave_delete(self, wave_id):
+        with self._lock:
+            self._waves.pop(wave_id, None)
+        return 0
+
+    def wave_get_max_pulses(self):
+        return _MAX_PULSES
+
+    def wave_get_micros(self):
+        return sum(p.delay for p in self._pending)
+
+    def _send(self, pulses):
+        self.wave_tx_stop()
+        self._tx = _Transmitter(self._gpio, pulses)
+        self._tx.start()
+        return 0
+
+    def wave_send_once(self, wave_id):
+        self._send(iter(list(self._waves[wave_id])))
+        return len(self._waves[wave_id])
+
+    def wave_send_repeat(self, wave_id):
+        self._send(itertools.cycle(list(self._waves[wave_id])))
+        return len(self._waves[wave_id])
+
+    def wave_chain(self, data):
+        """
+        transmit a chain of waves
+
+        understands the daemon's chain commands: 255 0 loop start,
+        255 1 x y loop end (repeat x + 256*y times), 255 2 x y delay
+        x + 256*y microseconds and 255 3 loop forever; any other byte is
+        a wave id.
+        """
+        with self._lock:
+            program = _parse_chain(list(data), self._waves)
+        self._send(_play_chain(program))
+        return 0
+
+    def wave_tx_busy(self):
+        return 1 if self._tx is not None and self._tx.is_alive() else 0
+
+    def wave_tx_stop(self):
+        if self._tx is not None:
+            self._tx.stop()
+            self._tx = None
+        return 0
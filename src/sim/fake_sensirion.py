@@ -0,0 +1,147 @@
+"""simulated sensirion i2c stack for the slf3s-0600f flow sensor"""
+
+import struct
+import time
+from enum import IntEnum
+
+from sim.fake_i2c import get_bus
+from sim.world import get_world
+
+_START_H2O = 0x3608
+_STOP = 0x3FF9
+_READ_PRODUCT_ID = 0x367C
+
+
+class FakeSlf3s:
+    """slf3s-0600f command model sitting on the simulated bus"""
+
+    SERIAL_NUMBER = 0x5153_0600_0000_0001
+
+    def __init__(self, world=None):
+        self.world = world or get_world()
+        self.measuring = False
+        self._last_command = None
+
+    def write(self, data):
+        if len(data) < 2:
+            return
+        command = (data[0] << 8) | data[1]
+        self._last_command = command
+        if command == _START_H2O:
+            self.measuring = True
+        elif command == _STOP:
+            self.measuring = False
+
+    def read(self, n):
+        if self._last_command == _READ_PRODUCT_ID:
+            return struct.pack(">IQ", 0x07030202, self.SERIAL_NUMBER)[:n]
+        if not self.measuring:
+            raise OSError(121, "slf3s not measuring")
+        flow = int(round(self.world.flow_ml_min() * InvFlowScaleFactors.SLF3S_0600F))
+        temperature = int(round(self.world.temperature() * 200))
+        return struct.pack(">hhH", flow, temperature, 0)[:n]
+
+
+def _bus(port):
+    bus = get_bus(port)
+    if 0x08 not in bus.devices:
+        bus.devices[0x08] = FakeSlf3s()
+    return bus
+
+
+class CrcCalculator:
+    def __init__(self, width, polynomial, init_value=0, final_xor=0):
+        self.width = width
+        self.polynomial = polynomial
+
+
+class LinuxI2cTransceiver:
+    STATUS_OK = 0
+
+    def __init__(self, device_file, do_open=False):
+        self.device_file = device_file
+        self._bus = None
+
+    @property
+    def description(self):
+        return f"simulated {self.device_file}"
+
+    @property
+    def channel_count(self):
+        return None
+
+    def open(self):
+        self._bus = _bus(self.device_file)
+
+    def close(self):
+        self._bus = None
+
+    def __enter__(self):
+        self.open()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def transceive(self, slave_address, tx_data, rx_length, read_delay, timeout):
+        if self._bus is None:
+            raise IOError("transceiver not open")
+        device = self._bus._device(slave_address)
+        self._bus._bus_time(len(tx_data or b"") + (rx_length or 0))
+        if tx_data:
+            device.write(bytes(tx_data))
+        data = None
+        if rx_length:
+            if read_delay:
+                time.sleep(read_delay)
+            data = device.read(rx_length)
+        return self.STATUS_OK, None, data
+
+
+class I2cConnection:
+    def __init__(self, transceiver, always_multi_channel_response=False):
+        self.transceiver = transceiver
+
+
+class I2cChannel:
+    def __init__(self, connection, slave_address, crc):
+        self._connection = connection
+        self.slave_address = slave_address
+        self._crc = crc
+
+    def transfer(self, command, rx_length=0):
+        tx = struct.pack(">H", command)
+        _, _, data = self._connection.transceiver.transceive(
+            self.slave_address, tx, rx_length, 0.0, 0.1
+        )
+        return data
+
+
+class InvFlowScaleFactors(IntEnum):
+    SLF3S_0600F = 10
+    SLF3S_1300F = 500
+    SLF3S_4000B = 32
+    SLF3C_1300F = 500
+
+
+class Sf06LfDevice:
+    def __init__(self, channel):
+        self._channel = channel
+
+    def start_h2o_continuous_measurement(self):
+        self._channel.transfer(_START_H2O)
+
+    def stop_continuous_measurement(self):
+        self._channel.transfer(_STOP)
+
+    def read_measurement_data(self, inv_flow_scale_factor):
+        raw_flow, raw_temperature, flags = struct.unpack(
+            ">hhH", self._channel.transfer(0, rx_length=6)
+        )
+        return raw_flow / int(inv_flow_scale_factor), raw_temperature / 200.0, flags
+
+    def read_product_identifier(self):
+        product_id, serial_number = struct.unpack(
+            ">IQ", self._channel.transfer(_READ_PRODUCT_ID, rx_length=12)
+        )
+        return product_id, serial_number
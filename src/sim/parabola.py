@@ -0,0 +1,123 @@
+"""
+parabolic flight acceleration profiles for the simulator and detector tests
+
+each parabola is level flight at 1 g, a ~1.8 g pull-up, the injection
+into ~0 g for about 20 s, the ~1.8 g pull-out and back to level flight.
+airframe vibration, sensor noise and short turbulence bumps are layered
+on top so a detector can be scored on latency and false triggers.
+"""
+
+import numpy as np
+
+from analysis.microgravity import MICRO_G_ENTRY, MICRO_G_EXIT, PULL_OUT, PULL_UP
+
+
+class ParabolaProfile:
+    """
+    callable (t) -> (x, y, z) in g, usable as SimWorld.accel_profile
+
+    the load factor follows straight ramps between the phase levels; it
+    acts along the floor normal (z) with a small fore-aft share (x).
+    `transitions` lists the true (time, event) pairs:
+
+    - pull_up / pull_out: the load factor crossing 1.4 g on the way up
+    - micro_g_entry: the injection ramp reaching the micro-g level
+    - micro_g_exit: the pull-out ramp leaving it
+    """
+
+    def __init__(
+        self,
+        parabolas=3,
+        start_s=10.0,
+        gap_s=30.0,
+        pullup_s=20.0,
+        micro_s=22.0,
+        ramp_s=3.0,
+        injection_s=4.0,
+        hyper_g=1.8,
+        micro_g=0.0,
+        vibration_g=0.03,
+        vibration_hz=15.0,
+        noise_g=0.02,
+        bumps_per_min=2.0,
+        bump_g=0.3,
+        seed=0,
+    ):
+        """
+        args:
+            parabolas: number of parabolas
+            start_s: level flight before the first one
+            gap_s: level flight between parabolas
+            pullup_s: time at hyper_g for the pull-up and for the pull-out
+            micro_s: time at micro_g
+            ramp_s: 1 g <-> hyper_g transitions
+            injection_s: hyper_g <-> micro_g transitions
+            hyper_g, micro_g: load factor of the hyper-g and micro-g phases
+            vibration_g, vibration_hz: airframe vibration on z
+            noise_g: white sensor noise on every axis (std dev)
+            bumps_per_min, bump_g: turbulence - half-second bumps at random times
+            seed: random seed for noise and bumps
+        """
+        self.vibration_g = vibration_g
+        self.vibration_hz = vibration_hz
+        self.noise_g = noise_g
+        self.rng = np.random.default_rng(seed)
+
+        levels_t, levels_g, transitions = [0.0], [1.0], []
+        t = start_s
+        rise = (1.4 - 1.0) / (hyper_g - 1.0)
+        recover = (1.4 - micro_g) / (hyper_g - micro_g)
+        for _ in range(parabolas):
+            levels_t += [t, t + ramp_s]
+            levels_g += [1.0, hyper_g]
+            transitions.append((t + ramp_s * rise, PULL_UP))
+            t += ramp_s + pullup_s
+            levels_t += [t, t + injection_s]
+            levels_g += [hyper_g, micro_g]
+            t += injection_s
+            transitions.append((t, MICRO_G_ENTRY))
+            t += micro_s
+            transitions.append((t, MICRO_G_EXIT))
+            levels_t += [t, t + injection_s]
+            levels_g += [micro_g, hyper_g]
+            transitions.append((t + injection_s * recover, PULL_OUT))
+            t += injection_s + pullup_s
+            levels_t += [t, t + ramp_s]
+            levels_g += [hyper_g, 1.0]
+            t += ramp_s + gap_s
+        levels_t.append(t)
+        levels_g.append(1.0)
+
+        self.duration_s = t
+        self.transitions = transitions
+        self._levels_t = np.asarray(levels_t)
+        self._levels_g = np.asarray(levels_g)
+        n_bumps = self.rng.poisson(bumps_per_min * t / 60)
+        self._bump_t = np.sort(self.rng.uniform(0, t, n_bumps))
+        self._bump_g = self.rng.choice([-1.0, 1.0], n_bumps) * bump_g
+
+    def load_factor(self, t):
+        """noise-free load factor (g) at times t"""
+        return np.interp(t, self._levels_t, self._levels_g)
+
+    def sample(self, t):
+        """(len(t), 3) accelerations in g with vibration, noise and bumps"""
+        t = np.atleast_1d(np.asarray(t, dtype=np.float64))
+        g = self.load_factor(t)
+        g = g + self.vibration_g * np.sin(2 * np.pi * self.vibration_hz * t)
+        if len(self._bump_t):
+            # half-second raised-cosine bumps
+            d = t[:, None] - self._bump_t[None, :]
+            shape = np.where(
+                np.abs(d) < 0.25, 0.5 * (1 + np.cos(np.pi * d / 0.25)), 0.0
+            )
+            g = g + shape @ self._bump_g
+        # the load stays mostly on the floor normal; a little goes fore-aft
+        out = np.column_stack([0.05 * g, np.zeros_like(g), g])
+        if self.noise_g:
+            out += self.rng.normal(0.0, self.noise_g, out.shape)
+        return out
+
+    def __call__(self, t):
+        x, y, z = self.sample(t)[0]
+        return float(x), float(y), float(z)
@@ -0,0 +1,240 @@
+import math
+import random
+import threading
+import time
+from collections import defaultdict
+
+# bcm pins used by the flight wiring
+DEFAULT_PINS = {
+    "step": 18,
+    "dir": 25,
+    "enc_a": 17,
+    "enc_b": 23,
+    "valve": 6,
+}
+
+# forward quadrature sequence as (a, b) levels - a leads b when counting up
+_QUADRATURE = ((0, 0), (1, 0), (1, 1), (0, 1))
+
+
+def tick_us():
+    """pigpio-style 32-bit microsecond tick"""
+    return int(time.monotonic() * 1_000_000) & 0xFFFFFFFF
+
+
+class SimGPIO:
+    """shared pin levels seen by every fake gpio library"""
+
+    def __init__(self):
+        self._levels = defaultdict(int)
+        self.modes = {}
+        self.pulls = {}
+        self._listeners = defaultdict(list)
+        self._lock = threading.RLock()
+
+    def read(self, pin):
+        return self._levels[pin]
+
+    def write(self, pin, level, tick=None):
+        """drive a pin and notify listeners if the level changed"""
+        level = 1 if level else 0
+        with self._lock:
+            if self._levels[pin] == level:
+                return
+            self._levels[pin] = level
+            listeners = list(self._listeners[pin])
+        tick = tick_us() if tick is None else tick
+        for callback in listeners:
+            callback(pin, level, tick)
+
+    def add_listener(self, pin, callback):
+        with self._lock:
+            self._listeners[pin].append(callback)
+
+    def remove_listener(self, pin, callback):
+        with self._lock:
+            if callback in self._listeners[pin]:
+                self._listeners[pin].remove(callback)
+
+
+class SimWorld:
+    """
+    physical model behind the fake hardware
+
+    - gas: the chamber pressure relaxes towards the co2 supply while the
+      solenoid (active-low) or the motor-driven needle valve is open, and
+      leaks back towards ambient otherwise
+    - flow: the capillary flow follows the chamber overpressure
+    - motor: every rising edge on STEP moves the shaft one full step in the
+      direction set by DIR and plays the matching quadrature edges on the
+      encoder pins
+    - acceleration: 1 g at rest, or any profile(t) -> (x, y, z) in g
+
+    the state is integrated lazily (exact exponential solution) whenever a
+    sensor looks at it, so the model costs nothing between reads.
+    """
+
+    AMBIENT_PSI = 14.7
+
+    def __init__(
+        self,
+        pins=None,
+        supply_psi=30.0,
+        solenoid_rate=0.2,
+        needle_rate=0.05,
+        leak_rate=0.02,
+        flow_per_psi=2.5,
+        counts_per_step=41,
+        needle_open_steps=130,
+        noise=True,
+        seed=None,
+    ):
+        """
+        args:
+            pins: bcm pin map (defaults to DEFAULT_PINS)
+            supply_psi: co2 supply pressure (absolute)
+            solenoid_rate: fill rate constant with the solenoid open (1/s)
+            needle_rate: fill rate constant with the needle valve fully open (1/s)
+            leak_rate: vent rate constant towards ambient (1/s)
+            flow_per_psi: capillary flow per psi of overpressure (ml/min)
+            counts_per_step: encoder counts per full motor step
+            needle_open_steps: motor steps (ccw) from closed to fully open
+            noise: add sensor noise to readings
+            seed: random seed for reproducible runs
+        """
+        self.pins = dict(DEFAULT_PINS, **(pins or {}))
+        self.supply_psi = supply_psi
+        self.solenoid_rate = solenoid_rate
+        self.needle_rate = needle_rate
+        self.leak_rate = leak_rate
+        self.flow_per_psi = flow_per_psi
+        self.counts_per_step = counts_per_step
+        self.needle_open_steps = needle_open_steps
+        self.noise = noise
+        self.random = random.Random(seed)
+
+        self.gpio = SimGPIO()
+        self.gpio.write(self.pins["valve"], 1)  # relay idles high (closed)
+        self._lock = threading.RLock()
+        self._t = time.monotonic()
+        self._t0 = self._t
+        self.chamber_psi = self.AMBIENT_PSI
+        self.temperature_c = 22.0
+        self.motor_steps = 0
+        self._phase = 0
+        self.accel_profile = None
+
+        # per-address sensor offsets so the two lps22s disagree slightly
+        self.pressure_offsets = {0x5C: 0.0, 0x5D: 0.02}
+
+        self.gpio.add_listener(self.pins["step"], self._on_step_edge)
+        self.gpio.add_listener(self.pins["valve"], self._on_valve_edge)
+
+        self.i2c_buses = {}
+        self.cameras = {}
+        self.camera_count = 2
+
+    # ---------- gas model ----------
+
+    @property
+    def solenoid_open(self):
+        return self.gpio.read(self.pins["valve"]) == 0
+
+    @property
+    def needle_opening(self):
+        """needle valve opening 0..1 - opening is ccw (negative) steps"""
+        return min(max(-self.motor_steps / self.needle_open_steps, 0.0), 1.0)
+
+    def _advance(self):
+        """integrate the chamber pressure up to now"""
+        now = time.monotonic()
+        with self._lock:
+            dt = now - self._t
+            if dt <= 0:
+                return
+            self._t = now
+            k_in = self.needle_rate * self.needle_opening
+            if self.solenoid_open:
+                k_in += self.solenoid_rate
+            k_total = k_in + self.leak_rate
+            equilibrium = (
+                k_in * self.supply_psi + self.leak_rate * self.AMBIENT_PSI
+            ) / k_total
+            self.chamber_psi = equilibrium + (
+                self.chamber_psi - equilibrium
+            ) * math.exp(-k_total * dt)
+
+    def _on_valve_edge(self, pin, level, tick):
+        # settle the pressure under the old valve state before it changes
+        self._advance()
+
+    def _noise(self, scale):
+        return self.random.gauss(0.0, scale) if self.noise else 0.0
+
+    def pressure_psi(self, address=0x5C):
+        """absolute pressure seen by the lps22 at an address"""
+        self._advance()
+        return (
+            self.chamber_psi
+            + self.pressure_offsets.get(address, 0.0)
+            + self._noise(0.01)
+        )
+
+    def temperature(self):
+        return self.temperature_c + self._noise(0.05)
+
+    def flow_ml_min(self):
+        self._advance()
+        overpressure = max(self.chamber_psi - self.AMBIENT_PSI, 0.0)
+        return overpressure * self.flow_per_psi + self._noise(0.05)
+
+    # ---------- motor + encoder ----------
+
+    def _on_step_edge(self, pin, level, tick):
+        if not level:
+            return
+        direction = 1 if self.gpio.read(self.pins["dir"]) else -1
+        self._advance()
+        with self._lock:
+            self.motor_steps += direction
+        self._play_encoder(direction, tick)
+
+    def _play_encoder(self, direction, tick):
+        """emit one step's worth of quadrature edges on the encoder pins"""
+        enc_a, enc_b = self.pins["enc_a"], self.pins["enc_b"]
+        for _ in range(self.counts_per_step):
+            self._phase = (self._phase + direction) % 4
+            a, b = _QUADRATURE[self._phase]
+            self.gpio.write(enc_a, a, tick)
+            self.gpio.write(enc_b, b, tick)
+
+    # ---------- acceleration ----------
+
+    def acceleration_g(self):
+        t = time.monotonic() - self._t0
+        if self.accel_profile is not None:
+            x, y, z = self.accel_profile(t)
+        else:
+            x, y, z = 0.0, 0.0, 1.0
+        return x + self._noise(0.01), y + self._noise(0.01), z + self._noise(0.01)
+
+
+_world = None
+_world_lock = threading.Lock()
+
+
+def get_world():
+    """the process-wide simulated world (created on first use)"""
+    global _world
+    with _world_lock:
+        if _world is None:
+            _world = SimWorld()
+        return _world
+
+
+def set_world(world):
+    """replace the process-wide world, e.g. with a seeded or custom one"""
+    global _world
+    with _world_lock:
+        _world = world
+    return world
@@ -0,0 +1,90 @@
+"""
+downlink client - reads the telemetry server's stream
+
+python3 -m telemetry.client [host] [port] [--rate HZ] [--channel NAME ...]
+prints the newest sample of every channel about once a second.
+"""
+
+import argparse
+import asyncio
+import json
+import time
+
+from telemetry.protocol import FrameDecoder
+
+
+async def stream(
+    host="127.0.0.1", port=8765, rate_hz=None, channels=None, read_size=65536
+):
+    """
+    connect and yield decoded frames as they arrive (see FrameDecoder)
+
+    args:
+        host, port: telemetry server address
+        rate_hz: per-channel sample rate to ask for (default: server maximum)
+        channels: channel names to subscribe to (default: all)
+        read_size: most bytes read from the socket at a time
+    """
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        request = {}
+        if rate_hz is not None:
+            request["rate_hz"] = rate_hz
+        if channels:
+            request["channels"] = list(channels)
+        if request:
+            writer.write(json.dumps(request).encode() + b"\n")
+            await writer.drain()
+
+        decoder = FrameDecoder()
+        while True:
+            data = await reader.read(read_size)
+            if not data:
+                return
+            for decoded in decoder.feed(data):
+                yield decoded
+    finally:
+        writer.close()
+
+
+async def _print_latest(args):
+    latest = {}
+    last_print = time.monotonic()
+    async for decoded in stream(args.host, args.port, args.rate, args.channel):
+        if decoded[0] == "schema":
+            fields = {c["name"]: c["fields"] for c in decoded[1]["channels"]}
+            print(f"connected, {len(fields)} channels")
+        elif decoded[0] == "stats":
+            latest["server"] = decoded[1]["client"]
+        else:
+            _, name, timestamps, values = decoded
+            latest[name] = (
+                timestamps[-1],
+                dict(zip(fields[name], values[-1].tolist())),
+            )
+
+        now = time.monotonic()
+        if now - last_print >= 1.0 and latest:
+            last_print = now
+            for name, sample in sorted(latest.items()):
+                print(f"  {name}: {sample}")
+            print()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="print the telemetry downlink")
+    parser.add_argument("host", nargs="?", default="127.0.0.1")
+    parser.add_argument("port", nargs="?", type=int, default=8765)
+    parser.add_argument("--rate", type=float, help="samples per second per channel")
+    parser.add_argument("--channel", action="append", help="channel to subscribe to")
+    args = parser.parse_args()
+    try:
+        asyncio.run(_print_latest(args))
+    except KeyboardInterrupt:
+        pass
+    except ConnectionError as e:
+        print(f"downlink closed: {e}")
+
+
+if __name__ == "__main__":
+    main()
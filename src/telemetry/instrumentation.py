@@ -0,0 +1,411 @@
+"""
+hot-path timers, counters and gauges, queryable while running
+
+python3 -m telemetry.instrumentation [socket] [--watch S] [--json]
+prints the live figures of a running mswua.py or dashboard.
+
+code paths are timed with the timed() decorator (BaseSensor subclasses
+get their read() timed automatically), events counted with
+counter(name).add() and levels tracked with gauge(name).set(). every
+figure is a handful of integer/float updates under one lock, and while
+instrumentation is off - the default, MSW_INSTRUMENT=true turns it on -
+a timed call costs one flag check and a gauge or counter update
+returns at once.
+
+snapshot() returns every metric as a dict; a running process shares it
+through an InstrumentationServer on a local unix socket (one json
+document per connection, "reset" as the first line clears the figures
+after reading them) and dump() writes it to a file at shutdown.
+"""
+
+import argparse
+import functools
+import json
+import logging
+import os
+import socket
+import sys
+import threading
+import time
+
+from telemetry.sink import event
+
+ENABLE_ENV = "MSW_INSTRUMENT"
+SOCKET_ENV = "MSW_INSTRUMENT_SOCKET"
+DEFAULT_SOCKET = "/tmp/msw_instrumentation.sock"
+
+logger = logging.getLogger(__name__)
+
+_enabled = os.getenv(ENABLE_ENV, "false").lower() == "true"
+_metrics = {}
+_registry_lock = threading.Lock()
+
+
+def is_enabled():
+    return _enabled
+
+
+def enable(on=True):
+    """turn recording on or off for the whole process"""
+    global _enabled
+    _enabled = bool(on)
+
+
+class Timer:
+    """count, errors, total, last and max duration of one code path (seconds)"""
+
+    kind = "timer"
+
+    def __init__(self, name):
+        self.name = name
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.count = 0
+            self.errors = 0
+            self.total_s = 0.0
+            self.last_s = 0.0
+            self.max_s = 0.0
+
+    def observe(self, seconds, error=False):
+        if not _enabled:
+            return
+        with self._lock:
+            self.count += 1
+            self.errors += error
+            self.total_s += seconds
+            self.last_s = seconds
+            if seconds > self.max_s:
+                self.max_s = seconds
+
+    def snapshot(self):
+        with self._lock:
+            mean = self.total_s / self.count if self.count else 0.0
+            return {
+                "kind": self.kind,
+                "count": self.count,
+                "errors": self.errors,
+                "mean_ms": round(mean * 1000, 3),
+                "last_ms": round(self.last_s * 1000, 3),
+                "max_ms": round(self.max_s * 1000, 3),
+                "total_s": round(self.total_s, 3),
+            }
+
+
+class Counter:
+    """a running total"""
+
+    kind = "counter"
+
+    def __init__(self, name):
+        self.name = name
+        self._lock = threading.Lock()
+        self.value = 0
+
+    def reset(self):
+        with self._lock:
+            self.value = 0
+
+    def add(self, n=1):
+        if not _enabled:
+            return
+        with self._lock:
+            self.value += n
+
+    def snapshot(self):
+        return {"kind": self.kind, "value": self.value}
+
+
+class Gauge:
+    """the latest value of a level (queue depth, lag, latency) and the highest seen"""
+
+    kind = "gauge"
+
+    def __init__(self, name):
+        self.name = name
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.value = None
+            self.max = None
+
+    def set(self, value):
+        if not _enabled:
+            return
+        with self._lock:
+            self.value = value
+            if self.max is None or value > self.max:
+                self.max = value
+
+    def snapshot(self):
+        with self._lock:
+            return {"kind": self.kind, "value": self.value, "max": self.max}
+
+
+def _get(cls, name):
+    metric = _metrics.get(name)
+    if metric is None:
+        with _registry_lock:
+            metric = _metrics.setdefault(name, cls(name))
+    if not isinstance(metric, cls):
+        raise ValueError(f"metric {name!r} is a {metric.kind}, not a {cls.kind}")
+    return metric
+
+
+def timer(name):
+    """the process-wide Timer called name (created on first use)"""
+    return _get(Timer, name)
+
+
+def counter(name):
+    """the process-wide Counter called name (created on first use)"""
+    return _get(Counter, name)
+
+
+def gauge(name):
+    """the process-wide Gauge called name (created on first use)"""
+    return _get(Gauge, name)
+
+
+def timed(name):
+    """
+    decorator timing every call of a function into timer(name)
+
+    a call that raises is counted as an error and timed all the same.
+    """
+
+    def decorate(func):
+        metric = timer(name)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            began = time.monotonic()
+            try:
+                result = func(*args, **kwargs)
+            except BaseException:
+                metric.observe(time.monotonic() - began, error=True)
+                raise
+            metric.observe(time.monotonic() - began)
+            return result
+
+        return wrapper
+
+    return decorate
+
+
+def snapshot():
+    """{name: figures} of every metric, sorted by name"""
+    with _registry_lock:
+        metrics = sorted(_metrics.items())
+    return {name: metric.snapshot() for name, metric in metrics}
+
+
+def reset():
+    """zero every metric (the metrics themselves stay registered)"""
+    with _registry_lock:
+        metrics = list(_metrics.values())
+    for metric in metrics:
+        metric.reset()
+
+
+def format_table(figures=None):
+    """one line per metric that has seen anything, slowest timers first"""
+    figures = snapshot() if figures is None else figures
+    timers = sorted(
+        (
+            (name, f)
+            for name, f in figures.items()
+            if f["kind"] == "timer" and f["count"]
+        ),
+        key=lambda item: -item[1]["max_ms"],
+    )
+    lines = [
+        f"{name:32s} {f['count']:9d} calls  mean {f['mean_ms']:8.3f} ms  "
+        f"max {f['max_ms']:8.3f} ms"
+        + (f"  errors {f['errors']}" if f["errors"] else "")
+        for name, f in timers
+    ]
+    for name, f in figures.items():
+        if f["kind"] == "counter" and f["value"]:
+            lines.append(f"{name:32s} {f['value']:9d}")
+        elif f["kind"] == "gauge" and f["value"] is not None:
+            lines.append(f"{name:32s} {f['value']:9.3f}  max {f['max']:.3f}")
+    return "\n".join(lines)
+
+
+def dump(path):
+    """write every metric to path as json - for the end of a run"""
+    document = {
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "monotonic": time.monotonic(),
+        "enabled": _enabled,
+        "metrics": snapshot(),
+    }
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(document, f, indent=2)
+        f.write("\n")
+    event(
+        logger,
+        "instrumentation.dump",
+        msg=f"instrumentation written to {path}",
+        path=path,
+    )
+    return document
+
+
+class InstrumentationServer:
+    """
+    serves snapshot() on a local unix stream socket
+
+    every connection gets one json document and is closed; a client that
+    sends "reset\\n" first also zeroes the figures after they are read.
+    runs on its own daemon thread, so a slow client never touches the
+    control loop.
+    """
+
+    def __init__(self, path=None):
+        """
+        args:
+            path: socket path (default $MSW_INSTRUMENT_SOCKET, then DEFAULT_SOCKET)
+        """
+        self.path = path or os.getenv(SOCKET_ENV) or DEFAULT_SOCKET
+        self.requests = 0
+        self._socket = None
+        self._thread = None
+        self._stop_event = threading.Event()
+
+    @property
+    def is_running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        if self.is_running:
+            return
+        if os.path.exists(self.path):
+            os.unlink(self.path)  # left over from a run that did not stop cleanly
+        self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._socket.bind(self.path)
+        self._socket.listen(4)
+        self._socket.settimeout(0.5)
+        self._stop_event.clear()
+        self._thread = threading.Thread(
+            target=self._serve, name="instrumentation", daemon=True
+        )
+        self._thread.start()
+        event(
+            logger,
+            "instrumentation.serving",
+            msg=f"instrumentation on {self.path}",
+            path=self.path,
+        )
+
+    def stop(self):
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+        if self._socket is not None:
+            self._socket.close()
+            self._socket = None
+            try:
+                os.unlink(self.path)
+            except OSError:
+                pass
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+        return False
+
+    def _serve(self):
+        while not self._stop_event.is_set():
+            try:
+                conn, _ = self._socket.accept()
+            except socket.timeout:
+                continue
+            except OSError:
+                return
+            with conn:
+                try:
+                    self._answer(conn)
+                except OSError as e:
+                    logger.debug("instrumentation client went away: %s", e)
+
+    def _answer(self, conn):
+        conn.settimeout(0.1)
+        try:
+            command = conn.recv(64).decode(errors="replace").strip()
+        except socket.timeout:
+            command = ""
+        conn.settimeout(1.0)
+        document = {
+            "enabled": _enabled,
+            "monotonic": time.monotonic(),
+            "metrics": snapshot(),
+        }
+        conn.sendall(json.dumps(document).encode() + b"\n")
+        self.requests += 1
+        if command == "reset":
+            reset()
+
+
+def query(path=None, reset_after=False, timeout=2.0):
+    """the figures of the process serving on path"""
+    path = path or os.getenv(SOCKET_ENV) or DEFAULT_SOCKET
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as conn:
+        conn.settimeout(timeout)
+        conn.connect(path)
+        conn.sendall(b"reset\n" if reset_after else b"\n")
+        chunks = []
+        while True:
+            chunk = conn.recv(65536)
+            if not chunk:
+                break
+            chunks.append(chunk)
+    return json.loads(b"".join(chunks))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "socket", nargs="?", help=f"socket path (default {DEFAULT_SOCKET})"
+    )
+    parser.add_argument("--watch", type=float, help="repeat every S seconds")
+    parser.add_argument("--json", action="store_true", help="print the raw json")
+    parser.add_argument(
+        "--reset", action="store_true", help="zero the figures after reading"
+    )
+    args = parser.parse_args(argv)
+
+    while True:
+        try:
+            document = query(args.socket, args.reset)
+        except OSError as e:
+            print(f"cannot reach {args.socket or DEFAULT_SOCKET}: {e}", file=sys.stderr)
+            return 1
+        if args.json:
+            print(json.dumps(document, indent=2))
+        else:
+            if not document["enabled"]:
+                print(f"instrumentation is off in that process (set {ENABLE_ENV}=true)")
+            print(format_table(document["metrics"]) or "nothing recorded yet")
+        if not args.watch:
+            return 0
+        time.sleep(args.watch)
+        print()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
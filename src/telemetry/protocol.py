@@ -0,0 +1,182 @@
+"""
+binary downlink frame format shared by the telemetry server and clients
+
+every frame is a little-endian u32 body length followed by the body, whose
+first byte is the frame type:
+
+- SCHEMA  json: {"version", "channels": [{"id", "name", "fields", "quantum"}]}
+          sent first and whenever channels change
+- KEY     u16 channel id, u16 count, f64 timestamps[count],
+          f64 values[count][fields] - absolute samples, decodable on their own
+- DELTA   u16 channel id, u16 count, u32 dt_us[count], i16 dq[count][fields]
+          - each sample relative to the previous one on that channel: time
+          in microseconds and values in steps of the channel's quantum
+- STATS   json: server and per-client counters, about once a second
+
+a DELTA always follows a KEY or DELTA for the same channel. values decoded
+from deltas are exact multiples of the quantum, so the sender tracks the
+same quantized state as the receiver and errors never accumulate.
+"""
+
+import json
+import struct
+
+import numpy as np
+
+VERSION = 1
+
+SCHEMA = 1
+KEY = 2
+DELTA = 3
+STATS = 4
+
+_LENGTH = struct.Struct("<I")
+_SAMPLES = struct.Struct("<HH")
+_I16 = np.iinfo(np.int16)
+_MAX_DT_US = np.iinfo(np.uint32).max
+
+MAX_SAMPLES = 0xFFFF
+
+
+def frame(kind, payload):
+    body = bytes([kind]) + payload
+    return _LENGTH.pack(len(body)) + body
+
+
+def json_frame(kind, obj):
+    return frame(kind, json.dumps(obj, separators=(",", ":")).encode())
+
+
+class ChannelEncoder:
+    """
+    turns batches of samples from one channel into KEY/DELTA frames
+
+    one encoder per client and channel - it holds the quantized state of
+    the last sample that client was sent.
+    """
+
+    def __init__(self, channel_id, quantum):
+        self.channel_id = channel_id
+        self.quantum = np.asarray(quantum, dtype=np.float64)
+        self.last_time = None
+        self.last_q = None
+
+    def reset(self):
+        """next batch goes out as a KEY frame"""
+        self.last_time = None
+        self.last_q = None
+
+    def encode(self, timestamps, values, force_key=False):
+        """frame bytes for up to MAX_SAMPLES samples (values: count x fields)"""
+        timestamps = np.asarray(timestamps, dtype=np.float64)
+        values = np.asarray(values, dtype=np.float64)
+        q = np.rint(values / self.quantum)
+
+        if not force_key and self.last_q is not None and np.isfinite(q).all():
+            # microsecond offsets from the last sent time, rounded once so
+            # the error does not grow along the batch
+            offsets = np.rint((timestamps - self.last_time) * 1e6)
+            dt = np.diff(offsets, prepend=0.0)
+            dq = np.diff(q, axis=0, prepend=self.last_q[None, :])
+            if (
+                dt.min() >= 0
+                and dt.max() <= _MAX_DT_US
+                and dq.min() >= _I16.min
+                and dq.max() <= _I16.max
+            ):
+                # track the time the receiver decodes, not the exact one
+                self.last_time = self.last_time + offsets[-1] / 1e6
+                self.last_q = q[-1]
+                return frame(
+                    DELTA,
+                    _SAMPLES.pack(self.channel_id, len(timestamps))
+                    + dt.astype("<u4").tobytes()
+                    + dq.astype("<i2").tobytes(),
+                )
+
+        self.last_time = float(timestamps[-1])
+        self.last_q = q[-1] if np.isfinite(q[-1]).all() else None
+        return frame(
+            KEY,
+            _SAMPLES.pack(self.channel_id, len(timestamps))
+            + timestamps.astype("<f8").tobytes()
+            + values.astype("<f8").tobytes(),
+        )
+
+
+class FrameDecoder:
+    """
+    sans-io decoder: feed() bytes as they arrive and get decoded frames
+
+    yields ("schema", dict), ("stats", dict) or
+    ("samples", channel_name, timestamps, values) with values shaped
+    (count, fields).
+    """
+
+    def __init__(self):
+        self._buffer = bytearray()
+        self.channels = {}
+        self._state = {}
+
+    def feed(self, data):
+        self._buffer += data
+        frames = []
+        while len(self._buffer) >= _LENGTH.size:
+            (length,) = _LENGTH.unpack_from(self._buffer)
+            end = _LENGTH.size + length
+            if len(self._buffer) < end:
+                break
+            body = bytes(self._buffer[_LENGTH.size : end])
+            del self._buffer[:end]
+            decoded = self._decode(body)
+            if decoded is not None:
+                frames.append(decoded)
+        return frames
+
+    def _decode(self, body):
+        kind, payload = body[0], body[1:]
+        if kind == SCHEMA:
+            schema = json.loads(payload)
+            if schema.get("version") != VERSION:
+                raise ValueError(
+                    f"unsupported downlink version {schema.get('version')}"
+                )
+            self.channels = {
+                c["id"]: (
+                    c["name"],
+                    len(c["fields"]),
+                    np.asarray(c["quantum"], dtype=np.float64),
+                )
+                for c in schema["channels"]
+            }
+            self._state = {}
+            return ("schema", schema)
+        if kind == STATS:
+            return ("stats", json.loads(payload))
+        if kind not in (KEY, DELTA):
+            return None  # unknown frame types are skipped
+
+        channel_id, count = _SAMPLES.unpack_from(payload)
+        name, nfields, quantum = self.channels[channel_id]
+        data = payload[_SAMPLES.size :]
+        if kind == KEY:
+            timestamps = np.frombuffer(data, "<f8", count)
+            values = np.frombuffer(data, "<f8", count * nfields, count * 8).reshape(
+                count, nfields
+            )
+            q = np.rint(values[-1] / quantum)
+            self._state[channel_id] = (
+                float(timestamps[-1]),
+                q if np.isfinite(q).all() else None,
+            )
+            return ("samples", name, timestamps, values)
+
+        last_time, last_q = self._state[channel_id]
+        dt = np.frombuffer(data, "<u4", count)
+        dq = np.frombuffer(data, "<i2", count * nfields, count * 4).reshape(
+            count, nfields
+        )
+        timestamps = last_time + np.cumsum(dt) / 1e6
+        q = last_q + np.cumsum(dq, axis=0, dtype=np.float64)
+        self._state[channel_id] = (float(timestamps[-1]), q[-1])
+        return ("samples", name, timestamps, q * quantum)
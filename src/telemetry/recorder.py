@@ -0,0 +1,339 @@
+import json
+import logging
+import mmap
+import os
+import struct
+import threading
+import time
+import zlib
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# file header: magic, version, header size, json length, committed bytes, block count
+MAGIC = b"MSWREC01"
+VERSION = 1
+_FILE_HEADER = struct.Struct("<8sIIIQQ")
+
+# block header: magic, channel id, reserved, record count, payload bytes, payload crc32
+BLOCK_MAGIC = b"BLK0"
+_BLOCK_HEADER = struct.Struct("<4sHHIII")
+
+VALUE_DTYPE = np.dtype("<f4")
+TIME_DTYPE = np.dtype("<f8")
+
+
+class RecorderChannel:
+    """one recorded channel - a ring buffer plus the cursor into it"""
+
+    def __init__(self, channel_id, name, buffer):
+        self.id = channel_id
+        self.name = name
+        self.buffer = buffer
+        self.cursor = buffer.count
+        self.records = 0
+        self.dropped = 0
+
+    @property
+    def fields(self):
+        return self.buffer.fields
+
+    @property
+    def record_size(self):
+        """bytes per fixed-width record (timestamp + one value per field)"""
+        return TIME_DTYPE.itemsize + VALUE_DTYPE.itemsize * len(self.fields)
+
+
+class FlightRecorder:
+    """
+    appends every sample from a set of ring buffers to a binary columnar file
+
+    layout: a page-aligned header (fixed struct followed by a json channel
+    table), then a sequence of blocks. each block holds the new samples of
+    one channel as columns - float64 timestamps followed by one float32
+    column per field - behind a small header with the record count and a
+    crc32 of the payload.
+
+    the file is grown in large steps and written through a memory map, so an
+    append is a memcpy rather than a write() call. after each block is
+    flushed to disk the header's committed byte count is updated and flushed
+    too; anything past that mark (a block torn by a crash or power loss) is
+    ignored when the file is read back.
+    """
+
+    def __init__(
+        self, path, flush_interval=1.0, grow_bytes=8 * 1024 * 1024, metadata=None
+    ):
+        """
+        args:
+            path: output file
+            flush_interval: seconds between block writes
+            grow_bytes: file growth step (rounded up to whole pages)
+            metadata: json-serialisable dict stored in the header (e.g. the topology)
+        """
+        self.path = path
+        self.metadata = metadata
+        self.flush_interval = flush_interval
+        self.grow_bytes = -(-grow_bytes // mmap.PAGESIZE) * mmap.PAGESIZE
+        self._channels = {}
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread = None
+        self._fd = None
+        self._mmap = None
+        self._size = 0
+        self._header_size = 0
+        self._header_json_len = 0
+        self._committed = 0
+        self._blocks = 0
+
+    def add_channel(self, name, buffer):
+        """record a ring buffer under the given channel name"""
+        if self._fd is not None:
+            raise RuntimeError("cannot add channels after the recorder started")
+        if name in self._channels:
+            raise ValueError(f"duplicate recorder channel name: {name}")
+        channel = RecorderChannel(len(self._channels), name, buffer)
+        self._channels[name] = channel
+        return channel
+
+    def add_sensor(self, name, sensor):
+        """record a sensor's ring buffer"""
+        return self.add_channel(name, sensor.buffer)
+
+    @property
+    def is_running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        """create the file, write the header and start the block writer"""
+        if self._fd is not None:
+            return
+        if not self._channels:
+            raise RuntimeError("no channels registered")
+
+        metadata = {
+            "channels": [
+                {"id": c.id, "name": c.name, "fields": list(c.fields)}
+                for c in self._channels.values()
+            ],
+            "time_dtype": TIME_DTYPE.str,
+            "value_dtype": VALUE_DTYPE.str,
+            # samples carry monotonic timestamps; this maps them to wall time
+            "wall_clock_offset": time.time() - time.monotonic(),
+        }
+        if self.metadata:
+            metadata["metadata"] = self.metadata
+        header_json = json.dumps(metadata).encode()
+        needed = _FILE_HEADER.size + len(header_json)
+        self._header_size = -(-needed // mmap.PAGESIZE) * mmap.PAGESIZE
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT | os.O_TRUNC, 0o644)
+        self._grow(self._header_size + self.grow_bytes)
+        self._committed = self._header_size
+        self._blocks = 0
+
+        start = _FILE_HEADER.size
+        self._mmap[start : start + len(header_json)] = header_json
+        self._header_json_len = len(header_json)
+        self._write_header()
+
+        # only samples written from now on are recorded
+        for channel in self._channels.values():
+            channel.cursor = channel.buffer.count
+
+        self._stop_event.clear()
+        self._thread = threading.Thread(
+            target=self._writer_loop, name="flight-recorder", daemon=True
+        )
+        self._thread.start()
+        logger.info("recording %d channels to %s", len(self._channels), self.path)
+
+    def stop(self):
+        """write the remaining samples, trim the file and close it"""
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout=5.0)
+            self._thread = None
+        if self._fd is None:
+            return
+        self.flush()
+        self._mmap.flush()
+        self._mmap.close()
+        self._mmap = None
+        os.ftruncate(self._fd, self._committed)
+        os.fsync(self._fd)
+        os.close(self._fd)
+        self._fd = None
+        logger.info("recording closed: %s (%d bytes)", self.path, self._committed)
+
+    def flush(self):
+        """append one block per channel holding every sample since the last flush"""
+        with self._lock:
+            if self._mmap is None:
+                return
+            first = self._committed
+            for channel in self._channels.values():
+                timestamps, values, cursor, dropped = channel.buffer.read_since(
+                    channel.cursor
+                )
+                channel.cursor = cursor
+                if dropped:
+                    channel.dropped += dropped
+                    logger.warning(
+                        "recorder lost %d samples on %s", dropped, channel.name
+                    )
+                if len(timestamps):
+                    self._append_block(channel, timestamps, values)
+
+            if self._committed != first:
+                self._sync(first, self._committed - first)
+                self._write_header()
+
+    def stats(self):
+        """records, dropped samples and bytes written per channel"""
+        return {
+            "bytes": self._committed,
+            "blocks": self._blocks,
+            "channels": {
+                c.name: {"records": c.records, "dropped": c.dropped}
+                for c in self._channels.values()
+            },
+        }
+
+    def _writer_loop(self):
+        while not self._stop_event.wait(self.flush_interval):
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("flight recorder flush failed")
+
+    def _append_block(self, channel, timestamps, values):
+        """copy one channel's samples into the map as a columnar block"""
+        n = len(timestamps)
+        columns = [np.ascontiguousarray(timestamps, dtype=TIME_DTYPE).tobytes()]
+        for i in range(len(channel.fields)):
+            columns.append(
+                np.ascontiguousarray(values[:, i], dtype=VALUE_DTYPE).tobytes()
+            )
+        payload = b"".join(columns)
+
+        block_size = _BLOCK_HEADER.size + len(payload)
+        if self._committed + block_size > self._size:
+            self._grow(self._committed + block_size + self.grow_bytes)
+
+        offset = self._committed
+        self._mmap[offset : offset + _BLOCK_HEADER.size] = _BLOCK_HEADER.pack(
+            BLOCK_MAGIC, channel.id, 0, n, len(payload), zlib.crc32(payload)
+        )
+        offset += _BLOCK_HEADER.size
+        self._mmap[offset : offset + len(payload)] = payload
+
+        self._committed += block_size
+        self._blocks += 1
+        channel.records += n
+
+    def _grow(self, size):
+        """extend the file to at least `size` bytes and remap it"""
+        size = -(-size // mmap.PAGESIZE) * mmap.PAGESIZE
+        if self._mmap is not None:
+            self._mmap.flush()
+            self._mmap.close()
+        os.ftruncate(self._fd, size)
+        self._mmap = mmap.mmap(self._fd, size)
+        self._size = size
+
+    def _sync(self, offset, length):
+        """flush a byte range of the map (msync needs page-aligned offsets)"""
+        aligned = offset - offset % mmap.PAGESIZE
+        self._mmap.flush(aligned, length + offset - aligned)
+
+    def _write_header(self):
+        """publish the committed length - the crash-safety mark"""
+        self._mmap[: _FILE_HEADER.size] = _FILE_HEADER.pack(
+            MAGIC,
+            VERSION,
+            self._header_size,
+            self._header_json_len,
+            self._committed,
+            self._blocks,
+        )
+        self._mmap.flush(0, self._header_size)
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+
+def load_recording(path):
+    """
+    read a recording back into numpy arrays
+
+    returns:
+        (metadata, channels) where channels maps each channel name to a
+        structured array with a "timestamp" column and one column per field
+    """
+    with open(path, "rb") as f:
+        data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    try:
+        magic, version, header_size, json_len, committed, _ = _FILE_HEADER.unpack_from(
+            data, 0
+        )
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a flight recording")
+        if version != VERSION:
+            raise ValueError(f"unsupported recording version {version}")
+        metadata = json.loads(
+            bytes(data[_FILE_HEADER.size : _FILE_HEADER.size + json_len])
+        )
+
+        by_id = {c["id"]: c for c in metadata["channels"]}
+        parts = {c["id"]: [] for c in metadata["channels"]}
+        end = min(committed, len(data))
+        offset = header_size
+        while offset + _BLOCK_HEADER.size <= end:
+            magic, channel_id, _, n, length, crc = _BLOCK_HEADER.unpack_from(
+                data, offset
+            )
+            payload_start = offset + _BLOCK_HEADER.size
+            if magic != BLOCK_MAGIC or payload_start + length > end:
+                logger.warning("%s: truncated block at byte %d", path, offset)
+                break
+            payload = data[payload_start : payload_start + length]
+            if zlib.crc32(payload) != crc:
+                logger.warning("%s: corrupt block at byte %d", path, offset)
+                break
+            parts[channel_id].append((n, payload))
+            offset = payload_start + length
+
+        channels = {}
+        for channel_id, blocks in parts.items():
+            fields = by_id[channel_id]["fields"]
+            dtype = np.dtype(
+                [("timestamp", TIME_DTYPE)] + [(name, VALUE_DTYPE) for name in fields]
+            )
+            out = np.empty(sum(n for n, _ in blocks), dtype=dtype)
+            row = 0
+            for n, payload in blocks:
+                out["timestamp"][row : row + n] = np.frombuffer(
+                    payload, dtype=TIME_DTYPE, count=n
+                )
+                column_offset = n * TIME_DTYPE.itemsize
+                for name in fields:
+                    out[name][row : row + n] = np.frombuffer(
+                        payload, dtype=VALUE_DTYPE, count=n, offset=column_offset
+                    )
+                    column_offset += n * VALUE_DTYPE.itemsize
+                row += n
+            channels[by_id[channel_id]["name"]] = out
+        return metadata, channels
+    finally:
+        data.close()
@@ -0,0 +1,381 @@
+import asyncio
+import json
+import logging
+import threading
+import time
+
+import numpy as np
+
+from telemetry import protocol
+
+logger = logging.getLogger(__name__)
+
+
+class DownlinkChannel:
+    """one streamed channel - a ring buffer plus the server's cursor into it"""
+
+    def __init__(self, channel_id, name, buffer, quantum):
+        self.id = channel_id
+        self.name = name
+        self.buffer = buffer
+        self.cursor = buffer.count
+        self.samples = 0
+        self.dropped = 0
+        quantum = np.broadcast_to(
+            np.asarray(quantum, dtype=np.float64), (len(buffer.fields),)
+        )
+        if (quantum <= 0).any():
+            raise ValueError(f"quantum for {name} must be positive")
+        self.quantum = quantum.copy()
+
+    def schema(self):
+        return {
+            "id": self.id,
+            "name": self.name,
+            "fields": list(self.buffer.fields),
+            "quantum": self.quantum.tolist(),
+        }
+
+
+class _Client:
+    """per-connection subscription, delta state and counters"""
+
+    def __init__(self, writer, channels, rate_hz):
+        self.writer = writer
+        self.peer = writer.get_extra_info("peername")
+        self.rate_hz = rate_hz
+        self.subscribed = None  # None = every channel
+        self.encoders = {
+            c.id: protocol.ChannelEncoder(c.id, c.quantum) for c in channels
+        }
+        self.last_bin = {}
+        self.last_key = 0.0
+        self.congested_since = None
+        self.frames = 0
+        self.bytes = 0
+        self.skipped = 0
+
+    def wants(self, channel):
+        return self.subscribed is None or channel.name in self.subscribed
+
+    def decimate(self, channel, timestamps):
+        """indices of the samples to send - the first one in each 1/rate bin"""
+        if not self.rate_hz:
+            return slice(None)
+        bins = np.floor(timestamps * self.rate_hz)
+        last = self.last_bin.get(channel.id, -np.inf)
+        keep = np.flatnonzero(np.diff(bins, prepend=last) > 0)
+        if len(keep):
+            self.last_bin[channel.id] = bins[keep[-1]]
+        return keep
+
+    def write(self, data):
+        self.writer.write(data)
+        self.frames += 1
+        self.bytes += len(data)
+
+    def stats(self):
+        return {
+            "peer": f"{self.peer[0]}:{self.peer[1]}" if self.peer else None,
+            "rate_hz": self.rate_hz,
+            "frames": self.frames,
+            "bytes": self.bytes,
+            "skipped_ticks": self.skipped,
+            "buffered": self.writer.transport.get_write_buffer_size(),
+        }
+
+
+class TelemetryServer:
+    """
+    streams every registered ring buffer to any number of tcp clients
+
+    an asyncio loop on its own thread polls the ring buffers every tick
+    with read_since() - a read that never takes a lock or waits on the
+    sampling threads - and sends each client compact binary frames (see
+    telemetry.protocol): KEY frames with absolute samples, then DELTA
+    frames with microsecond time steps and int16 value steps.
+
+    each client gets its own decimation (at most max_rate_hz samples per
+    second per channel) and its own delta state. the server never waits
+    for a client: when a client's socket buffer is above high_water the
+    tick is skipped for it and its next frames are KEYs, and a client that
+    stays congested for stall_timeout is dropped. a slow laptop on the
+    ground therefore costs acquisition nothing.
+
+    clients may send json lines to change their subscription, e.g.
+    {"rate_hz": 5, "channels": ["PressureSensor_0"]}.
+    """
+
+    def __init__(
+        self,
+        host="0.0.0.0",
+        port=8765,
+        tick_s=0.05,
+        max_rate_hz=20.0,
+        key_interval_s=5.0,
+        high_water=256 * 1024,
+        stall_timeout=30.0,
+        max_clients=8,
+    ):
+        """
+        args:
+            host: interface to listen on
+            port: tcp port (0 picks a free one, see .port after start)
+            tick_s: how often new samples are collected and sent
+            max_rate_hz: per-channel sample rate cap for every client (0 = none)
+            key_interval_s: seconds between KEY frames on each channel
+            high_water: socket buffer bytes above which a client is skipped
+            stall_timeout: drop a client congested for this long (s)
+            max_clients: connections beyond this are refused
+        """
+        self.host = host
+        self.port = port
+        self.tick_s = tick_s
+        self.max_rate_hz = max_rate_hz
+        self.key_interval_s = key_interval_s
+        self.high_water = high_water
+        self.stall_timeout = stall_timeout
+        self.max_clients = max_clients
+
+        self._channels = {}
+        self._clients = set()
+        self._handlers = set()
+        self._thread = None
+        self._loop = None
+        self._stop = None
+        self._ready = threading.Event()
+        self._error = None
+        self.ticks = 0
+        self.refused = 0
+
+    def add_channel(self, name, buffer, quantum=1e-3):
+        """
+        stream a ring buffer under the given channel name
+
+        quantum is the delta encoding resolution, one value or one per field
+        - decoded values are within half a quantum of the recorded ones.
+        """
+        if self.is_running:
+            raise RuntimeError("cannot add channels after the server started")
+        if name in self._channels:
+            raise ValueError(f"duplicate downlink channel name: {name}")
+        channel = DownlinkChannel(len(self._channels), name, buffer, quantum)
+        self._channels[name] = channel
+        return channel
+
+    def add_sensor(self, name, sensor, quantum=1e-3):
+        """stream a sensor's ring buffer"""
+        return self.add_channel(name, sensor.buffer, quantum)
+
+    @property
+    def is_running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    # ---------- lifecycle (any thread) ----------
+
+    def start(self):
+        """listen and stream from a background thread"""
+        if self.is_running:
+            return
+        self._ready.clear()
+        self._error = None
+        self._thread = threading.Thread(
+            target=self._run, name="telemetry-server", daemon=True
+        )
+        self._thread.start()
+        self._ready.wait()
+        if self._error is not None:
+            self._thread.join()
+            raise self._error
+
+    def stop(self):
+        if not self.is_running:
+            return
+        self._loop.call_soon_threadsafe(self._stop.set)
+        self._thread.join(timeout=5.0)
+        self._thread = None
+
+    def _run(self):
+        try:
+            asyncio.run(self.serve())
+        except Exception as e:
+            self._error = e
+            self._ready.set()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+        return False
+
+    # ---------- event loop ----------
+
+    async def serve(self):
+        """run the server in the current event loop until stop()"""
+        self._loop = asyncio.get_running_loop()
+        self._stop = asyncio.Event()
+        server = await asyncio.start_server(self._handle_client, self.host, self.port)
+        self.port = server.sockets[0].getsockname()[1]
+        logger.info(
+            "telemetry downlink on %s:%d, %d channels",
+            self.host,
+            self.port,
+            len(self._channels),
+        )
+        self._ready.set()
+        try:
+            next_tick = self._loop.time()
+            last_stats = next_tick
+            while not self._stop.is_set():
+                next_tick += self.tick_s
+                now = self._loop.time()
+                if next_tick < now:
+                    next_tick = now  # fell behind - do not burst
+                try:
+                    await asyncio.wait_for(self._stop.wait(), next_tick - now)
+                except asyncio.TimeoutError:
+                    pass
+                self._tick()
+                if now - last_stats >= 1.0:
+                    last_stats = now
+                    self._send_stats()
+        finally:
+            server.close()
+            for client in list(self._clients):
+                client.writer.close()
+            if self._handlers:
+                await asyncio.wait(self._handlers, timeout=1.0)
+            await server.wait_closed()
+            logger.info("telemetry downlink stopped")
+
+    def _schema(self):
+        return {
+            "version": protocol.VERSION,
+            "channels": [channel.schema() for channel in self._channels.values()],
+        }
+
+    async def _handle_client(self, reader, writer):
+        if len(self._clients) >= self.max_clients:
+            self.refused += 1
+            writer.close()
+            return
+        client = _Client(writer, self._channels.values(), self.max_rate_hz)
+        self._clients.add(client)
+        handler = asyncio.current_task()
+        self._handlers.add(handler)
+        client.write(protocol.json_frame(protocol.SCHEMA, self._schema()))
+        logger.info("telemetry client connected: %s", client.peer)
+        try:
+            async for line in reader:
+                self._subscribe(client, line)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            self._clients.discard(client)
+            self._handlers.discard(handler)
+            writer.close()
+            logger.info("telemetry client disconnected: %s", client.peer)
+
+    def _subscribe(self, client, line):
+        try:
+            request = json.loads(line)
+        except ValueError:
+            logger.warning("bad subscription from %s: %r", client.peer, line[:80])
+            return
+        if not isinstance(request, dict):
+            logger.warning("bad subscription from %s: %r", client.peer, line[:80])
+            return
+        if "rate_hz" in request:
+            try:
+                rate = float(request["rate_hz"] or 0)
+            except (TypeError, ValueError):
+                logger.warning(
+                    "bad rate_hz from %s: %r", client.peer, request["rate_hz"]
+                )
+            else:
+                if not rate > 0 or (self.max_rate_hz and rate > self.max_rate_hz):
+                    rate = self.max_rate_hz  # also catches nan
+                client.rate_hz = rate
+        if "channels" in request:
+            channels = request["channels"]
+            if channels and not (
+                isinstance(channels, list)
+                and all(isinstance(name, str) for name in channels)
+            ):
+                logger.warning(
+                    "bad channels from %s: %r", client.peer, str(channels)[:80]
+                )
+            else:
+                client.subscribed = set(channels) if channels else None
+
+    def _tick(self):
+        self.ticks += 1
+        batches = []
+        for channel in self._channels.values():
+            timestamps, values, channel.cursor, dropped = channel.buffer.read_since(
+                channel.cursor
+            )
+            channel.dropped += dropped
+            if len(timestamps):
+                channel.samples += len(timestamps)
+                batches.append((channel, timestamps, values))
+
+        now = time.monotonic()
+        for client in list(self._clients):
+            if client.writer.is_closing():
+                self._clients.discard(client)
+                continue
+            if client.writer.transport.get_write_buffer_size() > self.high_water:
+                self._congested(client, now)
+                continue
+            client.congested_since = None
+
+            force_key = now - client.last_key >= self.key_interval_s
+            if force_key:
+                client.last_key = now
+            for channel, timestamps, values in batches:
+                if not client.wants(channel):
+                    continue
+                keep = client.decimate(channel, timestamps)
+                ts, vals = timestamps[keep], values[keep]
+                encoder = client.encoders[channel.id]
+                for start in range(0, len(ts), protocol.MAX_SAMPLES):
+                    end = start + protocol.MAX_SAMPLES
+                    client.write(
+                        encoder.encode(ts[start:end], vals[start:end], force_key)
+                    )
+
+    def _congested(self, client, now):
+        """skip a slow client: its next frames restart from KEYs"""
+        client.skipped += 1
+        for encoder in client.encoders.values():
+            encoder.reset()
+        if client.congested_since is None:
+            client.congested_since = now
+        elif now - client.congested_since > self.stall_timeout:
+            logger.warning("dropping stalled telemetry client %s", client.peer)
+            client.writer.transport.abort()
+            self._clients.discard(client)
+
+    def _send_stats(self):
+        server = self.stats()
+        for client in list(self._clients):
+            if client.writer.transport.get_write_buffer_size() <= self.high_water:
+                client.write(
+                    protocol.json_frame(
+                        protocol.STATS, dict(server, client=client.stats())
+                    )
+                )
+
+    def stats(self):
+        return {
+            "clients": len(self._clients),
+            "refused": self.refused,
+            "ticks": self.ticks,
+            "channels": {
+                name: {"samples": c.samples, "dropped": c.dropped}
+                for name, c in self._channels.items()
+            },
+        }
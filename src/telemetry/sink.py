@@ -0,0 +1,352 @@
+"""
+structured, asynchronous telemetry on top of the stdlib logging module
+
+modules log as usual (logger = logging.getLogger(__name__)) and emit typed
+events with event(logger, "valve.open", pin=6). configure() routes every
+record through one bounded queue: the emitting thread only stamps the
+record and enqueues it (dropping it if the queue is full - it never
+blocks), and a background writer drains the queue in batches to any of:
+
+- a json-lines file
+- a local udp or unix datagram socket (one json object per line, packed
+  into datagrams) for ground tooling
+- the console, human readable
+
+each target has its own level filter.
+"""
+
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import socket
+import sys
+import threading
+import time
+
+_LEVEL_ENV = "MSW_LOG_LEVEL"
+_UDP_ENV = "MSW_TELEMETRY_UDP"
+_SOCKET_ENV = "MSW_TELEMETRY_SOCKET"
+
+# keep datagrams below the usual loopback/ethernet-friendly size
+_MAX_DATAGRAM = 8192
+
+logger = logging.getLogger(__name__)
+
+_sink = None
+_sink_lock = threading.Lock()
+
+
+def event(logger, name, level=logging.INFO, msg=None, **fields):
+    """
+    emit a typed telemetry event
+
+    args:
+        logger: the module's logger
+        name: dotted event type, e.g. "valve.open" or "sensor.connected"
+        level: logging level
+        msg: console text (defaults to the name followed by key=value pairs)
+        fields: event payload - json serialisable, numpy scalars are fine
+    """
+    if not logger.isEnabledFor(level):
+        return
+    if msg is None:
+        msg = " ".join([name] + [f"{key}={value}" for key, value in fields.items()])
+    logger.log(level, msg, extra={"event": name, "fields": fields})
+
+
+def _json_default(value):
+    # numpy scalars and arrays, then anything else as text
+    if hasattr(value, "tolist"):
+        return value.tolist()
+    return str(value)
+
+
+class JsonFormatter(logging.Formatter):
+    """one json object per record"""
+
+    def format(self, record):
+        entry = {
+            "ts": record.created,
+            "mono": getattr(record, "mono", None),
+            "level": record.levelname,
+            "logger": record.name,
+            "event": getattr(record, "event", None),
+            "msg": record.getMessage(),
+        }
+        fields = getattr(record, "fields", None)
+        if fields:
+            entry["data"] = fields
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=_json_default, separators=(",", ":"))
+
+
+class _DropQueueHandler(logging.handlers.QueueHandler):
+    """queue handler that stamps and enqueues without blocking or formatting"""
+
+    def __init__(self, records):
+        super().__init__(records)
+        self.dropped = 0
+
+    def prepare(self, record):
+        # formatting happens on the writer thread
+        record.mono = time.monotonic()
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class _Target:
+    def __init__(self, level, formatter):
+        self.level = level
+        self.formatter = formatter
+        self.written = 0
+        self.errors = 0
+        self.format_errors = 0
+
+    def write_batch(self, records):
+        lines = []
+        for record in records:
+            if record.levelno < self.level:
+                continue
+            # a bad log call (wrong % arguments, unserialisable field) loses
+            # that record only, never the rest of the batch or the writer
+            try:
+                lines.append(self.formatter.format(record))
+            except Exception:
+                self.format_errors += 1
+        if not lines:
+            return
+        try:
+            self.write(lines)
+            self.written += len(lines)
+        except OSError:
+            self.errors += 1
+
+    def close(self):
+        pass
+
+
+class _FileTarget(_Target):
+    def __init__(self, path, level):
+        super().__init__(level, JsonFormatter())
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self._file = open(path, "a", encoding="utf-8")
+
+    def write(self, lines):
+        self._file.write("\n".join(lines) + "\n")
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+
+class _DatagramTarget(_Target):
+    """udp (host, port) or unix datagram socket path - a missing listener is not an error"""
+
+    def __init__(self, address, level):
+        super().__init__(level, JsonFormatter())
+        family = socket.AF_UNIX if isinstance(address, str) else socket.AF_INET
+        self.address = address
+        self._socket = socket.socket(family, socket.SOCK_DGRAM)
+        self._socket.setblocking(False)
+
+    def write(self, lines):
+        datagram = bytearray()
+        for line in lines:
+            data = line.encode() + b"\n"
+            if datagram and len(datagram) + len(data) > _MAX_DATAGRAM:
+                self._send(datagram)
+                datagram = bytearray()
+            datagram += data
+        if datagram:
+            self._send(datagram)
+
+    def _send(self, datagram):
+        try:
+            self._socket.sendto(datagram, self.address)
+        except (BlockingIOError, ConnectionRefusedError, FileNotFoundError):
+            self.errors += 1  # nobody listening or the receiver is full
+
+    def close(self):
+        self._socket.close()
+
+
+class _ConsoleTarget(_Target):
+    def __init__(self, level, stream=None):
+        super().__init__(
+            level,
+            logging.Formatter(
+                "%(asctime)s %(levelname)-7s %(name)s: %(message)s", "%H:%M:%S"
+            ),
+        )
+        self._stream = stream or sys.stdout
+
+    def write(self, lines):
+        self._stream.write("\n".join(lines) + "\n")
+        self._stream.flush()
+
+
+class TelemetrySink:
+    """
+    bounded record queue plus the batching writer thread
+
+    use configure() rather than building one directly - it installs the
+    sink on the root logger.
+    """
+
+    def __init__(self, targets, queue_size=10000, batch_size=256, flush_interval=0.2):
+        self.targets = list(targets)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.records = queue.Queue(maxsize=queue_size)
+        self.handler = _DropQueueHandler(self.records)
+        self.batches = 0
+        self._stop_event = threading.Event()
+        self._thread = threading.Thread(
+            target=self._writer_loop, name="telemetry-writer", daemon=True
+        )
+
+    @property
+    def level(self):
+        return min((target.level for target in self.targets), default=logging.WARNING)
+
+    def start(self):
+        self._thread.start()
+
+    def _writer_loop(self):
+        while not (self._stop_event.is_set() and self.records.empty()):
+            try:
+                batch = [self.records.get(timeout=self.flush_interval)]
+            except queue.Empty:
+                continue
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self.records.get_nowait())
+                except queue.Empty:
+                    break
+            for target in self.targets:
+                try:
+                    target.write_batch(batch)
+                except Exception:
+                    # the writer thread must outlive any one target failing
+                    logger.exception(
+                        "telemetry target %s failed", type(target).__name__
+                    )
+            self.batches += 1
+
+    def stop(self):
+        """write out what is queued and close the targets"""
+        self._stop_event.set()
+        if self._thread.is_alive():
+            self._thread.join(timeout=5.0)
+        for target in self.targets:
+            target.close()
+
+    def stats(self):
+        return {
+            "queued": self.records.qsize(),
+            "dropped": self.handler.dropped,
+            "batches": self.batches,
+            "written": {type(t).__name__.strip("_"): t.written for t in self.targets},
+            "format_errors": sum(t.format_errors for t in self.targets),
+        }
+
+
+def _level(level):
+    if isinstance(level, str):
+        value = logging.getLevelName(level.upper())
+        if not isinstance(value, int):
+            raise ValueError(f"unknown log level: {level}")
+        return value
+    return int(level)
+
+
+def configure(
+    level=None,
+    path=None,
+    udp=None,
+    unix_socket=None,
+    console=True,
+    console_level=None,
+    queue_size=10000,
+    batch_size=256,
+    flush_interval=0.2,
+):
+    """
+    route all logging through the asynchronous telemetry sink
+
+    calling it again replaces the previous sink. unset arguments fall back to
+    the environment: MSW_LOG_LEVEL (default INFO), MSW_TELEMETRY_UDP
+    ("host:port") and MSW_TELEMETRY_SOCKET (unix datagram socket path).
+
+    args:
+        level: level for the file and socket targets
+        path: json-lines file to append to
+        udp: (host, port) or "host:port" to send datagrams to
+        unix_socket: unix datagram socket path to send to
+        console: also print human-readable records
+        console_level: level for the console (defaults to level)
+        queue_size: records buffered before new ones are dropped
+        batch_size: most records written per batch
+        flush_interval: longest a record waits before being written (s)
+    """
+    global _sink
+    level = _level(level or os.getenv(_LEVEL_ENV, "INFO"))
+    console_level = _level(console_level or level)
+    udp = udp or os.getenv(_UDP_ENV) or None
+    unix_socket = unix_socket or os.getenv(_SOCKET_ENV) or None
+    if isinstance(udp, str):
+        host, _, port = udp.rpartition(":")
+        udp = (host or "127.0.0.1", int(port))
+
+    targets = []
+    if path:
+        targets.append(_FileTarget(path, level))
+    if udp:
+        targets.append(_DatagramTarget(udp, level))
+    if unix_socket:
+        targets.append(_DatagramTarget(unix_socket, level))
+    if console:
+        targets.append(_ConsoleTarget(console_level))
+
+    sink = TelemetrySink(targets, queue_size, batch_size, flush_interval)
+    root = logging.getLogger()
+    with _sink_lock:
+        previous, _sink = _sink, sink
+        if previous is not None:
+            root.removeHandler(previous.handler)
+        root.addHandler(sink.handler)
+        root.setLevel(sink.level)
+        sink.start()
+    if previous is not None:
+        previous.stop()
+    return sink
+
+
+def get_sink():
+    """the active sink, or None before configure()"""
+    return _sink
+
+
+def shutdown():
+    """flush and close the active sink (also runs at interpreter exit)"""
+    global _sink
+    with _sink_lock:
+        sink, _sink = _sink, None
+    if sink is not None:
+        logging.getLogger().removeHandler(sink.handler)
+        sink.stop()
+
+
+atexit.register(shutdown)
@@ -0,0 +1,23 @@
+import json
+import logging
+
+from telemetry import sink
+
+
+def test_bad_record_does_not_stop_the_writer(tmp_path):
+    path = tmp_path / "telemetry.jsonl"
+    telemetry = sink.configure(path=str(path), console=False, flush_interval=0.01)
+    # straight to the sink, past any capturing handler on the root logger
+    log = logging.getLogger("test.sink")
+    log.propagate = False
+    log.addHandler(telemetry.handler)
+    try:
+        log.info("bad %d", "x")  # formatting fails on the writer thread
+        log.info("good %d", 1)
+    finally:
+        log.removeHandler(telemetry.handler)
+        sink.shutdown()
+
+    lines = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [entry["msg"] for entry in lines] == ["good 1"]
+    assert telemetry.stats()["format_errors"] == 1
@@ -0,0 +1,498 @@
+"""
+the hardware topology - buses, devices, rates and pipeline stages - from one json file
+
+config/topology.json (or the file named by MSW_CONFIG) says which
+sensors run with which driver variant, on which bus and address, at
+what rate and with how much ring buffer, which gpio pins the actuators
+use, and how the recorder, downlink, interlock and microgravity stages
+are set up. load() validates the whole file and reports every problem
+at once, so a bad edit fails before any hardware is touched:
+
+    topology = load()
+    engine, sensors = topology.build_acquisition()
+
+the environment switches run.sh and the docs use still apply on top of
+the file: USE_DUMMY_SENSORS, MSW_ASYNC_SENSORS, MSW_DOWNLINK_PORT and
+MSW_RECORD_DIR.
+"""
+
+import copy
+import inspect
+import json
+import logging
+import os
+import time
+from typing import NamedTuple
+
+import drivers
+from sensors.ring_buffer import RingBuffer
+from telemetry.sink import event
+
+logger = logging.getLogger(__name__)
+
+CONFIG_ENV = "MSW_CONFIG"
+DEFAULT_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    "config",
+    "topology.json",
+)
+
+VARIANTS = (drivers.REAL, drivers.DUMMY, drivers.ASYNC_DUMMY)
+ENGINES = ("threads", "async")
+# bcm gpio numbers on the 40-pin header, and the ones i2c-1 takes
+GPIO_PINS = range(0, 28)
+I2C_PINS = {2, 3}
+# i2c addresses a device may use (0x00-0x02 and 0x78-0x7f are reserved)
+I2C_ADDRESSES = range(0x03, 0x78)
+
+_TOP_KEYS = {
+    "variant",
+    "engine",
+    "report_interval_s",
+    "buses",
+    "sensors",
+    "actuators",
+    "cameras",
+    "pipeline",
+}
+_SENSOR_KEYS = {
+    "name",
+    "driver",
+    "rate_hz",
+    "bus",
+    "address",
+    "buffer_capacity",
+    "enabled",
+    "options",
+}
+_ACTUATOR_KEYS = {"driver", "enabled", "options"}
+_CAMERA_KEYS = {"enabled", "indices", "fps", "preview_size"}
+_STAGE_KEYS = {
+    "recorder": {"dir", "flush_interval"},
+    "downlink": {"enabled", "host", "port", "max_rate_hz", "tick_s", "max_clients"},
+    "interlock": {
+        "enabled",
+        "overpressure_psi",
+        "rise_limit_psi_s",
+        "disagreement_psi",
+        "latency_budget_s",
+    },
+    "microgravity": {
+        "enabled",
+        "sensor",
+        "window_s",
+        "micro_enter_g",
+        "micro_exit_g",
+        "hyper_enter_g",
+        "hyper_exit_g",
+    },
+}
+
+
+class TopologyError(ValueError):
+    """the configuration is invalid - .problems lists everything found"""
+
+    def __init__(self, problems, source=None):
+        self.problems = list(problems)
+        where = f"{source}: " if source else ""
+        super().__init__(where + "; ".join(self.problems))
+
+
+class SensorSpec(NamedTuple):
+    """one sensor of the topology"""
+
+    name: str
+    driver: str
+    rate_hz: float
+    bus: str = None
+    address: int = None
+    buffer_capacity: int = None
+    enabled: bool = True
+    options: dict = {}
+
+
+def _address(value):
+    """i2c address from an int or a "0x5C" string"""
+    if isinstance(value, str):
+        return int(value, 0)
+    if isinstance(value, bool) or not isinstance(value, int):
+        raise ValueError(f"not an address: {value!r}")
+    return value
+
+
+def _positive(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool) and value > 0
+
+
+def _unknown(where, obj, allowed, problems):
+    for key in sorted(set(obj) - allowed):
+        problems.append(f"{where}: unknown key {key!r}")
+
+
+def validate(data):
+    """every problem in a topology dict, as a list of messages (empty = valid)"""
+    problems = []
+    if not isinstance(data, dict):
+        return ["topology must be a json object"]
+    _unknown("topology", data, _TOP_KEYS, problems)
+
+    if data.get("variant", drivers.REAL) not in VARIANTS:
+        problems.append(f"variant must be one of {', '.join(VARIANTS)}")
+    if data.get("engine", "threads") not in ENGINES:
+        problems.append(f"engine must be one of {', '.join(ENGINES)}")
+    elif (
+        data.get("variant") == drivers.ASYNC_DUMMY
+        and data.get("engine", "threads") != "async"
+    ):
+        # the threaded engine would call the coroutine reads without awaiting them
+        problems.append(f"variant {drivers.ASYNC_DUMMY!r} needs engine 'async'")
+    if not _positive(data.get("report_interval_s", 1.0)):
+        problems.append("report_interval_s must be a positive number")
+
+    buses = data.get("buses", {})
+    if not isinstance(buses, dict) or not all(
+        isinstance(v, str) for v in buses.values()
+    ):
+        problems.append("buses must map bus names to device paths")
+        buses = {}
+
+    sensors = data.get("sensors", [])
+    if not isinstance(sensors, list):
+        problems.append("sensors must be a list")
+        sensors = []
+    names = set()
+    addresses = {}
+    for i, sensor in enumerate(sensors):
+        where = f"sensors[{i}]"
+        if not isinstance(sensor, dict):
+            problems.append(f"{where}: must be an object")
+            continue
+        where = f"sensor {sensor.get('name', i)!r}"
+        _unknown(where, sensor, _SENSOR_KEYS, problems)
+        name = sensor.get("name")
+        if not isinstance(name, str) or not name:
+            problems.append(f"{where}: needs a name")
+        elif name in names:
+            problems.append(f"{where}: duplicate name")
+        else:
+            names.add(name)
+        if sensor.get("driver") not in drivers.names():
+            problems.append(
+                f"{where}: unknown driver {sensor.get('driver')!r} "
+                f"(known: {', '.join(drivers.names())})"
+            )
+        if not _positive(sensor.get("rate_hz")):
+            problems.append(f"{where}: rate_hz must be a positive number")
+        capacity = sensor.get("buffer_capacity")
+        if capacity is not None and (not isinstance(capacity, int) or capacity < 2):
+            problems.append(f"{where}: buffer_capacity must be an integer >= 2")
+        if not isinstance(sensor.get("options", {}), dict):
+            problems.append(f"{where}: options must be an object")
+        bus = sensor.get("bus")
+        if bus is not None and not isinstance(bus, str):
+            problems.append(f"{where}: bus must be a bus name")
+            continue
+        if bus is not None and bus not in buses:
+            problems.append(f"{where}: unknown bus {bus!r}")
+        if "address" in sensor:
+            if bus is None:
+                problems.append(f"{where}: an address needs a bus")
+            try:
+                address = _address(sensor["address"])
+            except ValueError:
+                problems.append(f"{where}: bad address {sensor['address']!r}")
+                continue
+            if address not in I2C_ADDRESSES:
+                problems.append(f"{where}: address {address:#04x} is outside 0x03-0x77")
+            other = addresses.get((bus, address))
+            if other is not None and sensor.get("enabled", True):
+                problems.append(
+                    f"{where}: address {address:#04x} on {bus} is taken by {other!r}"
+                )
+            if sensor.get("enabled", True):
+                addresses[(bus, address)] = name
+
+    pins = {}
+    if any(bus.startswith("/dev/i2c-1") for bus in buses.values()):
+        pins.update({pin: "i2c-1" for pin in I2C_PINS})
+    actuators = data.get("actuators", {})
+    if not isinstance(actuators, dict):
+        problems.append("actuators must be an object")
+        actuators = {}
+    for name, actuator in actuators.items():
+        where = f"actuator {name!r}"
+        if not isinstance(actuator, dict):
+            problems.append(f"{where}: must be an object")
+            continue
+        _unknown(where, actuator, _ACTUATOR_KEYS, problems)
+        if actuator.get("driver") not in drivers.names():
+            problems.append(f"{where}: unknown driver {actuator.get('driver')!r}")
+        options = actuator.get("options", {})
+        if not isinstance(options, dict):
+            problems.append(f"{where}: options must be an object")
+            continue
+        for key, pin in options.items():
+            if not (key == "pin" or key.endswith("_pin") or key.startswith("enc_")):
+                continue
+            if pin not in GPIO_PINS or isinstance(pin, bool):
+                problems.append(
+                    f"{where}: {key}={pin!r} is not a bcm gpio number (0-27)"
+                )
+            elif pin in pins and actuator.get("enabled", True):
+                problems.append(
+                    f"{where}: {key}=gpio{pin} is already used by {pins[pin]}"
+                )
+            elif actuator.get("enabled", True):
+                pins[pin] = f"{name}.{key}"
+
+    cameras = data.get("cameras", {})
+    if not isinstance(cameras, dict):
+        problems.append("cameras must be an object")
+    else:
+        _unknown("cameras", cameras, _CAMERA_KEYS, problems)
+        if "fps" in cameras and not _positive(cameras["fps"]):
+            problems.append("cameras: fps must be a positive number")
+
+    pipeline = data.get("pipeline", {})
+    if not isinstance(pipeline, dict):
+        problems.append("pipeline must be an object")
+        pipeline = {}
+    _unknown("pipeline", pipeline, set(_STAGE_KEYS), problems)
+    stages = {}
+    for stage, keys in _STAGE_KEYS.items():
+        options = pipeline.get(stage, {})
+        if not isinstance(options, dict):
+            problems.append(f"pipeline.{stage} must be an object")
+            continue
+        stages[stage] = options
+        _unknown(f"pipeline.{stage}", options, keys, problems)
+        for key, value in options.items():
+            if key.endswith(("_s", "_hz", "_psi", "_g", "_psi_s")) and not _positive(
+                value
+            ):
+                problems.append(f"pipeline.{stage}.{key} must be a positive number")
+    sensor_name = stages.get("microgravity", {}).get("sensor")
+    if sensor_name is not None and (
+        not isinstance(sensor_name, str) or sensor_name not in names
+    ):
+        problems.append(f"pipeline.microgravity: unknown sensor {sensor_name!r}")
+    return problems
+
+
+def apply_environment(data, env=None):
+    """a copy of data with the USE_DUMMY_SENSORS / MSW_* switches applied"""
+    env = os.environ if env is None else env
+    data = copy.deepcopy(data)
+    if not isinstance(data, dict):
+        return data  # left for validate() to report
+    pipeline = data.setdefault("pipeline", {})
+    asynchronous = env.get("MSW_ASYNC_SENSORS", "").lower() == "true"
+    if asynchronous:
+        data["engine"] = "async"
+    if env.get("USE_DUMMY_SENSORS", "").lower() == "true":
+        data["variant"] = (
+            drivers.ASYNC_DUMMY if data.get("engine") == "async" else drivers.DUMMY
+        )
+    # stages that are not objects are left as they are for validate() to report
+    if not isinstance(pipeline, dict):
+        return data
+    if env.get("MSW_DOWNLINK_PORT"):
+        downlink = pipeline.setdefault("downlink", {})
+        if isinstance(downlink, dict):
+            downlink["enabled"] = True
+            downlink["port"] = int(env["MSW_DOWNLINK_PORT"])
+    if env.get("MSW_RECORD_DIR"):
+        recorder = pipeline.setdefault("recorder", {})
+        if isinstance(recorder, dict):
+            recorder["dir"] = env["MSW_RECORD_DIR"]
+    return data
+
+
+def load(path=None, env=None):
+    """
+    read, apply the environment switches and validate a topology file
+
+    args:
+        path: json file (default: $MSW_CONFIG, then config/topology.json)
+        env: environment to take the switches from (default os.environ)
+    """
+    env = os.environ if env is None else env
+    path = path or env.get(CONFIG_ENV) or DEFAULT_PATH
+    try:
+        with open(path) as f:
+            data = json.load(f)
+    except json.JSONDecodeError as e:
+        raise TopologyError([f"invalid json: {e}"], path) from e
+    return Topology(apply_environment(data, env), source=path)
+
+
+class Topology:
+    """a validated topology and the builders for its runtime objects"""
+
+    def __init__(self, data, source=None):
+        problems = validate(data)
+        if problems:
+            raise TopologyError(problems, source)
+        self.data = data
+        self.source = source
+        self.variant = data.get("variant", drivers.REAL)
+        self.engine = data.get("engine", "threads")
+        self.report_interval_s = data.get("report_interval_s", 1.0)
+        self.buses = dict(data.get("buses", {}))
+        self.sensors = [
+            SensorSpec(
+                **dict(s, address=_address(s["address"]) if "address" in s else None)
+            )
+            for s in data.get("sensors", [])
+        ]
+        self.actuators = data.get("actuators", {})
+        self.cameras = data.get("cameras", {})
+        self.pipeline = data.get("pipeline", {})
+
+    def stage(self, name):
+        """options of a pipeline stage ({} if absent); None if the stage is disabled"""
+        options = dict(self.pipeline.get(name, {}))
+        if not options.pop("enabled", True):
+            return None
+        return options
+
+    @property
+    def enabled_sensors(self):
+        return [s for s in self.sensors if s.enabled]
+
+    def rate_hz(self, driver):
+        """sample rate of the first enabled sensor using this driver, or None"""
+        return next(
+            (s.rate_hz for s in self.enabled_sensors if s.driver == driver), None
+        )
+
+    # ---------- builders ----------
+
+    def create_sensor(self, spec):
+        """
+        construct one sensor (not yet connected)
+
+        the bus and address go to the driver's i2c_port and address /
+        slave_address arguments. dummy drivers get only the options
+        their constructor takes, so one file serves every variant.
+        """
+        cls = drivers.load(spec.driver, self.variant)
+        accepted = inspect.signature(cls).parameters
+        kwargs = dict(spec.options)
+        if spec.bus is not None:
+            kwargs["i2c_port"] = self.buses[spec.bus]
+        if spec.address is not None:
+            kwargs["slave_address" if "slave_address" in accepted else "address"] = (
+                spec.address
+            )
+        if self.variant != drivers.REAL:
+            kwargs = {k: v for k, v in kwargs.items() if k in accepted}
+        try:
+            sensor = cls(**kwargs)
+        except TypeError as e:
+            raise TopologyError([f"sensor {spec.name!r}: {e}"], self.source) from e
+        if spec.buffer_capacity is not None:
+            sensor.buffer = RingBuffer(sensor.FIELDS, capacity=spec.buffer_capacity)
+        return sensor
+
+    def create_actuator(self, name, **extra):
+        """construct a configured actuator; extra arguments (e.g. pi=) are passed on"""
+        options = self.actuators[name]
+        if not options.get("enabled", True):
+            raise drivers.DriverUnavailable(f"{name} is disabled in {self.source}")
+        return drivers.create(
+            options["driver"], **dict(options.get("options", {}), **extra)
+        )
+
+    def create_engine(self):
+        if self.engine == "async":
+            from sensors.async_sensor import AsyncAcquisition
+
+            return AsyncAcquisition()
+        from sensors.acquisition import AcquisitionEngine
+
+        return AcquisitionEngine()
+
+    def build_acquisition(self):
+        """
+        the acquisition engine with every enabled sensor registered
+
+        blocking sensors are connected and started here, async ones by the
+        engine's loop. a sensor whose driver cannot be imported or that does
+        not answer is skipped with a warning. returns (engine, {name: sensor});
+        the caller hands the sensors to disconnect() when done.
+        """
+        from sensors.async_sensor import AsyncSensor
+
+        engine = self.create_engine()
+        sensors = {}
+        try:
+            for spec in self.enabled_sensors:
+                try:
+                    sensor = self.create_sensor(spec)
+                    if not isinstance(sensor, AsyncSensor):
+                        sensor.connect()
+                        sensor.start()
+                except TopologyError:
+                    raise
+                except Exception as e:
+                    event(
+                        logger,
+                        "sensor.unavailable",
+                        level=logging.WARNING,
+                        msg=f"skipping {spec.name}: {e}",
+                        sensor=spec.name,
+                    )
+                    continue
+                engine.add_sensor(sensor, spec.rate_hz, spec.name)
+                sensors[spec.name] = sensor
+        except BaseException:
+            self.disconnect(sensors)
+            raise
+        return engine, sensors
+
+    @staticmethod
+    def disconnect(sensors):
+        """disconnect the blocking sensors build_acquisition() started (async ones stop with their engine)"""
+        from sensors.async_sensor import AsyncSensor
+
+        for name, sensor in sensors.items():
+            if isinstance(sensor, AsyncSensor):
+                continue
+            try:
+                sensor.disconnect()
+            except Exception:
+                logger.exception("error disconnecting %s", name)
+
+    def create_detector(self, sensors):
+        """the microgravity detector on the configured accelerometer, or None"""
+        options = self.stage("microgravity")
+        if options is None:
+            return None
+        sensor = sensors.get(options.pop("sensor", "Accelerometer"))
+        if sensor is None:
+            return None
+        from analysis.microgravity import MicrogravityDetector
+
+        return MicrogravityDetector(sensor.buffer, **options)
+
+    def create_recorder(self, prefix="flight"):
+        """a FlightRecorder in the configured directory, with this topology in its header"""
+        from telemetry.recorder import FlightRecorder
+
+        options = self.stage("recorder") or {}
+        directory = options.pop("dir", "recordings")
+        path = os.path.join(directory, time.strftime(f"{prefix}_%Y%m%d_%H%M%S.msw"))
+        return FlightRecorder(path, metadata={"topology": self.data}, **options)
+
+    def create_downlink(self):
+        """the configured TelemetryServer, or None when the downlink is off"""
+        options = self.stage("downlink")
+        if options is None:
+            return None
+        from telemetry.server import TelemetryServer
+
+        return TelemetryServer(**options)
+
+    def as_dict(self):
+        return copy.deepcopy(self.data)
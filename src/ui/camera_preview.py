@@ -0,0 +1,186 @@
+import threading
+import time
+from collections import deque
+
+from PIL import Image, ImageTk
+
+from camera.frame_queue import LatestFrameQueue
+from telemetry.instrumentation import gauge, timed
+
+
+class CameraPreview:
+    """
+    live camera image on a tk canvas without touching tk off the ui thread
+
+    frames are handed over with submit() from any thread (the camera's
+    post_callback) into a latest-frame-wins queue. a converter thread turns
+    the newest one into a PIL image at the canvas size, and the tk thread
+    pastes it into one persistent PhotoImage shown by one canvas item.
+
+    the converter only starts on a new frame once the ui has shown the last
+    one, so when the ui falls behind frames are dropped at the queue before
+    any conversion work is spent on them. the ui poll interval also backs
+    off while the tk loop is running late, and recovers when it catches up.
+    """
+
+    def __init__(self, canvas, max_fps=30, max_interval_ms=250):
+        """
+        args:
+            canvas: tk canvas to draw into (the image is scaled to its size)
+            max_fps: upper bound on the displayed frame rate
+            max_interval_ms: slowest the ui poll backs off to
+        """
+        self.canvas = canvas
+        self.size = (int(canvas["width"]), int(canvas["height"]))
+        self.min_interval_ms = max(1, int(1000 / max_fps))
+        self.max_interval_ms = max_interval_ms
+        self.interval_ms = self.min_interval_ms
+
+        self._frames = LatestFrameQueue()  # raw frames from the camera
+        self._ready = LatestFrameQueue()  # converted images for the ui
+        self._consumed = threading.Event()
+        self._consumed.set()
+        self._running = False
+        self._thread = None
+        self._after_id = None
+        self._scheduled_at = None
+
+        self._photo = None
+        self._item = None
+
+        self.shown = 0
+        self._shown_times = deque(maxlen=60)
+        self.latency_s = 0.0
+        self.max_latency_s = 0.0
+        self.latencies = deque(maxlen=600)  # capture-to-screen, seconds
+        self._latency_gauge = gauge("ui.preview.latency_ms")
+
+    # ---------- any thread ----------
+
+    def submit(self, frame, timestamp=None):
+        """
+        queue an rgb frame (h x w x 3 uint8 array) for display
+
+        timestamp is the capture time in time.monotonic() seconds (default:
+        now) and is only used for the latency figures.
+
+        the preview keeps a reference, so pass a copy if the caller reuses
+        the buffer (request.make_array already returns one).
+        """
+        if self._running:
+            self._frames.put(
+                (frame, time.monotonic() if timestamp is None else timestamp)
+            )
+
+    # ---------- converter thread ----------
+
+    def _convert_loop(self):
+        while self._running:
+            # wait until the ui has taken the last image, so conversion is
+            # only spent on frames that will be shown
+            if not self._consumed.wait(0.5):
+                continue
+            item = self._frames.get(timeout=0.5)
+            if item is None:
+                continue
+            frame, timestamp = item
+            image = self._convert(frame)
+            self._consumed.clear()
+            self._ready.put((image, timestamp))
+
+    @timed("ui.preview.convert")
+    def _convert(self, frame):
+        image = Image.fromarray(frame[..., :3])
+        if image.size != self.size:
+            image = image.resize(self.size, Image.BILINEAR)
+        return image
+
+    # ---------- tk thread ----------
+
+    def start(self):
+        if self._running:
+            return
+        # stop() closed the queues; a closed queue never blocks and the
+        # converter would spin on it
+        self._frames.reopen()
+        self._ready.reopen()
+        self._consumed.set()
+        self._running = True
+        self._thread = threading.Thread(
+            target=self._convert_loop, name="camera-preview", daemon=True
+        )
+        self._thread.start()
+        self._scheduled_at = time.monotonic()
+        self._after_id = self.canvas.after(self.interval_ms, self._poll)
+
+    def stop(self):
+        self._running = False
+        self._frames.close()
+        self._consumed.set()
+        if self._after_id is not None:
+            self.canvas.after_cancel(self._after_id)
+            self._after_id = None
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+
+    def _poll(self):
+        self._after_id = None
+        if not self._running:
+            return
+
+        if self._scheduled_at is not None:
+            # tk loop running late: poll less often, else creep back up
+            lag_ms = (time.monotonic() - self._scheduled_at) * 1000 - self.interval_ms
+            if lag_ms > self.interval_ms / 2:
+                self.interval_ms = min(
+                    int(self.interval_ms * 1.5) + 1, self.max_interval_ms
+                )
+            elif self.interval_ms > self.min_interval_ms:
+                self.interval_ms = max(
+                    int(self.interval_ms * 0.9), self.min_interval_ms
+                )
+
+        item = self._ready.get_nowait()
+        if item is not None:
+            self._show(*item)
+            self._consumed.set()
+
+        self._scheduled_at = time.monotonic()
+        self._after_id = self.canvas.after(self.interval_ms, self._poll)
+
+    @timed("ui.preview.show")
+    def _show(self, image, timestamp):
+        if self._photo is None:
+            self._photo = ImageTk.PhotoImage(image=image)
+            self.canvas.delete("all")
+            self._item = self.canvas.create_image(0, 0, anchor="nw", image=self._photo)
+        else:
+            self._photo.paste(image)
+        now = time.monotonic()
+        self.shown += 1
+        self._shown_times.append(now)
+        self.latency_s = now - timestamp
+        self.latencies.append(self.latency_s)
+        self._latency_gauge.set(self.latency_s * 1000)
+        self.max_latency_s = max(self.max_latency_s, self.latency_s)
+
+    @property
+    def fps(self):
+        times = self._shown_times
+        if len(times) < 2 or times[-1] <= times[0]:
+            return 0.0
+        return (len(times) - 1) / (times[-1] - times[0])
+
+    def stats(self):
+        latencies = sorted(self.latencies)
+        p95 = latencies[int(0.95 * (len(latencies) - 1))] if latencies else 0.0
+        return {
+            "shown": self.shown,
+            "fps": round(self.fps, 1),
+            "dropped": self._frames.dropped,
+            "interval_ms": self.interval_ms,
+            "latency_ms": round(self.latency_s * 1000, 1),
+            "p95_latency_ms": round(p95 * 1000, 1),
+            "max_latency_ms": round(self.max_latency_s * 1000, 1),
+        }
@@ -0,0 +1,58 @@
+import tkinter as tk
+
+from telemetry import instrumentation
+
+
+class StatsPanel(tk.Toplevel):
+    """
+    live table of the instrumentation timers, counters and gauges
+
+    refreshes from instrumentation.snapshot() on tk's own loop, so it only
+    reads the figures the hot paths already keep. recording can be turned
+    on and the figures zeroed from here, e.g. just before a sequence.
+    """
+
+    def __init__(self, parent, refresh_ms=1000):
+        """
+        args:
+            parent: tk window the panel belongs to
+            refresh_ms: table refresh interval
+        """
+        super().__init__(parent)
+        self.title("Loop stats")
+        self.refresh_ms = refresh_ms
+        self._after_id = None
+
+        controls = tk.Frame(self)
+        controls.pack(fill="x", padx=5, pady=5)
+        self.recording = tk.BooleanVar(value=instrumentation.is_enabled())
+        tk.Checkbutton(
+            controls,
+            text="Record",
+            variable=self.recording,
+            command=lambda: instrumentation.enable(self.recording.get()),
+        ).pack(side="left")
+        tk.Button(controls, text="Reset", command=instrumentation.reset).pack(
+            side="left", padx=5
+        )
+
+        self.text = tk.Text(
+            self, width=100, height=24, font=("Courier", 10), bg="#1c1c1c", fg="white"
+        )
+        self.text.pack(fill="both", expand=True)
+        self.protocol("WM_DELETE_WINDOW", self.close)
+        self._refresh()
+
+    def _refresh(self):
+        table = instrumentation.format_table() or "nothing recorded yet"
+        if not instrumentation.is_enabled():
+            table = "recording is off\n\n" + table
+        self.text.delete("1.0", "end")
+        self.text.insert("1.0", table)
+        self._after_id = self.after(self.refresh_ms, self._refresh)
+
+    def close(self):
+        if self._after_id is not None:
+            self.after_cancel(self._after_id)
+            self._after_id = None
+        self.destroy()
@@ -0,0 +1,298 @@
+import time
+import tkinter as tk
+
+import numpy as np
+
+from sensors.ring_buffer import RingBuffer
+from telemetry.instrumentation import timed
+
+PALETTE = ("#2ecc71", "#3498db", "#e67e22", "#e74c3c", "#9b59b6", "#f1c40f")
+
+
+class _Trace:
+    def __init__(self, name, buffer, field, color, item, legend):
+        self.name = name
+        self.buffer = buffer
+        self.column = buffer.column(field)
+        self.color = color
+        self.item = item
+        self.legend = legend
+        self.visible = False
+
+
+def min_max_bins(timestamps, values, start, window_s, width):
+    """
+    reduce samples to at most two points per pixel column
+
+    returns (x, low, high): the pixel column of every occupied bin and the
+    smallest and largest value that fell into it. nan samples are ignored.
+    """
+    px = ((timestamps - start) * (width / window_s)).astype(np.intp)
+    np.clip(px, 0, width - 1, out=px)
+    starts = np.flatnonzero(np.diff(px, prepend=-1))
+    low = np.fmin.reduceat(values, starts)
+    high = np.fmax.reduceat(values, starts)
+    keep = ~np.isnan(low)
+    return px[starts][keep], low[keep], high[keep]
+
+
+class StripChart(tk.Frame):
+    """
+    scrolling time plot of several ring-buffer channels
+
+    every trace reads straight from a RingBuffer (the sensor's own, or one
+    the chart allocates with add_series()), so nothing is copied per
+    sample. each frame the visible window is binned to the plot width with
+    min/max per pixel column, so drawing costs the same for 2 Hz and
+    100 Hz data and spikes are never decimated away.
+
+    the canvas items - grid, axis labels, one line per trace - are created
+    once and only get new coordinates or text. redraws run from tk's own
+    loop with after(); call start() once the chart is packed.
+    """
+
+    def __init__(
+        self,
+        parent,
+        title="",
+        width=420,
+        height=180,
+        window_s=10.0,
+        windows=(5, 10, 30, 60),
+        fps=30,
+        y_range=None,
+        unit="",
+        bg="#1c1c1c",
+    ):
+        """
+        args:
+            parent: tk container
+            title: text above the plot
+            width, height: canvas size in pixels
+            window_s: initial time window (s)
+            windows: selectable windows, shown as buttons (empty for none)
+            fps: redraw rate
+            y_range: fixed (low, high), or None to follow the data
+            unit: suffix for the y axis labels
+            bg: background colour
+        """
+        super().__init__(parent, bg=bg)
+        if window_s <= 0:
+            raise ValueError(f"window must be positive, got {window_s}")
+        self.window_s = float(window_s)
+        self.interval_ms = max(1, int(1000 / fps))
+        self.fixed_range = tuple(y_range) if y_range is not None else None
+        self.y_range = self.fixed_range or (0.0, 1.0)
+        self.unit = unit
+        self.traces = []
+        self._after_id = None
+
+        self.frames = 0
+        self.last_render_ms = 0.0
+        self.max_render_ms = 0.0
+        self._render_total = 0.0
+
+        header = tk.Frame(self, bg=bg)
+        header.pack(fill="x")
+        tk.Label(
+            header, text=title, fg="white", bg=bg, font=("Arial", 12, "bold")
+        ).pack(side="left")
+        self._window_var = tk.DoubleVar(value=self.window_s)
+        for seconds in reversed(windows):
+            tk.Radiobutton(
+                header,
+                text=f"{seconds:g}s",
+                value=float(seconds),
+                variable=self._window_var,
+                indicatoron=0,
+                command=lambda: self.set_window(self._window_var.get()),
+                fg="white",
+                bg=bg,
+                selectcolor="#444",
+                font=("Arial", 9),
+            ).pack(side="right", padx=1)
+
+        self.canvas = tk.Canvas(
+            self, width=width, height=height, bg=bg, highlightthickness=0
+        )
+        self.canvas.pack(fill="both", expand=True)
+        c = self.canvas
+        self._frame_item = c.create_rectangle(0, 0, 0, 0, outline="#555")
+        self._grid = [c.create_line(0, 0, 0, 0, fill="#333") for _ in range(5)]
+        self._grid_labels = [
+            c.create_text(0, 0, anchor="e", fill="#aaa", font=("Arial", 8))
+            for _ in range(5)
+        ]
+        self._time_label = c.create_text(
+            0, 0, anchor="ne", fill="#aaa", font=("Arial", 8)
+        )
+        self._empty_label = c.create_text(0, 0, text="no data yet", fill="#888")
+        self._size = None
+        self.x0, self.y0, self.x1, self.y1 = 0, 0, width, height
+        self._layout(width, height)
+        c.bind("<Configure>", lambda e: self._layout(e.width, e.height))
+
+    # ---------- traces ----------
+
+    def add_trace(self, name, buffer, field, color=None):
+        """plot one field of a ring buffer"""
+        color = color or PALETTE[len(self.traces) % len(PALETTE)]
+        item = self.canvas.create_line(0, 0, 0, 0, fill=color, width=1, state="hidden")
+        legend = self.canvas.create_text(
+            0, 0, text=name, anchor="nw", fill=color, font=("Arial", 8)
+        )
+        trace = _Trace(name, buffer, field, color, item, legend)
+        self.traces.append(trace)
+        self._place_legends()
+        return trace
+
+    def add_series(self, name, capacity=8192, color=None):
+        """plot values fed by the caller - returns the RingBuffer to append() to"""
+        buffer = RingBuffer((name,), capacity=capacity)
+        self.add_trace(name, buffer, name, color)
+        return buffer
+
+    def clear_traces(self):
+        """remove every trace and its legend, e.g. before re-attaching sensors"""
+        for trace in self.traces:
+            self.canvas.delete(trace.item, trace.legend)
+        self.traces.clear()
+        self.canvas.itemconfigure(self._empty_label, state="normal")
+
+    def set_window(self, seconds):
+        if seconds <= 0:
+            raise ValueError(f"window must be positive, got {seconds}")
+        self.window_s = float(seconds)
+        self._window_var.set(self.window_s)
+        self.canvas.itemconfigure(self._time_label, text=f"-{self.window_s:g} s … now")
+
+    # ---------- geometry ----------
+
+    def _layout(self, width, height):
+        if (width, height) == self._size or width < 60 or height < 40:
+            return
+        self._size = (width, height)
+        self.x0, self.y0 = 44, 6
+        self.x1, self.y1 = width - 6, height - 16
+        c = self.canvas
+        c.coords(self._frame_item, self.x0, self.y0, self.x1, self.y1)
+        for i, (line, label) in enumerate(zip(self._grid, self._grid_labels)):
+            y = self.y1 - i / 4 * (self.y1 - self.y0)
+            c.coords(line, self.x0, y, self.x1, y)
+            c.coords(label, self.x0 - 4, y)
+        c.coords(self._time_label, self.x1, self.y1 + 2)
+        c.coords(self._empty_label, (self.x0 + self.x1) / 2, (self.y0 + self.y1) / 2)
+        self._place_legends()
+        self._label_axis()
+        self.set_window(self.window_s)
+
+    def _place_legends(self):
+        x = self.x0 + 4
+        for trace in self.traces:
+            self.canvas.coords(trace.legend, x, self.y0 + 2)
+            bbox = self.canvas.bbox(trace.legend)
+            x = (bbox[2] if bbox else x) + 10
+
+    def _label_axis(self):
+        low, high = self.y_range
+        for i, label in enumerate(self._grid_labels):
+            value = low + i / 4 * (high - low)
+            self.canvas.itemconfigure(label, text=f"{value:.3g}{self.unit}")
+
+    def _follow(self, low, high):
+        """autoscale with hysteresis so the axis does not jitter every frame"""
+        if self.fixed_range is not None or not np.isfinite([low, high]).all():
+            return
+        span = max(high - low, abs(high) * 0.01, 1e-6)  # flat traces still get an axis
+        current_low, current_high = self.y_range
+        current_span = current_high - current_low
+        if low >= current_low and high <= current_high and span > current_span / 3:
+            return
+        pad = span * 0.1
+        self.y_range = (low - pad, high + pad)
+        self._label_axis()
+
+    # ---------- rendering (tk thread) ----------
+
+    def start(self):
+        if self._after_id is None:
+            self._after_id = self.after(self.interval_ms, self._tick)
+
+    def stop(self):
+        if self._after_id is not None:
+            self.after_cancel(self._after_id)
+            self._after_id = None
+
+    def _tick(self):
+        self._after_id = self.after(self.interval_ms, self._tick)
+        began = time.perf_counter()
+        self.render()
+        elapsed_ms = (time.perf_counter() - began) * 1000
+        self.frames += 1
+        self.last_render_ms = elapsed_ms
+        self.max_render_ms = max(self.max_render_ms, elapsed_ms)
+        self._render_total += elapsed_ms
+
+    @timed("ui.chart.render")
+    def render(self, now=None):
+        """redraw every trace for the window ending at now (default: monotonic now)"""
+        now = time.monotonic() if now is None else now
+        start = now - self.window_s
+        width = max(1, int(self.x1 - self.x0))
+
+        bins = []
+        low, high = np.inf, -np.inf
+        for trace in self.traces:
+            timestamps, values = trace.buffer.window(start, now)
+            if len(timestamps) == 0:
+                bins.append(None)
+                continue
+            x, lo, hi = min_max_bins(
+                timestamps, values[:, trace.column], start, self.window_s, width
+            )
+            bins.append((x, lo, hi))
+            if len(x):
+                low, high = min(low, lo.min()), max(high, hi.max())
+        self._follow(low, high)
+
+        y_low, y_high = self.y_range
+        scale = (self.y1 - self.y0) / ((y_high - y_low) or 1.0)
+        any_visible = False
+        for trace, binned in zip(self.traces, bins):
+            if binned is None or len(binned[0]) == 0:
+                self._show(trace, False)
+                continue
+            x, lo, hi = binned
+            # two points per column: the line sweeps each pixel's min..max
+            points = np.empty((len(x) * 2, 2))
+            points[:, 0] = np.repeat(x + self.x0, 2)
+            points[0::2, 1] = lo
+            points[1::2, 1] = hi
+            points[:, 1] = (
+                self.y1 - (np.clip(points[:, 1], y_low, y_high) - y_low) * scale
+            )
+            self.canvas.coords(trace.item, points.ravel().tolist())
+            self._show(trace, True)
+            any_visible = True
+        self.canvas.itemconfigure(
+            self._empty_label, state="hidden" if any_visible else "normal"
+        )
+
+    def _show(self, trace, visible):
+        if trace.visible != visible:
+            self.canvas.itemconfigure(
+                trace.item, state="normal" if visible else "hidden"
+            )
+            trace.visible = visible
+
+    def stats(self):
+        return {
+            "frames": self.frames,
+            "traces": len(self.traces),
+            "window_s": self.window_s,
+            "render_ms": round(self.last_render_ms, 2),
+            "mean_render_ms": (
+                round(self._render_total / self.frames, 2) if self.frames else 0.0
+            ),
+            "max_render_ms": round(self.max_render_ms, 2),
+        }